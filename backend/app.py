@@ -5,6 +5,12 @@ from datetime import datetime
 import json
 import re
 from rule_engine import RuleEngine
+from rule_store import DatabaseRuleStore
+from field_resolver import FieldResolver
+from rendered_forms import RenderedFormCache
+from match_cache import MatchDecisionCache
+from job_runner import JobRunner
+from http_cache_utils import make_etag, conditional_response
 import os
 from csv_parser import CSVParser
 from document_utils import save_uploaded_file, delete_file, categorize_file, get_mime_type
@@ -20,13 +26,16 @@ from field_library_import import FieldLibraryImporter
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///regulatory_platform.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Background job queue (see job_runner.py) - separate file so it never waits on an import's write lock
+app.config['SQLALCHEMY_BINDS'] = {'jobs': 'sqlite:///jobs.db'}
 app.config['SECRET_KEY'] = 'regulatory-platform-secret-key-2024'
 
 # CORS configuration - CRITICAL: Do not expose port 5000, only allow frontend port
 CORS(app, origins=["http://localhost:5173", "https://5173-if4j0l8kg1824dwz6da49-f18e74fa.manusvm.computer", "https://5173-i4u5q4wzga20dqo40gx3x-50251577.manusvm.computer"], supports_credentials=True)
 
-# Initialize Rule Engine
-rule_engine = RuleEngine()
+# Initialize Rule Engine (RULE_STATS=1 keeps per-rule counters and timings for
+# every evaluation, served by GET /api/rules/<board_id>/stats)
+rule_engine = RuleEngine(collect_stats=os.environ.get('RULE_STATS', '').lower() in ('1', 'true'))
 
 db = SQLAlchemy(app)
 
@@ -158,6 +167,9 @@ class FieldLibrary(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+# Batch loads referenced library fields and caches their parsed JSON per row version
+field_resolver = FieldResolver(FieldLibrary)
+
 class ApplicationType(db.Model):
     """Stores application type definitions parsed from regulatory documents"""
     id = db.Column(db.Integer, primary_key=True)
@@ -189,10 +201,24 @@ class ApplicationType(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def get_fields(self):
+    # Form elements that are not input fields (signature blocks, instructions, etc.)
+    NON_FIELD_TYPES = ['section_header', 'instruction_block', 'attestation_block', 'signature_block', 'document_upload', 'fee_display']
+    
+    # Keys of to_summary_dict(), which list views can request without field expansion
+    SUMMARY_FIELDS = [
+        'id', 'name', 'description', 'status', 'active', 'renewalPeriod', 'baseFee',
+        'fieldCount', 'questionCount', 'sectionCount', 'stepCount', 'conditionalRuleCount',
+        'createdAt', 'updatedAt'
+    ]
+    
+    def get_fields(self, field_rows=None):
         """
         Get fields for this application type
         Supports both old format (form_definition) and new format (form_fields_v2)
+        
+        Args:
+            field_rows: Optional {id: FieldLibrary} preloaded with field_resolver
+                (e.g. for a whole list of types); loaded in one query if omitted
         """
         # New format: field library references with overrides
         # Check if form_fields_v2 exists AND has content (not just empty array)
@@ -201,12 +227,16 @@ class ApplicationType(db.Model):
             if fields_data:  # Double-check array is not empty after parsing
                 rendered_fields = []
             
+            if field_rows is None:
+                field_rows = field_resolver.load_for_types([self])
+            
             for field_ref in fields_data:
                 # If referencing UFL field
                 if field_ref.get('field_library_id'):
-                    ufl_field = FieldLibrary.query.get(field_ref['field_library_id'])
+                    ufl_field = field_rows.get(field_ref['field_library_id'])
                     if ufl_field:
                         overrides = field_ref.get('overrides', {})
+                        library_json = field_resolver.parsed(ufl_field)
                         
                         # Build field config with frontend-compatible property names
                         field_config = {
@@ -217,9 +247,9 @@ class ApplicationType(db.Model):
                             'required': overrides.get('required', False),
                             'helpText': overrides.get('help_text') or ufl_field.help_text,
                             'placeholder': overrides.get('placeholder') or ufl_field.placeholder,
-                            'options': json.loads(ufl_field.options) if ufl_field.options else None,
-                            'validation': json.loads(ufl_field.validation_rules) if ufl_field.validation_rules else {},
-                            'conditionalRules': json.loads(ufl_field.conditional_rules) if ufl_field.conditional_rules else None,
+                            'options': library_json['options'],
+                            'validation': library_json['validation'],
+                            'conditionalRules': library_json['conditionalRules'],
                             'category': ufl_field.category,
                             'field_key': ufl_field.field_key,
                             'display_order': field_ref.get('display_order', 999)
@@ -245,7 +275,7 @@ class ApplicationType(db.Model):
                         # Define field types (these are already in form_fields_v2)
                         field_types = ['text', 'email', 'tel', 'number', 'date', 'select', 'checkbox', 'radio', 'textarea', 'file']
                         # Define non-field element types (these need to be included)
-                        non_field_types = ['section_header', 'instruction_block', 'attestation_block', 'signature_block', 'document_upload', 'fee_display']
+                        non_field_types = self.NON_FIELD_TYPES
                         
                         for element in form_def:
                             element_type = element.get('type')
@@ -275,7 +305,63 @@ class ApplicationType(db.Model):
         
         return []
     
-    def to_dict(self):
+    def get_required_field_keys(self):
+        """Keys of fields the form definition itself marks required (as the portal keys them)"""
+        keys = []
+        for field in self.get_fields():
+            if isinstance(field, dict) and field.get('required'):
+                key = field.get('id') or field.get('field_key') or field.get('name')
+                if key:
+                    keys.append(key)
+        return keys
+    
+    @staticmethod
+    def _load_json(text, default=None):
+        try:
+            return json.loads(text) if text else default
+        except (TypeError, ValueError):
+            return default
+    
+    def get_field_count(self):
+        """Number of input fields, counted from the raw form JSON without loading library fields"""
+        refs = self._load_json(self.form_fields_v2, [])
+        if isinstance(refs, list) and refs:
+            return len(refs)
+        
+        elements = self._load_json(self.form_definition, [])
+        if isinstance(elements, dict):
+            elements = elements.get('elements', [])
+        if not isinstance(elements, list):
+            return 0
+        return sum(1 for element in elements
+                   if isinstance(element, dict) and element.get('type') not in self.NON_FIELD_TYPES)
+    
+    def to_summary_dict(self):
+        """Lightweight view for lists and cards: no field expansion, counts from the raw JSON columns"""
+        sections = self._load_json(self.sections, [])
+        sections = sections if isinstance(sections, list) else []
+        steps = self._load_json(self.steps)
+        rules = self._load_json(self.conditional_rules, [])
+        
+        return {
+            'id': self.id,
+            'name': self.name,
+            'description': self.description,
+            'status': self.status,
+            'active': self.active,
+            'renewalPeriod': self.renewal_period,
+            'baseFee': self.base_fee,
+            'fieldCount': self.get_field_count(),
+            'questionCount': sum(len(section.get('questions') or []) for section in sections
+                                 if isinstance(section, dict)),
+            'sectionCount': len(sections),
+            'stepCount': len(steps.get('steps') or []) if isinstance(steps, dict) and steps.get('enabled') else 0,
+            'conditionalRuleCount': len(rules) if isinstance(rules, list) else 0,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
+    
+    def to_dict(self, field_rows=None):
         return {
             'id': self.id,
             'name': self.name,
@@ -285,7 +371,7 @@ class ApplicationType(db.Model):
             'licenseNumberFormat': self.license_number_format,
             'sourceDocument': self.source_document,
             'parserVersion': self.parser_version,
-            'fields': self.get_fields(),  # Use new method that handles both formats
+            'fields': self.get_fields(field_rows),  # Use new method that handles both formats
             'workflow': json.loads(self.workflow_definition) if self.workflow_definition else {},
             'fees': json.loads(self.fees_definition) if self.fees_definition else {},
             'fee_rules': json.loads(self.fee_rules) if self.fee_rules else None,
@@ -708,6 +794,110 @@ class ApplicationDocument(db.Model):
             'uploadedAt': self.uploaded_at.isoformat() if self.uploaded_at else None
         }
 
+class RuleSetVersion(db.Model):
+    """Published versions of a board's rules - the highest version is live"""
+    __tablename__ = 'rule_set_versions'
+    __table_args__ = (db.UniqueConstraint('board_id', 'version', name='uq_rule_set_board_version'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    board_id = db.Column(db.String(255), nullable=False, index=True)
+    version = db.Column(db.Integer, nullable=False)
+    rules = db.Column(db.Text, nullable=False)  # JSON array of rule dictionaries
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'board_id': self.board_id,
+            'version': self.version,
+            'rules': json.loads(self.rules) if self.rules else [],
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+# Rules are published to rule_set_versions; files under rules/ only seed boards
+# that have no published version yet
+rule_engine.store = DatabaseRuleStore(db, RuleSetVersion)
+
+class RenderedForm(db.Model):
+    """Materialized ApplicationType.to_dict() JSON served by the catalog endpoints"""
+    __tablename__ = 'rendered_forms'
+    
+    application_type_id = db.Column(db.Integer, db.ForeignKey('application_type.id'), primary_key=True)
+    source_updated_at = db.Column(db.DateTime)  # ApplicationType.updated_at the payload was rendered from
+    field_ids = db.Column(db.Text)  # ',1,2,3,' - library fields the payload includes
+    payload = db.Column(db.Text, nullable=False)  # JSON of ApplicationType.to_dict()
+    rendered_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+# Stored payloads are dropped whenever their type or a referenced library field is written
+rendered_forms = RenderedFormCache(db, RenderedForm, field_resolver)
+rendered_forms.watch(ApplicationType, FieldLibrary)
+
+class MatchDecision(db.Model):
+    """Stored field-matching outcome for a normalized field name (see match_cache.py)"""
+    __tablename__ = 'match_decisions'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    matcher = db.Column(db.String(50), nullable=False)  # 'purpose_matcher', 'field_matcher'
+    normalized_name = db.Column(db.String(300), nullable=False)
+    field_type = db.Column(db.String(50), nullable=False, default='')
+    library_version = db.Column(db.String(50), nullable=False)  # MatchDecisionCache.library_version()
+    field_library_id = db.Column(db.Integer, index=True)  # NULL = no match
+    confidence = db.Column(db.Float, default=0.0)
+    match_type = db.Column(db.String(50))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_match_decisions_lookup', 'matcher', 'library_version', 'normalized_name', 'field_type'),
+    )
+
+# Decisions pointing at merged/deleted fields, or made before a matching-relevant edit, are dropped
+match_cache = MatchDecisionCache(db, MatchDecision, FieldLibrary)
+match_cache.watch()
+
+class Job(db.Model):
+    """Background job: queue entry, progress and result (see job_runner.py)"""
+    __tablename__ = 'jobs'
+    __bind_key__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(100), nullable=False)  # Endpoint that runs it, e.g. 'import_licensees_csv'
+    status = db.Column(db.String(20), nullable=False, default='queued', index=True)  # queued, running, succeeded, failed, cancelled
+    request_data = db.Column(db.Text)  # JSON: path, method, query string, content type and view args to replay
+    body_path = db.Column(db.String(500))  # Spooled request body (removed when the job ends)
+    progress = db.Column(db.Text)  # JSON progress counters
+    errors = db.Column(db.Text)  # JSON list of partial errors
+    result = db.Column(db.Text)  # JSON response of the endpoint
+    result_status = db.Column(db.Integer)  # HTTP status of that response
+    error = db.Column(db.Text)  # Why the job failed or was cancelled
+    cancel_requested = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'progress': json.loads(self.progress) if self.progress else {},
+            'errors': json.loads(self.errors) if self.errors else [],
+            'result': json.loads(self.result) if self.result else None,
+            'result_status': self.result_status,
+            'error': self.error,
+            'cancel_requested': bool(self.cancel_requested),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+# Imports run inline, or as jobs with ?background=true. One worker by default:
+# SQLite has a single writer, so concurrent imports would only wait on each other
+job_runner = JobRunner(
+    app, db, Job,
+    spool_dir=os.path.join(os.path.dirname(__file__), '..', 'storage', 'jobs'),
+    max_workers=int(os.environ.get('JOB_WORKERS', 1))
+)
+
 # ============================================================================
 # AUTHENTICATION ENDPOINTS
 # ============================================================================
@@ -1049,6 +1239,7 @@ def create_user():
     return jsonify(user.to_dict()), 201
 
 @app.route('/api/users/bulk-import', methods=['POST'])
+@job_runner.background
 def bulk_import_users():
     data = request.json
     users_data = data.get('users', [])
@@ -1056,7 +1247,9 @@ def bulk_import_users():
     imported = 0
     errors = []
     
-    for user_data in users_data:
+    for i, user_data in enumerate(users_data):
+        if i % 500 == 0:
+            job_runner.report(processed=i, total=len(users_data), imported=imported, errors=errors)
         try:
             # Check if user already exists by email
             email = user_data.get('email', '').strip()
@@ -1122,10 +1315,25 @@ def bulk_import_users():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def csv_parse_workers():
+    """Parser worker processes for a CSV import: ?parallel=true uses every core (see parallel_csv.py)"""
+    return None if request.args.get('parallel') in ('1', 'true') else 0
+
 @app.route('/api/users/import-csv', methods=['POST'])
+@job_runner.background
 def import_licensees_csv():
-    """Import licensees from CSV file"""
+    """
+    Import licensees from CSV file
+    
+    Accepts the CSV as a 'file' multipart upload or a text/csv request body
+    (streamed and written in batches, see import_licensees_csv_stream), or as
+    'csvContent' in a JSON body. ?parallel=true validates rows in a process pool.
+    """
     try:
+        upload = request.files.get('file')
+        if upload is not None or request.mimetype == 'text/csv':
+            return import_licensees_csv_stream(upload.stream if upload is not None else request.stream)
+        
         data = request.json
         csv_content = data.get('csvContent', '')
         
@@ -1136,12 +1344,13 @@ def import_licensees_csv():
         from licensee_csv_parser import LicenseeCSVParser
         
         # Parse CSV
-        parser = LicenseeCSVParser()
+        parser = LicenseeCSVParser(workers=csv_parse_workers())
         result = parser.parse(csv_content)
         
         licensees = result['licensees']
         parse_errors = result['errors']
         parse_warnings = result['warnings']
+        job_runner.report(rows=result['stats']['total_rows'], errors=parse_errors)
         
         if parse_errors:
             return jsonify({
@@ -1150,76 +1359,14 @@ def import_licensees_csv():
                 'warnings': parse_warnings
             }), 400
         
-        # Import licensees into database
-        imported = 0
-        updated = 0
-        skipped = 0
-        db_errors = []
-        
-        for licensee_data in licensees:
-            try:
-                # Check if user already exists by license number or email
-                license_num = licensee_data.get('licenseNumber')
-                email = licensee_data.get('email')
-                
-                existing_user = None
-                if license_num:
-                    existing_user = User.query.filter_by(licenseNumber=license_num).first()
-                if not existing_user and email:
-                    existing_user = User.query.filter_by(email=email).first()
-                
-                if existing_user:
-                    # Update existing user
-                    existing_user.first_name = licensee_data.get('first_name', existing_user.first_name)
-                    existing_user.last_name = licensee_data.get('last_name', existing_user.last_name)
-                    existing_user.email = licensee_data.get('email', existing_user.email)
-                    existing_user.phone = licensee_data.get('phone', existing_user.phone)
-                    existing_user.address = licensee_data.get('address', existing_user.address)
-                    existing_user.city = licensee_data.get('city', existing_user.city)
-                    existing_user.state = licensee_data.get('state', existing_user.state)
-                    existing_user.zipCode = licensee_data.get('zipCode', existing_user.zipCode)
-                    existing_user.licenseNumber = licensee_data.get('licenseNumber', existing_user.licenseNumber)
-                    existing_user.licenseType = licensee_data.get('licenseType', existing_user.licenseType)
-                    existing_user.licenseStatus = licensee_data.get('licenseStatus', existing_user.licenseStatus)
-                    existing_user.issueDate = licensee_data.get('issueDate', existing_user.issueDate)
-                    existing_user.expirationDate = licensee_data.get('expirationDate', existing_user.expirationDate)
-                    updated += 1
-                else:
-                    # Create new user
-                    username = licensee_data.get('username', email.split('@')[0])
-                    # Make username unique if it already exists
-                    base_username = username
-                    counter = 1
-                    while User.query.filter_by(username=username).first():
-                        username = f"{base_username}{counter}"
-                        counter += 1
-                    
-                    user = User(
-                        username=username,
-                        email=licensee_data.get('email'),
-                        password_hash='temp_hash',  # Temporary password hash
-                        first_name=licensee_data.get('first_name', ''),
-                        last_name=licensee_data.get('last_name', ''),
-                        phone=licensee_data.get('phone'),
-                        address=licensee_data.get('address'),
-                        city=licensee_data.get('city'),
-                        state=licensee_data.get('state'),
-                        zipCode=licensee_data.get('zipCode'),
-                        licenseNumber=licensee_data.get('licenseNumber'),
-                        licenseType=licensee_data.get('licenseType'),
-                        licenseStatus=licensee_data.get('licenseStatus', 'Active'),
-                        issueDate=licensee_data.get('issueDate'),
-                        expirationDate=licensee_data.get('expirationDate')
-                    )
-                    db.session.add(user)
-                    imported += 1
-                    
-            except Exception as e:
-                db_errors.append({
-                    'licenseNumber': licensee_data.get('licenseNumber'),
-                    'error': str(e)
-                })
-                skipped += 1
+        # Import licensees into database: set-based lookups and bulk writes,
+        # committed as one transaction below
+        from licensee_import import LicenseeBulkImporter
+        outcome = LicenseeBulkImporter(db, User).upsert(licensees)
+        imported = outcome['imported']
+        updated = outcome['updated']
+        skipped = outcome['skipped']
+        db_errors = outcome['errors']
         
         # Commit all changes
         try:
@@ -1249,6 +1396,62 @@ def import_licensees_csv():
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def import_licensees_csv_stream(stream):
+    """
+    Streaming licensee import: rows are parsed lazily and written in fixed-size
+    batches, so memory stays flat regardless of file size. The import is still
+    one transaction - any parse error rolls everything back, as before.
+    """
+    import io
+    from licensee_csv_parser import LicenseeCSVParser
+    from licensee_import import LicenseeBulkImporter
+    
+    parser = LicenseeCSVParser(workers=csv_parse_workers())
+    csv_file = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    batch_size = request.args.get('batch_size', type=int)
+    
+    def log_progress(totals):
+        app.logger.info(f"[LICENSEE_IMPORT] batch {totals['batches']}: {totals['rows']} rows "
+                        f"({totals['imported']} new, {totals['updated']} updated, {totals['skipped']} skipped)")
+        job_runner.report(errors=parser.errors, **totals)
+    
+    outcome = LicenseeBulkImporter(db, User).upsert_stream(
+        parser.iter_licensees(csv_file), batch_size=batch_size, progress=log_progress
+    )
+    
+    if parser.errors:
+        db.session.rollback()
+        return jsonify({
+            'error': 'CSV parsing failed',
+            'errors': parser.errors,
+            'warnings': parser.warnings
+        }), 400
+    
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({
+            'error': 'Database commit failed',
+            'message': str(e)
+        }), 500
+    
+    imported, updated, skipped = outcome['imported'], outcome['updated'], outcome['skipped']
+    return jsonify({
+        'success': True,
+        'message': f'CSV import completed: {imported} new, {updated} updated, {skipped} skipped',
+        'stats': {
+            'total_rows': parser.stats['total_rows'],
+            'imported': imported,
+            'updated': updated,
+            'skipped': skipped,
+            'duplicates': parser.stats['duplicates'],
+            'batches': outcome['batches']
+        },
+        'warnings': parser.warnings,
+        'errors': outcome['errors']
+    }), 201
+
 @app.route('/api/users/<int:user_id>', methods=['DELETE'])
 def delete_user(user_id):
     """Delete a user/licensee"""
@@ -1268,6 +1471,55 @@ def delete_user(user_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Recent background jobs, newest first (?status=, ?type=, ?limit=)"""
+    try:
+        jobs = job_runner.recent(
+            status=request.args.get('status'),
+            job_type=request.args.get('type'),
+            limit=min(request.args.get('limit', 50, type=int), 500)
+        )
+        return jsonify([job.to_dict() for job in jobs]), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """Status, progress counters, partial errors and (once finished) result of a job"""
+    try:
+        job = job_runner.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        return jsonify(job.to_dict()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<int:job_id>', methods=['DELETE'])
+def cancel_job(job_id):
+    """Cancel a queued job, or ask a running one to stop (its writes are rolled back)"""
+    try:
+        job = job_runner.get(job_id)
+        if not job:
+            return jsonify({'error': 'Job not found'}), 404
+        
+        outcome = job_runner.cancel(job_id)
+        if outcome is None:
+            return jsonify({'error': f'Job is already {job.status}'}), 409
+        
+        db.session.refresh(job)
+        return jsonify({
+            'success': True,
+            'message': 'Job cancelled' if outcome == 'cancelled' else 'Cancellation requested',
+            'job': job.to_dict()
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # ============================================================================
 # DOCUMENT MANAGEMENT
 # ============================================================================
@@ -1415,6 +1667,7 @@ def delete_document(document_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/documents/bulk-import-zip', methods=['POST'])
+@job_runner.background
 def bulk_import_documents_zip():
     """
     Bulk import documents from ZIP file
@@ -1461,6 +1714,11 @@ def bulk_import_documents_zip():
                     if filename == 'upload.zip' or filename.startswith('.'):
                         continue
                     
+                    if stats['total_files'] % 100 == 0:
+                        job_runner.report(
+                            total_files=stats['total_files'], imported=stats['imported'],
+                            skipped=stats['skipped'], errors=stats['errors']
+                        )
                     stats['total_files'] += 1
                     
                     # Get relative path from temp_dir
@@ -1634,10 +1892,28 @@ def submit_application(submission_id):
         submission.submitted_at = datetime.utcnow()
         db.session.commit()
         
+        # Re-derive what the portal's conditional logic showed (informational only:
+        # the submission is already committed, so a failure here must not fail the request)
+        conditional_state = None
+        app_type = submission.application_type
+        if app_type and app_type.conditional_rules:
+            try:
+                from conditional_logic_evaluator import ConditionalLogicEvaluator
+                evaluator = ConditionalLogicEvaluator.for_application_type(app_type)
+                conditional_state = evaluator.effective_form(
+                    json.loads(submission.form_data) if submission.form_data else {},
+                    app_type.get_required_field_keys(),
+                    app_type.base_fee or 0
+                )
+            except Exception as e:
+                app.logger.error(f"[SUBMIT] Conditional logic evaluation failed for submission {submission_id}: {str(e)}")
+                conditional_state = None
+        
         return jsonify({
             'success': True,
             'message': 'Application submitted successfully',
-            'submission': submission.to_dict()
+            'submission': submission.to_dict(),
+            'conditionalState': conditional_state
         }), 200
         
     except Exception as e:
@@ -1840,19 +2116,101 @@ def evaluate_rules():
         data = request.json
         application_data = data.get('application_data', {})
         rule_type = data.get('rule_type', 'all')
-        
-        results = rule_engine.evaluate_rules(application_data, rule_type)
+        trace = bool(data.get('trace', False))
+        
+        if 'changes' in data:
+            # Incremental re-evaluation (e.g. wizard autosave): application_data is the
+            # record before the edit, changes holds only the edited fields. Match
+            # outcomes of untouched rules come from the engine's own state for that
+            # record; a previous_result sent by older clients is ignored
+            results = rule_engine.evaluate_incremental(application_data, data.get('changes') or {}, rule_type)
+        else:
+            results = rule_engine.evaluate_rules(application_data, rule_type, trace=trace)
         
         return jsonify(results), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/rules/evaluate-batch', methods=['POST'])
+def evaluate_rules_batch():
+    """Evaluate one board's rules against a list of application records in a single request"""
+    try:
+        data = request.json or {}
+        records = data.get('records', [])
+        board_id = data.get('board_id', 'default')
+        rule_type = data.get('rule_type', 'all')
+        capture_errors = data.get('capture_errors', True)
+        trace = bool(data.get('trace', False))
+        
+        if not isinstance(records, list):
+            return jsonify({'error': 'records must be a list'}), 400
+        
+        if data.get('mode') == 'columnar':
+            # Vectorized evaluation for large cohorts (requires numpy); it evaluates the
+            # cohort as a whole, so it has no per-record error capture or rule traces
+            if trace or data.get('capture_errors'):
+                return jsonify({'error': 'capture_errors and trace are not supported in columnar mode'}), 400
+            from columnar_rules import ColumnarRuleEvaluator
+            results = ColumnarRuleEvaluator(rule_engine).evaluate(records, board_id, rule_type)
+        else:
+            results = rule_engine.evaluate_many(records, board_id, rule_type, capture_errors=capture_errors, trace=trace)
+        
+        return jsonify({
+            'board_id': board_id,
+            'count': len(results),
+            'errors': sum(1 for r in results if 'error' in r),
+            'results': results
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rules/<board_id>/stats', methods=['GET'])
+def get_rule_stats(board_id):
+    """
+    Per-rule evaluation counters (evaluations, hit rate, cumulative time) for a board
+    
+    Every evaluation is counted only when the server runs with RULE_STATS=1;
+    otherwise only evaluations requested with trace=true are counted.
+    collect_stats in the response tells which applies.
+    """
+    try:
+        stats = rule_engine.get_stats(board_id)
+        return jsonify({
+            'board_id': board_id,
+            'collect_stats': rule_engine.collect_stats,
+            'stats': stats.get(board_id)
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rules/<board_id>/stats', methods=['DELETE'])
+def reset_rule_stats(board_id):
+    """Reset per-rule evaluation counters for a board"""
+    try:
+        rule_engine.reset_stats(board_id)
+        return jsonify({'message': 'Rule stats reset'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/rules/<board_id>/versions', methods=['GET'])
+def get_rule_versions(board_id):
+    """List published rule versions for a board, newest first"""
+    try:
+        return jsonify({'board_id': board_id, 'versions': rule_engine.store.list_versions(board_id)}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/rules/<board_id>', methods=['GET'])
 def get_rules(board_id):
     """Get all rules for a board"""
     try:
-        rules = rule_engine.load_rules(board_id)
-        return jsonify({'rules': rules}), 200
+        version = rule_engine.get_rules_version(board_id)
+        etag = make_etag('rules', board_id, version)
+        
+        def build():
+            return jsonify({'rules': rule_engine.load_rules(board_id), 'version': version})
+        
+        return conditional_response(etag, build, 'rules')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1866,7 +2224,10 @@ def save_rules(board_id):
         success = rule_engine.save_rules(board_id, rules)
         
         if success:
-            return jsonify({'message': 'Rules saved successfully'}), 200
+            return jsonify({
+                'message': 'Rules saved successfully',
+                'version': rule_engine.get_rules_version(board_id)
+            }), 200
         else:
             return jsonify({'error': 'Failed to save rules'}), 500
     except Exception as e:
@@ -1876,22 +2237,62 @@ def save_rules(board_id):
 # APPLICATION TYPE ENDPOINTS
 # ============================================================================
 
+def catalog_version(model, *criteria):
+    """[row count, latest updated_at] of a model's rows - changes whenever a row is added, edited or removed"""
+    count, latest = db.session.query(db.func.count(model.id), db.func.max(model.updated_at)).filter(*criteria).one()
+    return [count, latest.isoformat() if latest else None]
+
 @app.route('/api/application-types', methods=['GET'])
 def get_application_types():
-    """Get all application types (both active and draft for admin)"""
+    """
+    Get all application types (both active and draft for admin)
+    
+    Query params:
+        active_only: 'true' for the licensee portal
+        view: 'summary' for the lightweight list view (ApplicationType.to_summary_dict)
+        fields: Comma-separated keys to return, e.g. 'id,name,status,fieldCount';
+            forms are only expanded when a requested key needs it
+    """
     try:
         # Check if we should filter to active only (for licensee portal)
         active_only = request.args.get('active_only', 'false').lower() == 'true'
+        criteria = [ApplicationType.active == True] if active_only else []
+        view = request.args.get('view', 'full')
+        requested = [key.strip() for key in request.args.get('fields', '').split(',') if key.strip()]
         
-        if active_only:
-            app_types = ApplicationType.query.filter_by(active=True).all()
-        else:
-            app_types = ApplicationType.query.all()
+        # Rendered types embed library fields, so their edits change the ETag too
+        etag = make_etag('application-types', active_only, view, requested,
+                         catalog_version(ApplicationType, *criteria), catalog_version(FieldLibrary))
+        
+        def build_projection():
+            app_types = ApplicationType.query.filter(*criteria).all()
+            items = [app_type.to_summary_dict() for app_type in app_types]
             
-        return jsonify({
-            'success': True,
-            'applicationTypes': [at.to_dict() for at in app_types]
-        }), 200
+            # Keys outside the summary (e.g. 'fields', 'steps') come from the rendered form
+            if requested and not set(requested) <= set(ApplicationType.SUMMARY_FIELDS):
+                payloads = rendered_forms.get_payloads(app_types)
+                items = [dict(json.loads(payload), **item) for item, payload in zip(items, payloads)]
+            
+            if requested:
+                items = [{key: item[key] for key in requested if key in item} for item in items]
+            
+            return jsonify({
+                'success': True,
+                'applicationTypes': items
+            })
+        
+        def build():
+            if view == 'summary' or requested:
+                return build_projection()
+            
+            app_types = ApplicationType.query.filter(*criteria).all()
+            
+            # Stored renderings are served as-is; only changed types are re-rendered
+            payloads = rendered_forms.get_payloads(app_types)
+            body = '{"applicationTypes": [' + ', '.join(payloads) + '], "success": true}'
+            return app.response_class(body, status=200, mimetype='application/json')
+        
+        return conditional_response(etag, build, 'application_types')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1902,10 +2303,14 @@ def get_application_type(type_id):
         app_type = ApplicationType.query.get(type_id)
         if not app_type:
             return jsonify({'error': 'Application type not found'}), 404
-        return jsonify({
-            'success': True,
-            'applicationType': app_type.to_dict()
-        }), 200
+        
+        etag = make_etag('application-type', type_id, app_type.updated_at, catalog_version(FieldLibrary))
+        
+        def build():
+            body = '{"applicationType": ' + rendered_forms.get_payload(app_type) + ', "success": true}'
+            return app.response_class(body, status=200, mimetype='application/json')
+        
+        return conditional_response(etag, build, 'application_types')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -1918,7 +2323,8 @@ def create_application_type():
         data = request.json
         fields = data.get('fields', [])
         
-        # Process fields using purpose matcher
+        # Process fields using purpose matcher (library loaded once for all fields)
+        matcher = PurposeMatcher.batch(FieldLibrary.query, match_cache.view('purpose_matcher'))
         field_references = []
         matched_count = 0
         created_count = 0
@@ -1928,11 +2334,7 @@ def create_application_type():
             field_type = field_data.get('type', 'text')
             
             # Try to match to existing UFL field
-            match, confidence, match_type = PurposeMatcher.find_match(
-                field_name,
-                field_type,
-                FieldLibrary.query
-            )
+            match, confidence, match_type = matcher.find_match(field_name, field_type)
             
             if match and confidence >= 0.5:
                 # MATCHED - Reuse existing field
@@ -1946,7 +2348,7 @@ def create_application_type():
                 category = PurposeMatcher.suggest_category(field_name, field_type)
                 
                 # Check if field_key already exists
-                existing = FieldLibrary.query.filter_by(field_key=field_key).first()
+                existing = matcher.get_by_key(field_key)
                 if existing:
                     # Use existing
                     field_library_id = existing.id
@@ -1970,6 +2372,7 @@ def create_application_type():
                     )
                     db.session.add(new_field)
                     db.session.flush()  # Get ID
+                    matcher.add(new_field)
                     field_library_id = new_field.id
             
             # Create field reference with board-specific overrides
@@ -2098,15 +2501,14 @@ def update_application_type(type_id):
                     })
             
             # Run PurposeMatcher to maintain Field Library linkage
+            matcher = PurposeMatcher.batch(FieldLibrary.query, match_cache.view('purpose_matcher'))
             field_references = []
             for i, field_data in enumerate(fields, 1):
                 field_name = field_data.get('name') or field_data.get('label', '')
                 field_type = field_data.get('type', 'text')
                 
                 # Try to match to existing UFL field
-                match, confidence, match_type = PurposeMatcher.find_match(
-                    field_name, field_type, FieldLibrary.query
-                )
+                match, confidence, match_type = matcher.find_match(field_name, field_type)
                 
                 if match and confidence >= 0.5:
                     field_library_id = match.id
@@ -2114,7 +2516,7 @@ def update_application_type(type_id):
                 else:
                     # Create new field in UFL
                     field_key = PurposeMatcher.suggest_field_key(field_name, field_type)
-                    existing = FieldLibrary.query.filter_by(field_key=field_key).first()
+                    existing = matcher.get_by_key(field_key)
                     
                     if existing:
                         field_library_id = existing.id
@@ -2135,6 +2537,7 @@ def update_application_type(type_id):
                         )
                         db.session.add(new_field)
                         db.session.flush()
+                        matcher.add(new_field)
                         field_library_id = new_field.id
                 
                 field_references.append({
@@ -2233,10 +2636,11 @@ def update_conditional_rules(type_id):
         if app_type.form_fields_v2:
             # Get fields from v2 format
             field_refs = json.loads(app_type.form_fields_v2)
+            field_rows = field_resolver.load_for_types([app_type])
             for ref in field_refs:
                 field_lib_id = ref.get('field_library_id')
                 if field_lib_id:
-                    field_lib = FieldLibrary.query.get(field_lib_id)
+                    field_lib = field_rows.get(field_lib_id)
                     if field_lib:
                         available_fields.append(field_lib.field_key)
         elif app_type.form_definition:
@@ -2248,15 +2652,27 @@ def update_conditional_rules(type_id):
                     if field_name:
                         available_fields.append(field_name)
         
-        # Validate rules
-        is_valid, errors = ConditionalRuleValidator.validate_rules(
-            json.dumps(rules), available_fields
-        )
+        if not isinstance(rules, list):
+            return jsonify({'error': 'Invalid rules', 'validation_errors': ['Rules must be an array']}), 400
         
-        if not is_valid:
+        # Validate rules (field list frozen into a set once for all rules)
+        context = ConditionalRuleValidator.context(available_fields)
+        errors = context.validate_rules(rules)
+        
+        if errors:
             return jsonify({
                 'error': 'Invalid rules',
-                'validation_errors': errors
+                'validation_errors': [context.format_error(error) for error in errors],
+                'errors': errors
+            }), 400
+        
+        # Reject chains of set_value/clear_value rules that feed back into themselves
+        cycles = ConditionalRuleValidator.detect_cycles(rules)
+        if cycles:
+            return jsonify({
+                'error': 'Circular rule dependencies',
+                'validation_errors': [f"Circular dependency: {' -> '.join(cycle)}" for cycle in cycles],
+                'cycles': cycles
             }), 400
         
         # Detect conflicts
@@ -2267,6 +2683,9 @@ def update_conditional_rules(type_id):
         app_type.updated_at = datetime.utcnow()
         db.session.commit()
         
+        from conditional_logic_evaluator import ConditionalLogicEvaluator
+        ConditionalLogicEvaluator.clear_cache(type_id)
+        
         return jsonify({
             'success': True,
             'message': 'Conditional rules updated successfully',
@@ -2276,6 +2695,51 @@ def update_conditional_rules(type_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/application-types/<int:type_id>/conditional-rules/revalidate', methods=['POST'])
+def revalidate_conditional_rules(type_id):
+    """Re-evaluate the current conditional rules against every submitted application of a type"""
+    try:
+        from conditional_logic_evaluator import ConditionalLogicEvaluator
+        
+        app_type = ApplicationType.query.get(type_id)
+        if not app_type:
+            return jsonify({'error': 'Application type not found'}), 404
+        
+        data = request.json or {}
+        include_all = data.get('include_all', False)
+        
+        submissions = ApplicationSubmission.query.filter(
+            ApplicationSubmission.application_type_id == type_id,
+            ApplicationSubmission.status != 'draft'
+        ).all()
+        
+        evaluator = ConditionalLogicEvaluator.for_application_type(app_type)
+        results = evaluator.evaluate_many(
+            [(s.id, json.loads(s.form_data) if s.form_data else {}) for s in submissions],
+            app_type.get_required_field_keys(),
+            app_type.base_fee or 0
+        )
+        
+        report = []
+        for result in results:
+            if not include_all and not result['missingRequired']:
+                continue
+            report.append({
+                'submission_id': result['key'],
+                'missingRequired': result['missingRequired'],
+                'hiddenFields': result['hiddenFields'],
+                'totalFee': result['totalFee']
+            })
+        
+        return jsonify({
+            'success': True,
+            'checked': len(results),
+            'incomplete': sum(1 for r in results if r['missingRequired']),
+            'submissions': report
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/application-types/validate-rule', methods=['POST'])
 def validate_conditional_rule():
     """Validate a conditional rule before saving"""
@@ -2428,6 +2892,7 @@ def import_application_types():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/application-types/import-csv', methods=['POST'])
+@job_runner.background
 def import_csv():
     """Import application type from CSV file with UFL integration"""
     try:
@@ -2442,8 +2907,10 @@ def import_csv():
             return jsonify({'error': 'Application name is required'}), 400
         
         # Parse CSV with UFL integration
-        parser = CSVParser(db.session)
+        job_runner.report(stage='matching_fields')
+        parser = CSVParser(db.session, workers=csv_parse_workers())
         result = parser.create_application_type_from_csv(csv_content, application_name)
+        job_runner.report(stage='saving', total_fields=result.get('total_count', 0), errors=result.get('errors', []))
         
         if not result['success']:
             return jsonify(result), 400
@@ -2588,8 +3055,13 @@ def get_field_library():
                 )
             )
         
-        fields = query.order_by(FieldLibrary.usage_count.desc()).all()
-        return jsonify([f.to_dict() for f in fields])
+        etag = make_etag('field-library', category, search, catalog_version(FieldLibrary))
+        
+        def build():
+            fields = query.order_by(FieldLibrary.usage_count.desc()).all()
+            return jsonify([f.to_dict() for f in fields])
+        
+        return conditional_response(etag, build, 'field_library')
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2653,6 +3125,22 @@ def match_field_to_library():
     try:
         data = request.json
         
+        if data.get('mode') == 'bulk':
+            # Vectorized matching of many columns at once (requires numpy)
+            from bulk_field_matcher import BulkFieldMatcher
+            columns = data.get('columns', [])
+            if not isinstance(columns, list):
+                return jsonify({'error': 'columns must be a list'}), 400
+            
+            matcher = BulkFieldMatcher.for_query(FieldLibrary.query)
+            # One entry per column in request order (labels can repeat across entities)
+            results = matcher.match(columns, top_k=data.get('top_k', 5), min_score=data.get('min_score', 0.5))
+            return jsonify({
+                'count': len(results),
+                'matched': sum(1 for result in results if result['matches']),
+                'results': results
+            }), 200
+        
         # Generate field_key from name
         field_name = data.get('name', '')
         field_key = re.sub(r'[^a-z0-9_]', '', field_name.lower().replace(' ', '_').replace('-', '_'))
@@ -2765,6 +3253,7 @@ def analyze_field_library_import():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/field-library/import/execute', methods=['POST'])
+@job_runner.background
 def execute_field_library_import():
     """Execute Field Library import with specified merge strategy"""
     try:
@@ -2789,6 +3278,7 @@ def execute_field_library_import():
         
         # Detect import type
         import_type = importer.detect_import_type(csv_content)
+        job_runner.report(stage='importing', import_type=import_type)
         
         if import_type == 'reference_data':
             result = importer.import_reference_data(
@@ -2821,40 +3311,52 @@ def get_form_templates():
         conn = db.engine.raw_connection()
         cursor = conn.cursor()
         
+        # Templates carry their own updated_at; only re-read them when that moves
         cursor.execute("""
-            SELECT id, name, description, template_type, fields, sections, is_active
+            SELECT COUNT(*), MAX(id), MAX(updated_at)
             FROM form_templates
             WHERE is_active = 1
-            ORDER BY 
-                CASE template_type
-                    WHEN 'blank' THEN 1
-                    WHEN 'standard_license' THEN 2
-                    WHEN 'renewal' THEN 3
-                    WHEN 'endorsement' THEN 4
-                    WHEN 'temporary' THEN 5
-                    ELSE 99
-                END
         """)
-        
-        templates = []
-        for row in cursor.fetchall():
-            templates.append({
-                'id': row[0],
-                'name': row[1],
-                'description': row[2],
-                'template_type': row[3],
-                'fields': json.loads(row[4]) if row[4] else [],
-                'sections': json.loads(row[5]) if row[5] else [],
-                'is_active': bool(row[6])
+        etag = make_etag('form-templates', *cursor.fetchone())
+        
+        def build():
+            cursor.execute("""
+                SELECT id, name, description, template_type, fields, sections, is_active
+                FROM form_templates
+                WHERE is_active = 1
+                ORDER BY 
+                    CASE template_type
+                        WHEN 'blank' THEN 1
+                        WHEN 'standard_license' THEN 2
+                        WHEN 'renewal' THEN 3
+                        WHEN 'endorsement' THEN 4
+                        WHEN 'temporary' THEN 5
+                        ELSE 99
+                    END
+            """)
+            
+            templates = []
+            for row in cursor.fetchall():
+                templates.append({
+                    'id': row[0],
+                    'name': row[1],
+                    'description': row[2],
+                    'template_type': row[3],
+                    'fields': json.loads(row[4]) if row[4] else [],
+                    'sections': json.loads(row[5]) if row[5] else [],
+                    'is_active': bool(row[6])
+                })
+            
+            return jsonify({
+                'success': True,
+                'templates': templates
             })
         
-        cursor.close()
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'templates': templates
-        }), 200
+        try:
+            return conditional_response(etag, build, 'form_templates')
+        finally:
+            cursor.close()
+            conn.close()
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -2923,6 +3425,58 @@ def check_field_duplicate():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/field-library/duplicates', methods=['GET'])
+def stream_field_library_duplicates():
+    """
+    Audit the whole field library for duplicates
+    Streams NDJSON: one line per duplicate pair as soon as it is scored, then a
+    summary line, so large libraries never hold the response until the end
+    """
+    try:
+        from field_deduplication import DuplicateScanner
+        
+        min_similarity = request.args.get('min_similarity', 0.9, type=float)
+        workers = request.args.get('workers', type=int)
+        if not 0 < min_similarity <= 1:
+            return jsonify({'error': 'min_similarity must be between 0 and 1'}), 400
+        
+        scanner = DuplicateScanner(min_similarity=min_similarity, workers=workers)
+        rows = scanner.load_rows(FieldLibrary.query.order_by(FieldLibrary.id))
+        
+        def generate():
+            count = 0
+            for pair in scanner.scan(rows):
+                count += 1
+                yield json.dumps({
+                    'field1': scanner.field_summary(rows[pair['field1_index']]),
+                    'field2': scanner.field_summary(rows[pair['field2_index']]),
+                    'similarity': pair['similarity'],
+                    'match_type': pair['match_type']
+                }) + '\n'
+            yield json.dumps({'done': True, 'fields_scanned': len(rows), 'duplicates_found': count}) + '\n'
+        
+        return app.response_class(generate(), status=200, mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/field-library/match-cache/stats', methods=['GET'])
+def get_match_cache_stats():
+    """Match decision cache hit/miss counters (per process) and stored decision count"""
+    try:
+        return jsonify(match_cache.get_stats()), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/field-library/match-cache', methods=['DELETE'])
+def clear_match_cache():
+    """Drop every stored match decision and reset the counters"""
+    try:
+        match_cache.invalidate()
+        match_cache.reset_stats()
+        return jsonify({'message': 'Match decision cache cleared'}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/field-library/create-from-form', methods=['POST'])
 def create_field_from_form():
     """Create a new field in Field Library from Form Builder"""
@@ -3547,7 +4101,7 @@ def extract_pdf():
         try:
             # Extract interview structure using AI
             from pdf_interview_extractor import PDFInterviewExtractor
-            extractor = PDFInterviewExtractor(db=db, FieldLibrary=FieldLibrary)
+            extractor = PDFInterviewExtractor(db=db, FieldLibrary=FieldLibrary, match_cache=match_cache)
             interview_data = extractor.extract_interview_from_pdf(tmp_path)
             
             # Create application type with extracted data
@@ -3616,7 +4170,7 @@ def parse_pdf():
             # Use your enhanced PDF parser
             from pdf_interview_extractor import PDFInterviewExtractor
             
-            extractor = PDFInterviewExtractor(db=db, FieldLibrary=FieldLibrary)
+            extractor = PDFInterviewExtractor(db=db, FieldLibrary=FieldLibrary, match_cache=match_cache)
             
             # enable_smart_features=True gives you conditional logic, etc.
             result = extractor.extract_interview_from_pdf(tmp_path, enable_smart_features=True)
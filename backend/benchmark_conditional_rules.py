@@ -0,0 +1,205 @@
+"""
+Conditional Rule Validation Benchmark
+Measures how validating conditional rules on save scales with form size
+
+Generates forms with F fields and R valid rules (each rule references a
+trigger field and a few target fields, as business license forms do), then
+times:
+- per-rule:  the list-based validate_rule() that ConditionalRuleValidator
+             had before validation contexts (copied below as
+             list_validate_rule), called once per rule with the field list
+- context:   one RuleValidationContext over the fields, validating all rules
+             in a single pass (what update_conditional_rules does)
+
+The baseline is a copy of the old implementation rather than today's
+ConditionalRuleValidator.validate_rule(). That method now delegates to a
+per-call RuleValidationContext, so timing it would not show before/after.
+
+Usage:
+    python benchmark_conditional_rules.py [--fields 50,100,200,400,800]
+                                          [--rules 50,100,200,400,800] [--repeat 5] [--seed 42]
+"""
+
+import argparse
+import random
+import time
+from typing import Dict, List, Any, Tuple
+
+from conditional_rule_validator import RuleValidationContext
+
+ACTIONS = ['show', 'hide', 'enable', 'disable', 'set_required', 'set_optional', 'set_value', 'clear_value']
+
+# The list-based validator as it was before RuleValidationContext (baseline only)
+LIST_CONDITIONS = [
+    'equals', 'not_equals', 'contains', 'not_contains', 'greater_than', 'less_than',
+    'greater_than_or_equal', 'less_than_or_equal', 'is_empty', 'is_not_empty', 'in_list', 'not_in_list'
+]
+LIST_ACTIONS = [
+    'show', 'hide', 'enable', 'disable', 'set_required', 'set_optional', 'set_value', 'clear_value', 'calculate_fee'
+]
+
+
+def list_validate_rule(rule: Dict[str, Any], available_fields: List[str]) -> Tuple[bool, str]:
+    """ConditionalRuleValidator.validate_rule() before validation contexts (list membership tests)"""
+    if 'id' not in rule:
+        return False, "Rule must have an 'id' field"
+    if 'trigger_field' not in rule:
+        return False, "Rule must have a 'trigger_field'"
+    if 'trigger_condition' not in rule:
+        return False, "Rule must have a 'trigger_condition'"
+    if 'actions' not in rule or not isinstance(rule['actions'], list):
+        return False, "Rule must have an 'actions' array"
+    if rule['trigger_field'] not in available_fields:
+        return False, f"Trigger field '{rule['trigger_field']}' does not exist in form"
+    if rule['trigger_condition'] not in LIST_CONDITIONS:
+        return False, f"Invalid trigger condition: '{rule['trigger_condition']}'"
+
+    value_required_conditions = [
+        'equals', 'not_equals', 'contains', 'not_contains',
+        'greater_than', 'less_than', 'greater_than_or_equal',
+        'less_than_or_equal', 'in_list', 'not_in_list'
+    ]
+    if rule['trigger_condition'] in value_required_conditions:
+        if 'trigger_value' not in rule:
+            return False, f"Condition '{rule['trigger_condition']}' requires 'trigger_value'"
+
+    if len(rule['actions']) == 0:
+        return False, "Rule must have at least one action"
+    for action in rule['actions']:
+        is_valid, error = list_validate_action(action, available_fields)
+        if not is_valid:
+            return False, error
+    return True, ""
+
+
+def list_validate_action(action: Dict[str, Any], available_fields: List[str]) -> Tuple[bool, str]:
+    """ConditionalRuleValidator._validate_action() before validation contexts"""
+    if 'action' not in action:
+        return False, "Action must have an 'action' field"
+    action_type = action['action']
+    if action_type not in LIST_ACTIONS:
+        return False, f"Invalid action type: '{action_type}'"
+
+    field_required_actions = [
+        'show', 'hide', 'enable', 'disable',
+        'set_required', 'set_optional', 'set_value', 'clear_value'
+    ]
+    if action_type in field_required_actions:
+        if 'target_fields' not in action or not isinstance(action['target_fields'], list):
+            return False, f"Action '{action_type}' requires 'target_fields' array"
+        if len(action['target_fields']) == 0:
+            return False, f"Action '{action_type}' must have at least one target field"
+        for field_name in action['target_fields']:
+            if field_name not in available_fields:
+                return False, f"Target field '{field_name}' does not exist in form"
+
+    if action_type == 'set_value':
+        if 'value' not in action:
+            return False, "Action 'set_value' requires 'value' field"
+
+    if action_type == 'calculate_fee':
+        if 'fee_modifier' not in action:
+            return False, "Action 'calculate_fee' requires 'fee_modifier' field"
+        fee_modifier = action['fee_modifier']
+        if 'type' not in fee_modifier or fee_modifier['type'] not in ['discount', 'surcharge', 'override']:
+            return False, "fee_modifier must have valid 'type' (discount, surcharge, or override)"
+        if 'amount' not in fee_modifier:
+            return False, "fee_modifier must have 'amount' field"
+        if 'unit' not in fee_modifier or fee_modifier['unit'] not in ['percent', 'fixed']:
+            return False, "fee_modifier must have valid 'unit' (percent or fixed)"
+    return True, ""
+
+
+def generate_fields(count: int) -> List[str]:
+    return [f'field_{i}' for i in range(count)]
+
+
+def generate_rules(fields: List[str], count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Valid rules spread over the whole field list"""
+    rng = random.Random(seed)
+    rules = []
+    for i in range(count):
+        actions = []
+        for _ in range(rng.randint(1, 3)):
+            action_type = rng.choice(ACTIONS)
+            action = {'action': action_type, 'target_fields': rng.sample(fields, k=min(len(fields), rng.randint(1, 4)))}
+            if action_type == 'set_value':
+                action['value'] = 'Yes'
+            actions.append(action)
+        rules.append({
+            'id': f'rule-{i}',
+            'trigger_field': rng.choice(fields),
+            'trigger_condition': 'equals',
+            'trigger_value': 'Yes',
+            'actions': actions
+        })
+    return rules
+
+
+def best_of(repeat: int, workload) -> float:
+    """Fastest of several runs, in seconds"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        workload()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def bench(field_count: int, rule_count: int, repeat: int, seed: int) -> Dict[str, Any]:
+    fields = generate_fields(field_count)
+    rules = generate_rules(fields, rule_count, seed)
+
+    def per_rule():
+        for rule in rules:
+            is_valid, error = list_validate_rule(rule, fields)
+            assert is_valid, error
+
+    def context():
+        errors = RuleValidationContext(fields).validate_rules(rules)
+        assert not errors, errors
+
+    per_rule_time = best_of(repeat, per_rule)
+    context_time = best_of(repeat, context)
+    speedup = per_rule_time / context_time if context_time else 0
+
+    print(f"  {field_count:>6} {rule_count:>6}   per-rule {per_rule_time * 1000:>9.3f} ms   "
+          f"context {context_time * 1000:>9.3f} ms   x{speedup:>6.1f}")
+    return {
+        'fields': field_count,
+        'rules': rule_count,
+        'per_rule_ms': per_rule_time * 1000,
+        'context_ms': context_time * 1000,
+        'speedup': speedup
+    }
+
+
+def run_benchmark(field_counts: List[int], rule_counts: List[int], repeat: int = 5, seed: int = 42) -> List[Dict]:
+    print("=" * 90)
+    print("CONDITIONAL RULE VALIDATION BENCHMARK")
+    print("=" * 90)
+    print(f"  {'fields':>6} {'rules':>6}")
+
+    results = []
+    for field_count in field_counts:
+        for rule_count in rule_counts:
+            results.append(bench(field_count, rule_count, repeat, seed))
+
+    print("=" * 90)
+    return results
+
+
+def parse_counts(spec: str) -> List[int]:
+    return [int(part) for part in spec.split(',') if part.strip()]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark conditional rule validation')
+    parser.add_argument('--fields', default='50,100,200,400,800', help='Comma-separated form field counts')
+    parser.add_argument('--rules', default='50,100,200,400,800', help='Comma-separated rule counts')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement (fastest is reported)')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for reproducible runs')
+    args = parser.parse_args()
+
+    run_benchmark(parse_counts(args.fields), parse_counts(args.rules), args.repeat, args.seed)
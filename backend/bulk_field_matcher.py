@@ -0,0 +1,334 @@
+"""
+Bulk Field Matcher
+Vectorized Field Library matching for board onboarding jobs using NumPy
+
+Mapping thousands of Thentia attributes against the Field Library one
+SequenceMatcher call per pair is far too slow. Here every name is encoded as a
+character trigram count vector, the library is encoded once, and a whole batch
+of source columns is scored against the whole library at once (cosine
+similarity). PurposeMatcher's keyword bonuses are computed for all (column,
+library field) pairs with array operations and added on top.
+
+A name has a few dozen trigrams out of a vocabulary of thousands, so vectors
+are kept sparse: the library as per-trigram postings, a chunk of columns as
+(row, trigram, weight) entries. Only the chunk's (columns x library) score
+matrix is ever dense.
+"""
+
+import threading
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from ngram_index import ngrams
+from purpose_matcher import PurposeMatcher
+
+# Thentia attribute datatypes -> Field Library field types
+THENTIA_FIELD_TYPES = {
+    'basic-string': 'text',
+    'textarea': 'textarea',
+    'date': 'date',
+    'datetime': 'date',
+    'integer': 'number',
+    'float': 'number',
+    'money': 'number',
+    'phone': 'phone',
+    'email': 'email',
+    'lookup': 'select',
+    'radio': 'radio',
+    'url': 'text',
+}
+
+
+def thentia_columns(metadata: Any) -> List[Dict[str, Any]]:
+    """
+    Source columns from Thentia entity metadata
+
+    Walks any Thentia export (combined_thentia_data.json,
+    azbtr_tc_entitymetadata.json) for 'attributes' maps and returns one column
+    per attribute: {'name': label, 'type': field type, 'external_field_name': attribute}.
+    """
+    columns = []
+    seen = set()
+    stack = [metadata]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            attributes = node.get('attributes')
+            if isinstance(attributes, dict):
+                for attribute_name, attribute in attributes.items():
+                    if not isinstance(attribute, dict) or 'labelname' not in attribute or attribute_name in seen:
+                        continue
+                    seen.add(attribute_name)
+                    columns.append({
+                        'name': attribute.get('labelname') or attribute_name,
+                        'type': THENTIA_FIELD_TYPES.get(attribute.get('datatype'), 'text'),
+                        'external_field_name': attribute_name
+                    })
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+    return columns
+
+
+class BulkFieldMatcher:
+    """
+    Scores many source columns against the Field Library at once
+
+    Args:
+        field_library_query: Query over FieldLibrary (encoded once, on construction)
+
+    The encoded library is read-only after construction. for_query() shares
+    one matcher per model for the plain library query and rebuilds it when the
+    library version (row count, latest updated_at) moves.
+
+    A column's score against a library field is the trigram cosine similarity of
+    its normalized name with the field's key or canonical name (whichever is
+    higher), plus PURPOSE_WEIGHT times PurposeMatcher.find_match's score for the
+    pair when that score reaches find_match's 0.5 threshold. Scores are capped
+    at 1.0.
+    """
+
+    PURPOSE_WEIGHT = 0.25
+
+    # Source columns scored at once (bounds the dense chunk x library score matrices)
+    CHUNK_SIZE = 256
+
+    _shared = {}
+    _lock = threading.Lock()
+
+    def __init__(self, field_library_query):
+        model = field_library_query.column_descriptions[0]['entity']
+        rows = field_library_query.with_entities(
+            model.id, model.field_key, model.canonical_name, model.field_type, model.category
+        ).all()
+        self.fields = [
+            {'id': row[0], 'field_key': row[1], 'canonical_name': row[2], 'field_type': row[3], 'category': row[4]}
+            for row in rows
+        ]
+
+        key_texts = [PurposeMatcher.normalize_field_name((field['field_key'] or '').replace('_', ' ')) for field in self.fields]
+        name_texts = [PurposeMatcher.normalize_field_name(field['canonical_name'] or '') for field in self.fields]
+
+        self.vocabulary: Dict[str, int] = {}
+        for text in key_texts + name_texts:
+            for gram in ngrams(text):
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+
+        self.key_postings = self._postings(key_texts)
+        self.name_postings = self._postings(name_texts)
+        self.normalized_keys = np.array([PurposeMatcher.normalize_field_name(field['field_key'] or '') for field in self.fields], dtype=object)
+        self.field_types = np.array([field['field_type'] for field in self.fields], dtype=object)
+        self._prepare_purposes([field['field_key'] or '' for field in self.fields], name_texts)
+        self.version = None
+
+    @classmethod
+    def for_query(cls, field_library_query):
+        """
+        Matcher over the rows of a Field Library query
+
+        Filtered queries get a one-off matcher; the plain library query (e.g.
+        FieldLibrary.query) shares one matcher per model until the library
+        version changes.
+        """
+        if field_library_query.whereclause is not None:
+            return cls(field_library_query)
+
+        model = field_library_query.column_descriptions[0]['entity']
+        version = tuple(field_library_query.with_entities(func.count(model.id), func.max(model.updated_at)).one())
+
+        with cls._lock:
+            matcher = cls._shared.get(model)
+            if matcher is None or matcher.version != version:
+                matcher = cls(field_library_query)
+                matcher.version = version
+                cls._shared[model] = matcher
+            return matcher
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._shared.clear()
+
+    def _encode(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Sparse L2-normalized trigram count vectors as (row, vocabulary column, weight) entries
+
+        Trigrams outside the vocabulary only count toward the norm.
+        """
+        rows, columns, weights = [], [], []
+        for row, text in enumerate(texts):
+            padded = f'$${text}$$'
+            counts: Dict[str, int] = {}
+            for i in range(len(padded) - 2):
+                gram = padded[i:i + 3]
+                counts[gram] = counts.get(gram, 0) + 1
+            norm = np.sqrt(sum(count * count for count in counts.values())) or 1.0
+            for gram, count in counts.items():
+                column = self.vocabulary.get(gram)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+                    weights.append(count / norm)
+        return (np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64),
+                np.array(weights, dtype=np.float32))
+
+    def _postings(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Library vectors grouped by vocabulary column: (column offsets, rows, weights)"""
+        rows, columns, weights = self._encode(texts)
+        order = np.argsort(columns, kind='stable')
+        offsets = np.zeros(len(self.vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(columns, minlength=len(self.vocabulary)), out=offsets[1:])
+        return offsets, rows[order], weights[order]
+
+    def _similarity(self, vectors: Tuple[np.ndarray, np.ndarray, np.ndarray], postings, n_rows: int) -> np.ndarray:
+        """Dense (n_rows x library) cosine similarities of encoded columns against library postings"""
+        rows, columns, weights = vectors
+        offsets, library_rows, library_weights = postings
+
+        # Every (column entry, library posting) pair sharing a trigram
+        starts = offsets[columns]
+        lengths = offsets[columns + 1] - starts
+        entry = np.repeat(np.arange(len(columns)), lengths)
+        posting = starts[entry] + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+        n_fields = len(self.fields)
+        similarity = np.bincount(
+            rows[entry] * n_fields + library_rows[posting],
+            weights=weights[entry] * library_weights[posting],
+            minlength=n_rows * n_fields
+        )
+        return similarity.reshape(n_rows, n_fields).astype(np.float32)
+
+    def _prepare_purposes(self, field_keys: List[str], name_texts: List[str]):
+        """Keyword/purpose matrices and each library field's find_match keyword score per purpose"""
+        self.purposes = list(PurposeMatcher.FIELD_PURPOSES.items())
+        keywords = sorted({keyword for _, purpose in self.purposes for keyword in purpose['keywords']})
+        self.keywords = np.array(keywords, dtype=str)
+
+        # purpose_keywords[p, w] = how often keyword w is listed for purpose p
+        self.purpose_keywords = np.zeros((len(self.purposes), len(keywords)), dtype=np.float32)
+        keyword_columns = {keyword: i for i, keyword in enumerate(keywords)}
+        for p, (_, purpose) in enumerate(self.purposes):
+            for keyword in purpose['keywords']:
+                self.purpose_keywords[p, keyword_columns[keyword]] += 1
+        self.purpose_types = np.array([purpose['field_type'] for _, purpose in self.purposes], dtype=object)
+        self.purpose_categories = np.array([purpose['category'] for _, purpose in self.purposes], dtype=object)
+
+        # find_match: +0.3 per purpose keyword in field_key, +0.2 per keyword in the canonical name
+        key_hits = self._contains(field_keys)
+        name_hits = self._contains(name_texts)
+        self.field_purpose_scores = (0.3 * key_hits + 0.2 * name_hits) @ self.purpose_keywords.T
+        categories = np.array([field['category'] for field in self.fields], dtype=object)
+        self.field_in_category = categories[:, None] == self.purpose_categories[None, :]
+
+    def _contains(self, texts: List[str]) -> np.ndarray:
+        """contains[i, w] = keyword w is a substring of texts[i]"""
+        if not texts:
+            return np.zeros((0, len(self.keywords)), dtype=np.float32)
+        text_array = np.array(texts, dtype=str)[:, None]
+        return (np.char.find(text_array, self.keywords[None, :]) >= 0).astype(np.float32)
+
+    def detect_purposes(self, names: List[str], field_types: List[Optional[str]]) -> np.ndarray:
+        """
+        PurposeMatcher.detect_purpose for many columns at once
+
+        Returns:
+            Purpose index per column (-1 where no purpose is detected)
+        """
+        if not names:
+            return np.zeros(0, dtype=int)
+        contains = self._contains(names)
+        text_array = np.array(names, dtype=str)[:, None]
+        whole_word = (
+            (text_array == self.keywords[None, :])
+            | np.char.startswith(text_array, np.char.add(self.keywords, ' ')[None, :])
+            | np.char.endswith(text_array, np.char.add(' ', self.keywords)[None, :])
+        )
+        scores = (10 * contains + 5 * (contains * whole_word)) @ self.purpose_keywords.T
+        types = np.array(field_types, dtype=object)[:, None]
+        scores += 20 * (types == self.purpose_types[None, :])
+
+        best = np.argmax(scores, axis=1)
+        best_scores = scores[np.arange(len(names)), best]
+        return np.where(best_scores >= 10, best, -1)
+
+    def match(self, columns: Iterable[Any], top_k: int = 5, min_score: float = 0.5) -> List[Dict[str, Any]]:
+        """
+        Top library matches for each source column
+
+        Args:
+            columns: Column names, or dicts with 'name' and optional 'type'
+            top_k: Matches returned per column
+            min_score: Matches scoring below this are dropped
+
+        Returns:
+            One {'column': column, 'matches': [...]} per column in input order
+            (matches best first); columns sharing a label stay separate
+        """
+        columns = [column if isinstance(column, dict) else {'name': column} for column in columns]
+        results = []
+        if not self.fields:
+            return [{'column': column, 'matches': []} for column in columns]
+
+        for start in range(0, len(columns), self.CHUNK_SIZE):
+            chunk = columns[start:start + self.CHUNK_SIZE]
+            names = [PurposeMatcher.normalize_field_name(column['name']) for column in chunk]
+            field_types = [column.get('type') for column in chunk]
+
+            vectors = self._encode(names)
+            similarity = np.maximum(
+                self._similarity(vectors, self.key_postings, len(chunk)),
+                self._similarity(vectors, self.name_postings, len(chunk))
+            )
+
+            purpose_scores = self._purpose_scores(names, field_types)
+            scores = np.minimum(similarity + self.PURPOSE_WEIGHT * purpose_scores, 1.0)
+
+            order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+            for row, column in enumerate(chunk):
+                matches = []
+                for index in order[row]:
+                    score = float(scores[row, index])
+                    # float32 weights can land a hair under the threshold
+                    if score < min_score - 1e-6:
+                        break
+                    field = self.fields[index]
+                    matches.append({
+                        'field': {
+                            'id': field['id'],
+                            'field_key': field['field_key'],
+                            'label': field['canonical_name'],
+                            'type': field['field_type'],
+                            'source': 'field_library'
+                        },
+                        'confidence': round(score, 4),
+                        'similarity': round(float(similarity[row, index]), 4),
+                        'purpose_score': round(float(purpose_scores[row, index]), 4),
+                        'match_type': 'purpose_match' if purpose_scores[row, index] else 'ngram'
+                    })
+                results.append({'column': column, 'matches': matches})
+        return results
+
+    def _purpose_scores(self, names: List[str], field_types: List[Optional[str]]) -> np.ndarray:
+        """PurposeMatcher.find_match's score for every (column, library field) pair, 0 below its threshold"""
+        purposes = self.detect_purposes(names, field_types)
+        detected = purposes >= 0
+        safe_purposes = np.where(detected, purposes, 0)
+
+        # Keyword score of each field for the column's purpose, plus the exact key bonus
+        scores = self.field_purpose_scores[:, safe_purposes].T
+        scores = scores + 0.5 * (np.array(names, dtype=object)[:, None] == self.normalized_keys[None, :])
+
+        # find_match only considers fields in the purpose's category with the column's type
+        eligible = self.field_in_category[:, safe_purposes].T
+        eligible &= np.array(field_types, dtype=object)[:, None] == self.field_types[None, :]
+        eligible &= detected[:, None]
+
+        scores = np.where(eligible & (scores >= 0.5), np.minimum(scores, 1.0), 0.0)
+        return scores.astype(np.float32)
+
+
+# Export
+__all__ = ['BulkFieldMatcher', 'thentia_columns']
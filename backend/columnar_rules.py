@@ -0,0 +1,366 @@
+"""
+Columnar Rule Evaluation for the Regulatory Platform
+Evaluates a board's rules across a whole cohort at once using NumPy arrays
+
+The row-at-a-time RuleEngine converts values with str()/float() on every
+comparison. Here each referenced field is turned into typed column arrays once,
+every condition becomes a boolean mask over all rows, and fee actions are
+applied as array operations. Results are identical to RuleEngine.evaluate_rules.
+"""
+
+from typing import Dict, List, Any, Optional, Iterable
+
+import numpy as np
+
+from rule_engine import RuleEngine, CompiledRuleSet, NUMERIC_OPERATORS
+
+
+class RecordColumns:
+    """
+    Typed column view over a list of application records
+
+    Columns are built lazily, once per field path, and reused by every rule
+    (and every rule set) evaluated against the same cohort.
+    """
+
+    def __init__(self, records: Iterable[Dict[str, Any]], engine: RuleEngine):
+        self.records = list(records)
+        self.size = len(self.records)
+        self.engine = engine
+        self._raw = {}
+        self._strings = {}
+        self._numbers = {}
+
+    def raw(self, field_path: str):
+        """Raw field values and a presence mask (value is not None)"""
+        if field_path not in self._raw:
+            values = [self.engine._get_field_value(field_path, record) for record in self.records]
+            present = np.fromiter((v is not None for v in values), dtype=bool, count=self.size)
+            self._raw[field_path] = (values, present)
+        return self._raw[field_path]
+
+    def strings(self, field_path: str) -> np.ndarray:
+        """Lower-cased string form of each value (empty string where missing)"""
+        if field_path not in self._strings:
+            values, _ = self.raw(field_path)
+            self._strings[field_path] = np.array(
+                [str(v).lower() if v is not None else '' for v in values], dtype=str
+            ) if self.size else np.array([], dtype=str)
+        return self._strings[field_path]
+
+    def numbers(self, field_path: str) -> np.ndarray:
+        """Float form of each value (NaN where missing or not numeric)"""
+        if field_path not in self._numbers:
+            values, _ = self.raw(field_path)
+            column = np.full(self.size, np.nan)
+            for i, v in enumerate(values):
+                if v is None:
+                    continue
+                try:
+                    column[i] = float(v)
+                except (ValueError, TypeError, OverflowError):
+                    pass
+            self._numbers[field_path] = column
+        return self._numbers[field_path]
+
+
+class _FeeColumn:
+    """Per-row state of one key in results['fees']"""
+
+    def __init__(self, size: int, dtype=float, fill=0.0):
+        self.values = np.full(size, fill, dtype=dtype)
+        self.present = np.zeros(size, dtype=bool)
+        self.int_zero = np.zeros(size, dtype=bool)  # waive_fee stores int 0, not 0.0
+        self.first_set = np.full(size, np.iinfo(np.int64).max, dtype=np.int64)
+
+    def write(self, mask: np.ndarray, values, step: int):
+        """Assign values on masked rows, tracking dict insertion order"""
+        self.first_set[mask & ~self.present] = step
+        self.present |= mask
+        self.values[mask] = values if np.isscalar(values) else values[mask]
+        self.int_zero[mask] = False
+
+
+class ColumnarRuleEvaluator:
+    """
+    Evaluates rules as boolean masks and array operations over a cohort
+
+    Intended for bulk what-if runs: build RecordColumns for the cohort once,
+    then evaluate as many candidate rule sets against it as needed.
+    """
+
+    def __init__(self, engine: Optional[RuleEngine] = None):
+        self.engine = engine or RuleEngine()
+
+    def evaluate(self, records, board_id: str = 'default', rule_type: str = 'all',
+                 rules: Optional[List[Dict]] = None) -> List[Dict[str, Any]]:
+        """
+        Evaluate rules for every record and return per-record results
+
+        Args:
+            records: List of application dicts, or a prebuilt RecordColumns
+            board_id: Board whose saved rules are used when `rules` is not given
+            rule_type: Type of rules to evaluate ('fee', 'routing', 'requirements', 'all')
+            rules: Optional unsaved rule list (e.g. a proposed rule change)
+
+        Returns:
+            List of result dictionaries, identical to RuleEngine.evaluate_rules
+        """
+        state = self._run(records, board_id, rule_type, rules)
+        return [self._materialize(state, row) for row in range(state['size'])]
+
+    def evaluate_columns(self, records, board_id: str = 'default', rule_type: str = 'all',
+                         rules: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """
+        Evaluate rules and return column arrays instead of per-record dicts
+
+        Returns:
+            Dictionary with 'total_fee' (array), 'fees' ({fee_name: array, NaN where
+            the fee was never set}) and 'matched' ({rule_id: boolean mask})
+        """
+        state = self._run(records, board_id, rule_type, rules)
+
+        total = np.zeros(state['size'])
+        fees = {}
+        for name, column in state['fees'].items():
+            fees[name] = np.where(column.present, column.values, np.nan)
+            total += np.where(column.present, column.values, 0.0)
+
+        return {
+            'total_fee': np.round(total, 2),
+            'fees': fees,
+            'matched': state['matched']
+        }
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    def _run(self, records, board_id, rule_type, rules) -> Dict[str, Any]:
+        columns = records if isinstance(records, RecordColumns) else RecordColumns(records, self.engine)
+        rule_set = CompiledRuleSet(board_id, rules) if rules is not None else self.engine.get_rule_set(board_id)
+        size = columns.size
+
+        state = {
+            'size': size,
+            'fees': {},
+            'flags': {},     # '<fee>_waived' keys
+            'reasons': {},   # '<fee>_waiver_reason' keys
+            'events': [],    # (mask, kind, payload) in action order
+            'route': np.full(size, -1, dtype=np.int64),
+            'routes': [],
+            'matched': {}
+        }
+
+        step = 0
+        for rule in rule_set.rules:
+            if rule_type != 'all' and rule.type != rule_type:
+                continue
+
+            mask = self._conditions_mask(rule.conditions, columns)
+            state['matched'][rule.rule_id] = mask
+            if not mask.any():
+                step += len(rule.actions)
+                continue
+
+            for action in rule.actions:
+                self._apply_action(action, mask, state, step)
+                step += 1
+
+        return state
+
+    def _conditions_mask(self, conditions, columns: RecordColumns) -> np.ndarray:
+        """AND together the masks of all conditions (empty conditions match every row)"""
+        mask = np.ones(columns.size, dtype=bool)
+        for condition in conditions:
+            if not mask.any():
+                break
+            mask &= self._condition_mask(condition, columns)
+        return mask
+
+    def _condition_mask(self, condition, columns: RecordColumns) -> np.ndarray:
+        """Boolean mask of rows satisfying one condition, mirroring RuleEngine._compare_values"""
+        if not isinstance(condition.field, str):
+            # The row engine fails on these when it reaches them
+            self.engine._get_field_value(condition.field, {})
+
+        _, present = columns.raw(condition.field)
+
+        # Compare values were coerced once when the rule set was compiled
+        operator = condition.operator
+
+        if operator in ('==', '=', '!='):
+            equal = columns.strings(condition.field) == condition.text
+            return present & (equal if operator != '!=' else ~equal)
+
+        if operator in NUMERIC_OPERATORS:
+            target = condition.number
+            if target is None:
+                return np.zeros(columns.size, dtype=bool)
+            numbers = columns.numbers(condition.field)
+            with np.errstate(invalid='ignore'):
+                if operator == '>':
+                    result = numbers > target
+                elif operator == '<':
+                    result = numbers < target
+                elif operator == '>=':
+                    result = numbers >= target
+                else:
+                    result = numbers <= target
+            return present & result
+
+        if operator == 'contains':
+            return present & (np.char.find(columns.strings(condition.field), condition.text) >= 0)
+
+        if operator == 'in':
+            if condition.choices is None:
+                return np.zeros(columns.size, dtype=bool)
+            return present & np.isin(columns.strings(condition.field), list(condition.choices))
+
+        return np.zeros(columns.size, dtype=bool)
+
+    def _fee(self, state, name: str) -> _FeeColumn:
+        if name not in state['fees']:
+            state['fees'][name] = _FeeColumn(state['size'])
+        return state['fees'][name]
+
+    def _apply_action(self, action, mask: np.ndarray, state: Dict, step: int):
+        """Apply one action to every row in mask, in place"""
+        params = action.params
+        action_type = action.type
+
+        if action_type == 'set_fee':
+            fee = self._fee(state, params.get('fee_name', 'base_fee'))
+            fee.write(mask, float(params.get('amount', 0)), step)
+
+        elif action_type == 'add_fee':
+            fee = self._fee(state, params.get('fee_name', 'additional_fee'))
+            amount = float(params.get('amount', 0))
+            current = np.where(fee.present, fee.values, 0.0)
+            fee.write(mask, current + amount, step)
+
+        elif action_type == 'multiply_fee':
+            name = params.get('fee_name', 'base_fee')
+            fee = state['fees'].get(name)
+            if fee is None:
+                return
+            target = mask & fee.present
+            if target.any():
+                fee.values[target] *= float(params.get('multiplier', 1.0))
+                fee.int_zero[target] = False
+
+        elif action_type == 'apply_penalty':
+            self._apply_penalty(params, mask, state, step)
+
+        elif action_type == 'route_to':
+            state['route'][mask] = len(state['routes'])
+            state['routes'].append({
+                'queue': params.get('queue'),
+                'staff': params.get('staff'),
+                'priority': params.get('priority', 'normal'),
+                'reason': params.get('reason', 'Rule-based routing')
+            })
+
+        elif action_type == 'require_document':
+            state['events'].append((mask, 'requirements', {
+                'type': 'document',
+                'document_name': params.get('document_name'),
+                'description': params.get('description'),
+                'required': True
+            }))
+
+        elif action_type == 'set_status':
+            state['events'].append((mask, 'status_changes', {
+                'new_status': params.get('status'),
+                'reason': params.get('reason', 'Rule-based status change')
+            }))
+
+        elif action_type == 'waive_fee':
+            name = params.get('fee_name', 'base_fee')
+            fee = state['fees'].get(name)
+            if fee is None:
+                return
+            target = mask & fee.present
+            if not target.any():
+                return
+            fee.values[target] = 0.0
+            fee.int_zero[target] = True
+
+            flag = state['flags'].setdefault(f'{name}_waived', _FeeColumn(state['size'], dtype=bool, fill=False))
+            flag.write(target, True, step)
+            reason = state['reasons'].setdefault(f'{name}_waiver_reason', _FeeColumn(state['size'], dtype=object, fill=None))
+            reason.write(target, params.get('reason', 'Fee waived'), step)
+
+    def _apply_penalty(self, params: Dict, mask: np.ndarray, state: Dict, step: int):
+        penalty_type = params.get('penalty_type', 'percentage')
+        amount = params.get('amount', 0)
+        info = {
+            'type': penalty_type,
+            'amount': amount,
+            'description': params.get('description', 'Penalty applied')
+        }
+        penalty = self._fee(state, 'penalty')
+
+        if penalty_type == 'percentage':
+            base = state['fees'].get(params.get('base_fee', 'base_fee'))
+            if base is None:
+                return
+            base_values = np.where(base.present, base.values, 0.0)
+            target = mask & (base_values != 0)
+            if not target.any():
+                return
+            calculated = base_values * (float(amount) / 100)
+        else:
+            target = mask
+            calculated = np.full(state['size'], float(amount))
+
+        current = np.where(penalty.present, penalty.values, 0.0)
+        penalty.write(target, current + calculated, step)
+        state['events'].append((target, 'penalties', (info, calculated)))
+
+    # ------------------------------------------------------------------
+    # Per-row results
+    # ------------------------------------------------------------------
+
+    def _materialize(self, state: Dict, row: int) -> Dict[str, Any]:
+        """Build the RuleEngine-shaped result dictionary for one row"""
+        entries = []
+        for name, column in state['fees'].items():
+            if column.present[row]:
+                value = 0 if column.int_zero[row] else float(column.values[row])
+                entries.append((column.first_set[row], name, value))
+        for name, column in state['flags'].items():
+            if column.present[row]:
+                entries.append((column.first_set[row], name, True))
+        for name, column in state['reasons'].items():
+            if column.present[row]:
+                entries.append((column.first_set[row], name, column.values[row]))
+        # Keys written by the same action keep the row engine's insertion order
+        entries.sort(key=lambda entry: entry[0])
+
+        results = {
+            'fees': {name: value for _, name, value in entries},
+            'routing': {},
+            'requirements': [],
+            'status_changes': [],
+            'penalties': [],
+            'total_fee': 0
+        }
+
+        route = state['route'][row]
+        if route >= 0:
+            results['routing'] = dict(state['routes'][route])
+
+        for mask, kind, payload in state['events']:
+            if not mask[row]:
+                continue
+            if kind == 'penalties':
+                info, calculated = payload
+                info = dict(info)
+                info['calculated_amount'] = float(calculated[row])
+                results['penalties'].append(info)
+            else:
+                results[kind].append(dict(payload))
+
+        results['total_fee'] = self.engine._calculate_total_fee(results)
+        return results
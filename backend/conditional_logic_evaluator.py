@@ -0,0 +1,375 @@
+"""
+Conditional Logic Evaluator
+Server-side counterpart of src/utils/ConditionalLogicEngine.js
+
+Evaluates an application type's conditional rules against a submission's
+form_data to get effective visibility, enabled/required state, set values and
+fee modifiers - so the backend can re-derive at submit time (or in bulk after a
+rule change) what the licensee portal showed.
+
+Accepts both rule shapes in use:
+- stored/validated: {id, trigger_field, trigger_condition, trigger_value,
+  actions: [{action, target_fields: [...], value, fee_modifier}]}
+- browser engine:   {id, trigger: {field, condition, value},
+  actions: [{type, target_field, value, fee_modifier}]}
+"""
+
+import json
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+
+from conditional_rule_validator import ConditionalRuleValidator
+
+# Key used in field states for fee actions that don't target a field
+FEE_TARGET = '__fee__'
+
+_LEADING_FLOAT = re.compile(r'^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+def _js_truthy(value: Any) -> bool:
+    """JavaScript truthiness (empty lists/dicts are truthy, NaN is not)"""
+    if value is None or value is False:
+        return False
+    if isinstance(value, (int, float)):
+        return value == value and value != 0
+    if isinstance(value, str):
+        return value != ''
+    return True
+
+
+def _js_string(value: Any) -> str:
+    """String(value) as the browser would produce it"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, list):
+        return ','.join('' if v is None else _js_string(v) for v in value)
+    return str(value)
+
+
+def _parse_float(value: Any) -> Optional[float]:
+    """parseFloat(value): leading numeric prefix, or None where JS gives NaN"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value == value else None
+    match = _LEADING_FLOAT.match(_js_string(value))
+    return float(match.group(0)) if match else None
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if value is None or value == '':
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).replace(tzinfo=None)
+    except ValueError:
+        return None
+
+
+def _strict_equals(a: Any, b: Any) -> bool:
+    """a === b for JSON values (no bool/number coercion)"""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    if type(a) is not type(b):
+        return False
+    return a == b and isinstance(a, (str, type(None)))
+
+
+def _numeric(compare):
+    def test(field_value, trigger):
+        left = _parse_float(field_value)
+        return left is not None and trigger.number is not None and compare(left, trigger.number)
+    return test
+
+
+def _dated(compare):
+    def test(field_value, trigger):
+        left = _parse_date(field_value)
+        return left is not None and trigger.date is not None and compare(left, trigger.date)
+    return test
+
+
+# Condition name -> test(field_value, compiled_trigger), matching evaluateCondition()
+CONDITIONS = {
+    'equals': lambda fv, t: _strict_equals(fv, t.value),
+    'not_equals': lambda fv, t: not _strict_equals(fv, t.value),
+    'contains': lambda fv, t: _js_truthy(fv) and t.text in _js_string(fv),
+    'not_contains': lambda fv, t: not _js_truthy(fv) or t.text not in _js_string(fv),
+    'greater_than': _numeric(lambda a, b: a > b),
+    'less_than': _numeric(lambda a, b: a < b),
+    'greater_than_or_equal': _numeric(lambda a, b: a >= b),
+    'less_than_or_equal': _numeric(lambda a, b: a <= b),
+    'is_empty': lambda fv, t: not _js_truthy(fv),
+    'is_not_empty': lambda fv, t: _js_truthy(fv),
+    'before': _dated(lambda a, b: a < b),
+    'after': _dated(lambda a, b: a > b),
+    'starts_with': lambda fv, t: _js_truthy(fv) and _js_string(fv).startswith(t.text),
+    'ends_with': lambda fv, t: _js_truthy(fv) and _js_string(fv).endswith(t.text),
+    # in_list / not_in_list pass validation but the browser engine treats them as
+    # unknown (never true); they are mirrored as such so both sides agree
+}
+
+
+class CompiledTrigger:
+    """A rule trigger with its condition resolved and compare value pre-parsed"""
+
+    def __init__(self, field: str, condition: str, value: Any):
+        self.field = field
+        self.condition = condition
+        self.value = value
+        self.test = CONDITIONS.get(condition)
+        self.text = _js_string(value)
+        self.number = _parse_float(value)
+        self.date = _parse_date(value) if condition in ('before', 'after') else None
+
+    def matches(self, form_data: Dict[str, Any]) -> bool:
+        if self.test is None:
+            return False
+        return bool(self.test(form_data.get(self.field), self))
+
+
+class CompiledConditionalRule:
+    """One conditional rule normalised to (trigger, [(action_type, target, action)])"""
+
+    def __init__(self, rule: Dict[str, Any], index: int):
+        self.id = rule.get('id')
+        self.index = index
+
+        trigger = rule.get('trigger')
+        if isinstance(trigger, dict):
+            self.trigger = CompiledTrigger(trigger.get('field'), trigger.get('condition'), trigger.get('value'))
+        elif rule.get('trigger_field'):
+            self.trigger = CompiledTrigger(rule.get('trigger_field'), rule.get('trigger_condition'),
+                                           rule.get('trigger_value'))
+        else:
+            self.trigger = None
+
+        self.actions: List[Tuple[str, str, Dict[str, Any]]] = []
+        for action in rule.get('actions') or []:
+            if not isinstance(action, dict):
+                continue
+            action_type = action.get('type') or action.get('action')
+            targets = action.get('target_fields')
+            if not isinstance(targets, list):
+                single = action.get('target_field') or action.get('field')
+                targets = [single] if single else []
+            if not targets and action_type == 'calculate_fee':
+                targets = [FEE_TARGET]
+            for target in targets:
+                self.actions.append((action_type, target, action))
+
+    @property
+    def target_fields(self) -> List[str]:
+        return [target for _, target, _ in self.actions if target != FEE_TARGET]
+
+    def matches(self, form_data: Dict[str, Any]) -> bool:
+        return self.trigger is not None and self.trigger.matches(form_data)
+
+
+class ConditionalLogicEvaluator:
+    """
+    Compiled conditional rules for one application type
+
+    Build with for_application_type() to reuse the compiled rules until the
+    type's conditional_rules change. Which rules fire is decided in topological
+    order (ConditionalRuleValidator.evaluation_order), so values set by one
+    rule are seen by the rules it triggers within a single pass. The fired
+    rules' actions are then applied in saved order, so the highest-index rule
+    wins a conflict on a field, as in ConditionalLogicEngine.resolveConflicts().
+    """
+
+    _cache: Dict[Any, Tuple[str, 'ConditionalLogicEvaluator']] = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        rules = [rule for rule in rules or [] if isinstance(rule, dict)]
+        order = ConditionalRuleValidator.evaluation_order(rules)
+        self.rules = [CompiledConditionalRule(rules[i], i) for i in order]
+
+    @classmethod
+    def from_json(cls, rules_json: Optional[str]) -> 'ConditionalLogicEvaluator':
+        try:
+            rules = json.loads(rules_json) if rules_json else []
+        except (TypeError, ValueError):
+            rules = []
+        return cls(rules if isinstance(rules, list) else [])
+
+    @classmethod
+    def for_application_type(cls, app_type) -> 'ConditionalLogicEvaluator':
+        """Compiled evaluator for an ApplicationType, rebuilt only when its rules text changes"""
+        rules_json = app_type.conditional_rules or '[]'
+        cached = cls._cache.get(app_type.id)
+        if cached is not None and cached[0] == rules_json:
+            return cached[1]
+
+        evaluator = cls.from_json(rules_json)
+        with cls._cache_lock:
+            cls._cache[app_type.id] = (rules_json, evaluator)
+        return evaluator
+
+    @classmethod
+    def clear_cache(cls, application_type_id: Optional[int] = None):
+        with cls._cache_lock:
+            if application_type_id is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(application_type_id, None)
+
+    def evaluate(self, form_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Field states keyed by field name, like ConditionalLogicEngine.evaluateAll()
+
+        The rule saved last wins when several rules act on the same field.
+        """
+        return self._run(form_data)[0]
+
+    def _run(self, form_data: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """Fired rules, then their actions by rule index; returns (field states, values after set/clear_value)"""
+        values = dict(form_data or {})
+
+        # Topological pass: the portal writes set values back into the form data,
+        # so a rule sees the value left by the highest-index fired rule writing it
+        fired = []
+        writers: Dict[str, int] = {}
+        for rule in self.rules:
+            if not rule.matches(values):
+                continue
+            fired.append(rule)
+            for action_type, target, action in rule.actions:
+                if action_type in ConditionalRuleValidator.VALUE_ACTIONS and rule.index >= writers.get(target, -1):
+                    writers[target] = rule.index
+                    values[target] = action.get('value') if action_type == 'set_value' else ''
+
+        field_states: Dict[str, Dict[str, Any]] = {}
+        for rule in sorted(fired, key=lambda rule: rule.index):
+            for action_type, target, action in rule.actions:
+                state = field_states.get(target)
+                if state is None:
+                    state = field_states[target] = {
+                        'visible': True,
+                        'enabled': True,
+                        'required': False,
+                        'value': None,
+                        'fee': None,
+                        'message': None
+                    }
+                self._apply_action(state, action_type, action)
+
+        return field_states, values
+
+    @staticmethod
+    def _apply_action(state: Dict[str, Any], action_type: str, action: Dict[str, Any]):
+        if action_type == 'show':
+            state['visible'] = True
+        elif action_type == 'hide':
+            state['visible'] = False
+        elif action_type == 'enable':
+            state['enabled'] = True
+        elif action_type == 'disable':
+            state['enabled'] = False
+        elif action_type == 'set_required':
+            state['required'] = True
+        elif action_type == 'set_optional':
+            state['required'] = False
+        elif action_type == 'set_value':
+            state['value'] = action.get('value')
+        elif action_type == 'clear_value':
+            state['value'] = ''
+        elif action_type == 'calculate_fee':
+            if action.get('fee_modifier'):
+                state.setdefault('feeModifiers', []).append(action['fee_modifier'])
+            else:
+                state['fee'] = (state['fee'] or 0) + (_parse_float(action.get('value') or 0) or 0)
+        elif action_type == 'show_message':
+            state['message'] = action.get('value')
+
+    @staticmethod
+    def total_fee(field_states: Dict[str, Dict[str, Any]], base_fee: float = 0) -> float:
+        """Total fee after fee modifiers, like ConditionalLogicEngine.getTotalFee()"""
+        dollar = 0.0
+        percent = 0.0
+        set_amount = None
+
+        for state in field_states.values():
+            for modifier in state.get('feeModifiers') or []:
+                modifier_type = modifier.get('type')
+                amount = _parse_float(modifier.get('amount')) or 0
+                if modifier_type in ('set_amount', 'override'):
+                    set_amount = amount
+                elif modifier.get('unit') == 'percent':
+                    if modifier_type == 'discount':
+                        percent -= amount
+                    elif modifier_type == 'surcharge':
+                        percent += amount
+                else:
+                    if modifier_type == 'discount':
+                        dollar -= amount
+                    elif modifier_type == 'surcharge':
+                        dollar += amount
+            if state.get('fee') is not None:
+                dollar += state['fee']
+
+        if set_amount is not None:
+            return set_amount
+        return base_fee + base_fee * (percent / 100) + dollar
+
+    def effective_form(self, form_data: Dict[str, Any], required_fields: Optional[List[str]] = None,
+                       base_fee: float = 0) -> Dict[str, Any]:
+        """
+        Everything the portal derives for a submission
+
+        Args:
+            form_data: Submitted field values
+            required_fields: Field keys required by the form definition itself
+            base_fee: Application type base fee
+
+        Returns:
+            Dictionary with fieldStates, hiddenFields, requiredFields,
+            missingRequired, feeModifiers and totalFee
+        """
+        states, values = self._run(form_data)
+
+        hidden = {name for name, state in states.items() if not state['visible']}
+        
+        # As in the portal, a field touched by any fired rule takes its required
+        # flag from the rule state; other fields keep the form definition's flag
+        required = {name for name in required_fields or [] if name not in states}
+        required.update(name for name, state in states.items() if state['required'] and name != FEE_TARGET)
+        required -= hidden
+
+        missing = sorted(name for name in required if not _js_truthy(values.get(name)))
+        modifiers = [m for state in states.values() for m in state.get('feeModifiers') or []]
+
+        return {
+            'fieldStates': states,
+            'hiddenFields': sorted(hidden),
+            'requiredFields': sorted(required),
+            'missingRequired': missing,
+            'feeModifiers': modifiers,
+            'totalFee': self.total_fee(states, base_fee)
+        }
+
+    def evaluate_many(self, submissions: List[Tuple[Any, Dict[str, Any]]],
+                      required_fields: Optional[List[str]] = None, base_fee: float = 0) -> List[Dict[str, Any]]:
+        """
+        Evaluate many submissions of the same application type
+
+        Args:
+            submissions: (key, form_data) pairs, e.g. (submission.id, parsed form_data)
+
+        Returns:
+            List of {'key': ..., **effective_form(...)} in input order
+        """
+        results = []
+        for key, form_data in submissions:
+            result = self.effective_form(form_data, required_fields, base_fee)
+            result['key'] = key
+            results.append(result)
+        return results
@@ -3,8 +3,9 @@ Conditional Rule Validator
 Validates conditional logic rules for dynamic form fields
 """
 
+import heapq
 import json
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Tuple, Any, Optional
 
 class ConditionalRuleValidator:
     """Validates conditional logic rules"""
@@ -38,6 +39,14 @@ class ConditionalRuleValidator:
         'calculate_fee'
     ]
     
+    # Actions that change a field's value (and so can fire rules triggered by it)
+    VALUE_ACTIONS = ['set_value', 'clear_value']
+    
+    @staticmethod
+    def context(available_fields: List[str]) -> 'RuleValidationContext':
+        """Validation context for one form's fields, to validate many rules against"""
+        return RuleValidationContext(available_fields)
+    
     @staticmethod
     def validate_rule(rule: Dict[str, Any], available_fields: List[str]) -> Tuple[bool, str]:
         """
@@ -50,100 +59,17 @@ class ConditionalRuleValidator:
         Returns:
             Tuple of (is_valid, error_message)
         """
-        
-        # Check required fields
-        if 'id' not in rule:
-            return False, "Rule must have an 'id' field"
-        
-        if 'trigger_field' not in rule:
-            return False, "Rule must have a 'trigger_field'"
-        
-        if 'trigger_condition' not in rule:
-            return False, "Rule must have a 'trigger_condition'"
-        
-        if 'actions' not in rule or not isinstance(rule['actions'], list):
-            return False, "Rule must have an 'actions' array"
-        
-        # Validate trigger field exists
-        if rule['trigger_field'] not in available_fields:
-            return False, f"Trigger field '{rule['trigger_field']}' does not exist in form"
-        
-        # Validate trigger condition
-        if rule['trigger_condition'] not in ConditionalRuleValidator.VALID_CONDITIONS:
-            return False, f"Invalid trigger condition: '{rule['trigger_condition']}'"
-        
-        # Validate trigger_value is present for conditions that need it
-        value_required_conditions = [
-            'equals', 'not_equals', 'contains', 'not_contains',
-            'greater_than', 'less_than', 'greater_than_or_equal',
-            'less_than_or_equal', 'in_list', 'not_in_list'
-        ]
-        
-        if rule['trigger_condition'] in value_required_conditions:
-            if 'trigger_value' not in rule:
-                return False, f"Condition '{rule['trigger_condition']}' requires 'trigger_value'"
-        
-        # Validate actions
-        if len(rule['actions']) == 0:
-            return False, "Rule must have at least one action"
-        
-        for action in rule['actions']:
-            is_valid, error = ConditionalRuleValidator._validate_action(action, available_fields)
-            if not is_valid:
-                return False, error
-        
+        error = RuleValidationContext(available_fields).check_rule(rule)
+        if error:
+            return False, error['message']
         return True, ""
     
     @staticmethod
     def _validate_action(action: Dict[str, Any], available_fields: List[str]) -> Tuple[bool, str]:
         """Validate a single action"""
-        
-        if 'action' not in action:
-            return False, "Action must have an 'action' field"
-        
-        action_type = action['action']
-        
-        if action_type not in ConditionalRuleValidator.VALID_ACTIONS:
-            return False, f"Invalid action type: '{action_type}'"
-        
-        # Validate target_fields for actions that need them
-        field_required_actions = [
-            'show', 'hide', 'enable', 'disable',
-            'set_required', 'set_optional', 'set_value', 'clear_value'
-        ]
-        
-        if action_type in field_required_actions:
-            if 'target_fields' not in action or not isinstance(action['target_fields'], list):
-                return False, f"Action '{action_type}' requires 'target_fields' array"
-            
-            if len(action['target_fields']) == 0:
-                return False, f"Action '{action_type}' must have at least one target field"
-            
-            # Validate target fields exist
-            for field_name in action['target_fields']:
-                if field_name not in available_fields:
-                    return False, f"Target field '{field_name}' does not exist in form"
-        
-        # Validate set_value action has value
-        if action_type == 'set_value':
-            if 'value' not in action:
-                return False, "Action 'set_value' requires 'value' field"
-        
-        # Validate calculate_fee action has fee_modifier
-        if action_type == 'calculate_fee':
-            if 'fee_modifier' not in action:
-                return False, "Action 'calculate_fee' requires 'fee_modifier' field"
-            
-            fee_modifier = action['fee_modifier']
-            if 'type' not in fee_modifier or fee_modifier['type'] not in ['discount', 'surcharge', 'override']:
-                return False, "fee_modifier must have valid 'type' (discount, surcharge, or override)"
-            
-            if 'amount' not in fee_modifier:
-                return False, "fee_modifier must have 'amount' field"
-            
-            if 'unit' not in fee_modifier or fee_modifier['unit'] not in ['percent', 'fixed']:
-                return False, "fee_modifier must have valid 'unit' (percent or fixed)"
-        
+        error = RuleValidationContext(available_fields).check_action(action)
+        if error:
+            return False, error['message']
         return True, ""
     
     @staticmethod
@@ -169,23 +95,8 @@ class ConditionalRuleValidator:
         if not isinstance(rules_data, list):
             return False, ["Rules must be an array"]
         
-        # Validate each rule
-        errors = []
-        rule_ids = set()
-        
-        for i, rule in enumerate(rules_data):
-            # Check for duplicate IDs
-            rule_id = rule.get('id')
-            if rule_id in rule_ids:
-                errors.append(f"Rule {i+1}: Duplicate rule ID '{rule_id}'")
-            rule_ids.add(rule_id)
-            
-            # Validate rule
-            is_valid, error = ConditionalRuleValidator.validate_rule(rule, available_fields)
-            if not is_valid:
-                errors.append(f"Rule {i+1} (ID: {rule_id}): {error}")
-        
-        return len(errors) == 0, errors
+        errors = RuleValidationContext(available_fields).validate_rules(rules_data)
+        return len(errors) == 0, [RuleValidationContext.format_error(error) for error in errors]
     
     @staticmethod
     def detect_conflicts(rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -259,6 +170,335 @@ class ConditionalRuleValidator:
                     })
         
         return conflicts
+    
+    @staticmethod
+    def _rule_dependencies(rule: Dict[str, Any]) -> Tuple[Any, List[str]]:
+        """
+        Trigger field of a rule and the fields whose value its actions change
+        
+        Accepts the stored shape (trigger_field / action + target_fields) and the
+        browser engine shape (trigger.field / type + target_field).
+        """
+        trigger = rule.get('trigger')
+        trigger_field = trigger.get('field') if isinstance(trigger, dict) else rule.get('trigger_field')
+        
+        written = []
+        for action in rule.get('actions') or []:
+            if not isinstance(action, dict):
+                continue
+            if (action.get('action') or action.get('type')) not in ConditionalRuleValidator.VALUE_ACTIONS:
+                continue
+            target_fields = action.get('target_fields')
+            if not isinstance(target_fields, list):
+                target_fields = [action['target_field']] if action.get('target_field') else []
+            written.extend(target_fields)
+        
+        return trigger_field, written
+    
+    @staticmethod
+    def build_dependency_graph(rules: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """
+        Build the field dependency graph of a rule set
+        
+        An edge trigger_field -> target_field means a rule triggered by the first
+        field changes the value of the second (set_value / clear_value), which can
+        in turn fire rules triggered by it. Visibility, enabled, required and fee
+        actions never change a value, so they cannot chain rules and are left out.
+        
+        Args:
+            rules: List of rule dictionaries
+            
+        Returns:
+            Dictionary of trigger field -> sorted list of fields it changes
+        """
+        
+        graph = {}
+        
+        for rule in rules:
+            if not isinstance(rule, dict):
+                continue
+            trigger_field, written = ConditionalRuleValidator._rule_dependencies(rule)
+            if not trigger_field:
+                continue
+            targets = graph.setdefault(trigger_field, set())
+            # A rule reacting to its own value is evaluated once, so it is not a cycle
+            targets.update(field for field in written if field != trigger_field)
+        
+        return {field: sorted(targets) for field, targets in graph.items()}
+    
+    @staticmethod
+    def detect_cycles(rules: List[Dict[str, Any]]) -> List[List[str]]:
+        """
+        Find circular value dependencies between rules
+        
+        Args:
+            rules: List of rule dictionaries
+            
+        Returns:
+            List of cycles, each a field path that ends where it starts
+            (e.g. ['a', 'b', 'a']); empty when the rules are acyclic
+        """
+        
+        graph = ConditionalRuleValidator.build_dependency_graph(rules)
+        cycles = []
+        
+        # Iterative DFS with colouring: 0 = unvisited, 1 = on stack, 2 = done
+        state = {}
+        for start in graph:
+            if state.get(start):
+                continue
+            
+            path = [start]
+            state[start] = 1
+            stack = [iter(graph.get(start, []))]
+            
+            while stack:
+                next_field = next(stack[-1], None)
+                if next_field is None:
+                    state[path.pop()] = 2
+                    stack.pop()
+                elif state.get(next_field) == 1:
+                    cycles.append(path[path.index(next_field):] + [next_field])
+                elif not state.get(next_field):
+                    state[next_field] = 1
+                    path.append(next_field)
+                    stack.append(iter(graph.get(next_field, [])))
+        
+        return cycles
+    
+    @staticmethod
+    def evaluation_order(rules: List[Dict[str, Any]]) -> List[int]:
+        """
+        Topological evaluation order for a rule set
+        
+        Every rule comes after the rules that can change its trigger field, so a
+        single pass sees values set by earlier rules without re-evaluating until
+        nothing changes. Rules with no dependency between them keep their saved
+        order (later rules still win conflicts). Rules on a cycle, which
+        update_conditional_rules rejects, are appended in saved order.
+        
+        Args:
+            rules: List of rule dictionaries
+            
+        Returns:
+            List of indices into rules
+        """
+        
+        triggered_by = {}
+        written_by = []
+        for index, rule in enumerate(rules):
+            trigger_field, written = ConditionalRuleValidator._rule_dependencies(rule) \
+                if isinstance(rule, dict) else (None, [])
+            if trigger_field:
+                triggered_by.setdefault(trigger_field, []).append(index)
+            written_by.append(written)
+        
+        dependents = [set() for _ in rules]
+        in_degree = [0] * len(rules)
+        for index, written in enumerate(written_by):
+            for field in written:
+                for dependent in triggered_by.get(field, []):
+                    if dependent != index and dependent not in dependents[index]:
+                        dependents[index].add(dependent)
+                        in_degree[dependent] += 1
+        
+        # Kahn's algorithm, always taking the lowest ready index to keep saved order
+        ready = [index for index, degree in enumerate(in_degree) if degree == 0]
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            index = heapq.heappop(ready)
+            order.append(index)
+            for dependent in dependents[index]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    heapq.heappush(ready, dependent)
+        
+        if len(order) < len(rules):
+            placed = set(order)
+            order.extend(index for index in range(len(rules)) if index not in placed)
+        
+        return order
+
+
+class RuleValidationContext:
+    """
+    Validates rules against one form's fields
+    
+    The field list is frozen into a set once, so each membership check is O(1)
+    and validating R rules over F fields costs O(F + R) rather than O(F * R).
+    Errors are returned as dictionaries:
+    {rule_index, rule_id, code, message, field}
+    """
+    
+    CONDITIONS = frozenset(ConditionalRuleValidator.VALID_CONDITIONS)
+    ACTIONS = frozenset(ConditionalRuleValidator.VALID_ACTIONS)
+    
+    # Conditions that compare against trigger_value
+    VALUE_REQUIRED_CONDITIONS = frozenset([
+        'equals', 'not_equals', 'contains', 'not_contains',
+        'greater_than', 'less_than', 'greater_than_or_equal',
+        'less_than_or_equal', 'in_list', 'not_in_list'
+    ])
+    
+    # Actions that need a non-empty target_fields array
+    FIELD_REQUIRED_ACTIONS = frozenset([
+        'show', 'hide', 'enable', 'disable',
+        'set_required', 'set_optional', 'set_value', 'clear_value'
+    ])
+    
+    FEE_MODIFIER_TYPES = frozenset(['discount', 'surcharge', 'override'])
+    FEE_MODIFIER_UNITS = frozenset(['percent', 'fixed'])
+    
+    def __init__(self, available_fields: List[str]):
+        self.fields = frozenset(available_fields or [])
+    
+    @staticmethod
+    def _error(code: str, message: str, field: str = None) -> Dict[str, Any]:
+        return {'code': code, 'message': message, 'field': field}
+    
+    @staticmethod
+    def format_error(error: Dict[str, Any]) -> str:
+        """Error object as the message strings validate_rules has always returned"""
+        if error.get('rule_index') is None:
+            return error['message']
+        if error['code'] == 'duplicate_id':
+            return f"Rule {error['rule_index'] + 1}: {error['message']}"
+        return f"Rule {error['rule_index'] + 1} (ID: {error['rule_id']}): {error['message']}"
+    
+    def check_rule(self, rule: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """First problem with a rule as an error object, or None if it is valid"""
+        
+        if not isinstance(rule, dict):
+            return self._error('invalid_rule', "Rule must be an object")
+        
+        # Check required fields
+        if 'id' not in rule:
+            return self._error('missing_id', "Rule must have an 'id' field")
+        
+        if 'trigger_field' not in rule:
+            return self._error('missing_trigger_field', "Rule must have a 'trigger_field'")
+        
+        if 'trigger_condition' not in rule:
+            return self._error('missing_trigger_condition', "Rule must have a 'trigger_condition'")
+        
+        actions = rule.get('actions')
+        if not isinstance(actions, list):
+            return self._error('missing_actions', "Rule must have an 'actions' array")
+        
+        # Validate trigger field exists
+        trigger_field = rule['trigger_field']
+        if not isinstance(trigger_field, str) or trigger_field not in self.fields:
+            return self._error('unknown_trigger_field',
+                               f"Trigger field '{trigger_field}' does not exist in form", trigger_field)
+        
+        # Validate trigger condition
+        condition = rule['trigger_condition']
+        if not isinstance(condition, str) or condition not in self.CONDITIONS:
+            return self._error('invalid_condition', f"Invalid trigger condition: '{condition}'")
+        
+        # Validate trigger_value is present for conditions that need it
+        if condition in self.VALUE_REQUIRED_CONDITIONS and 'trigger_value' not in rule:
+            return self._error('missing_trigger_value', f"Condition '{condition}' requires 'trigger_value'")
+        
+        # Validate actions
+        if len(actions) == 0:
+            return self._error('no_actions', "Rule must have at least one action")
+        
+        for action in actions:
+            error = self.check_action(action)
+            if error:
+                return error
+        
+        return None
+    
+    def check_action(self, action: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """First problem with an action as an error object, or None if it is valid"""
+        
+        if not isinstance(action, dict) or 'action' not in action:
+            return self._error('missing_action', "Action must have an 'action' field")
+        
+        action_type = action['action']
+        
+        if not isinstance(action_type, str) or action_type not in self.ACTIONS:
+            return self._error('invalid_action', f"Invalid action type: '{action_type}'")
+        
+        # Validate target_fields for actions that need them
+        if action_type in self.FIELD_REQUIRED_ACTIONS:
+            target_fields = action.get('target_fields')
+            if not isinstance(target_fields, list):
+                return self._error('missing_target_fields', f"Action '{action_type}' requires 'target_fields' array")
+            
+            if len(target_fields) == 0:
+                return self._error('no_target_fields', f"Action '{action_type}' must have at least one target field")
+            
+            # Validate target fields exist
+            for field_name in target_fields:
+                if not isinstance(field_name, str) or field_name not in self.fields:
+                    return self._error('unknown_target_field',
+                                       f"Target field '{field_name}' does not exist in form", field_name)
+        
+        # Validate set_value action has value
+        if action_type == 'set_value' and 'value' not in action:
+            return self._error('missing_value', "Action 'set_value' requires 'value' field")
+        
+        # Validate calculate_fee action has fee_modifier
+        if action_type == 'calculate_fee':
+            if 'fee_modifier' not in action:
+                return self._error('missing_fee_modifier', "Action 'calculate_fee' requires 'fee_modifier' field")
+            
+            fee_modifier = action['fee_modifier']
+            if not isinstance(fee_modifier, dict) or fee_modifier.get('type') not in self.FEE_MODIFIER_TYPES:
+                return self._error('invalid_fee_modifier',
+                                   "fee_modifier must have valid 'type' (discount, surcharge, or override)")
+            
+            if 'amount' not in fee_modifier:
+                return self._error('invalid_fee_modifier', "fee_modifier must have 'amount' field")
+            
+            if fee_modifier.get('unit') not in self.FEE_MODIFIER_UNITS:
+                return self._error('invalid_fee_modifier', "fee_modifier must have valid 'unit' (percent or fixed)")
+        
+        return None
+    
+    def validate_rules(self, rules: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Validate every rule in one pass
+        
+        Args:
+            rules: List of rule dictionaries
+            
+        Returns:
+            List of error objects (empty when all rules are valid); a rule can
+            report a duplicate ID as well as its first validation problem
+        """
+        
+        errors = []
+        rule_ids = set()
+        
+        for i, rule in enumerate(rules):
+            rule_id = rule.get('id') if isinstance(rule, dict) else None
+            
+            # Check for duplicate IDs
+            if rule_id in rule_ids:
+                errors.append({
+                    'rule_index': i,
+                    'rule_id': rule_id,
+                    'code': 'duplicate_id',
+                    'message': f"Duplicate rule ID '{rule_id}'",
+                    'field': None
+                })
+            try:
+                rule_ids.add(rule_id)
+            except TypeError:
+                pass
+            
+            error = self.check_rule(rule)
+            if error:
+                error['rule_index'] = i
+                error['rule_id'] = rule_id
+                errors.append(error)
+        
+        return errors
 
 
 # Example usage and tests
@@ -321,4 +561,40 @@ if __name__ == '__main__':
     print(f"Conflicts detected: {len(conflicts)}")
     for conflict in conflicts:
         print(f"  - {conflict['message']}")
+    
+    # Test dependency cycle detection
+    chained_rules = [
+        {
+            'id': 'rule-1',
+            'trigger_field': 'field_a',
+            'trigger_condition': 'equals',
+            'trigger_value': 'Yes',
+            'actions': [{'action': 'set_value', 'target_fields': ['field_b'], 'value': 'Yes'}]
+        },
+        {
+            'id': 'rule-2',
+            'trigger_field': 'field_b',
+            'trigger_condition': 'equals',
+            'trigger_value': 'Yes',
+            'actions': [{'action': 'clear_value', 'target_fields': ['field_a']}]
+        }
+    ]
+    
+    cycles = ConditionalRuleValidator.detect_cycles(chained_rules)
+    print(f"Cycles detected: {[' -> '.join(cycle) for cycle in cycles]}")
+    
+    # Rule saved first but triggered by a value the second rule sets
+    ordered_rules = [
+        {
+            'id': 'rule-3',
+            'trigger_field': 'field_b',
+            'trigger_condition': 'equals',
+            'trigger_value': 'Yes',
+            'actions': [{'action': 'show', 'target_fields': ['field_c']}]
+        },
+        chained_rules[0]
+    ]
+    
+    order = ConditionalRuleValidator.evaluation_order(ordered_rules)
+    print(f"Evaluation order: {[ordered_rules[i]['id'] for i in order]}")
 
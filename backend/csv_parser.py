@@ -5,12 +5,30 @@ Parses CSV files containing field definitions and integrates with Universal Fiel
 
 import csv
 import io
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from purpose_matcher import PurposeMatcher
 from field_validator import FieldValidator
+from parallel_csv import map_row_chunks, DEFAULT_CHUNK_SIZE
+
+
+def parse_field_rows(rows: List[Tuple[int, Dict[str, str]]]) -> List[tuple]:
+    """Parse a chunk of CSV rows (runs in worker processes when parsing in parallel)"""
+    parser = CSVParser()
+    results = []
+    for row_num, row in rows:
+        field = parser._parse_row(row, row_num)
+        results.append((field, parser.errors, parser.warnings))
+        parser.errors, parser.warnings = [], []
+    return results
+
 
 class CSVParser:
-    """Parse CSV files and create application types with UFL integration"""
+    """
+    Parse CSV files and create application types with UFL integration
+    
+    workers > 1 (or None for the CPU count) parses rows in worker processes;
+    see parallel_csv.py.
+    """
     
     # Required CSV columns
     REQUIRED_COLUMNS = ['field_name', 'field_type', 'label']
@@ -21,9 +39,11 @@ class CSVParser:
     # Supported field types
     SUPPORTED_TYPES = ['text', 'email', 'tel', 'number', 'date', 'textarea', 'select', 'radio', 'checkbox']
     
-    def __init__(self, db_session=None):
+    def __init__(self, db_session=None, workers: Optional[int] = 0, chunk_size: int = DEFAULT_CHUNK_SIZE):
         """Initialize CSV parser with database session"""
         self.db = db_session
+        self.workers = workers
+        self.chunk_size = chunk_size
         self.purpose_matcher = PurposeMatcher()
         self.validator = FieldValidator()
         self.errors = []
@@ -53,10 +73,17 @@ class CSVParser:
             
             # Parse rows
             fields = []
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 (1 is header)
-                field = self._parse_row(row, row_num)
-                if field:
-                    fields.append(field)
+            if self.workers is not None and self.workers <= 1:
+                for row_num, row in enumerate(reader, start=2):  # Start at 2 (1 is header)
+                    field = self._parse_row(row, row_num)
+                    if field:
+                        fields.append(field)
+            else:
+                for field, row_errors, row_warnings in map_row_chunks(parse_field_rows, reader, self.workers, self.chunk_size):
+                    self.errors.extend(row_errors)
+                    self.warnings.extend(row_warnings)
+                    if field:
+                        fields.append(field)
             
             if not fields:
                 self.errors.append("No valid fields found in CSV")
@@ -187,9 +214,10 @@ class CSVParser:
         
         fields = parse_result['fields']
         
-        # Match fields to UFL
+        # Match fields to UFL (the library is loaded once for all fields)
         matched_fields = []
         new_fields = []
+        purpose_batch = None
         
         for field in fields:
             # Try to match to existing UFL field
@@ -197,12 +225,15 @@ class CSVParser:
                 # Use the db session to query FieldLibrary
                 # Import inside app context to avoid circular imports
                 try:
-                    from app import FieldLibrary
+                    from app import FieldLibrary, match_cache
                     
-                    matched_field, confidence, match_type = self.purpose_matcher.find_match(
+                    if purpose_batch is None:
+                        purpose_batch = self.purpose_matcher.batch(
+                            self.db.query(FieldLibrary), match_cache.view('purpose_matcher')
+                        )
+                    matched_field, confidence, match_type = purpose_batch.find_match(
                         field['label'],
-                        field['type'],
-                        self.db.query(FieldLibrary)
+                        field['type']
                     )
                 except Exception as e:
                     # If import fails, treat as new field
@@ -3,9 +3,164 @@ Enhanced Field Matcher for Universal Field Library
 Handles fuzzy matching, aliases, and smart field detection
 """
 
+import json
 import re
+import threading
 from difflib import SequenceMatcher
 
+from sqlalchemy import func
+
+from ngram_index import TrigramIndex
+
+
+def _parse_aliases(common_aliases):
+    """common_aliases column as a list (tolerates double-encoded JSON)"""
+    aliases = common_aliases
+    for _ in range(2):
+        if not isinstance(aliases, str):
+            break
+        try:
+            aliases = json.loads(aliases)
+        except ValueError:
+            return []
+    return [alias for alias in aliases if isinstance(alias, str)] if isinstance(aliases, list) else []
+
+
+class FieldMatchIndex:
+    """
+    In-memory lookup structures over Field Library rows
+
+    - by_key: field_key -> field id
+    - by_alias: normalized common_aliases entry -> field ids
+    - entries: field id -> (field_key, canonical_name, lower-cased canonical_name),
+      in library order
+    - key_grams / name_grams: trigram indexes over field_key and lower-cased
+      canonical_name, used to shortlist fuzzy candidates
+
+    The index holds plain values, not ORM rows, so one index can be shared by
+    every request; FieldMatcher resolves matched ids in the caller's session.
+    The shared index for an unfiltered library query is refreshed incrementally
+    when the library version (row count, latest updated_at) moves. Refreshes
+    are copy-on-write: changed rows are applied to a copy that then replaces
+    the shared index, so a published index is never modified while other
+    requests read it.
+    """
+
+    _shared = {}
+    _lock = threading.Lock()
+
+    def __init__(self, fields=()):
+        self.by_key = {}
+        self.by_alias = {}
+        self.entries = {}
+        self.key_grams = TrigramIndex()
+        self.name_grams = TrigramIndex()
+        self._aliases = {}
+        self.version = None
+        for field in fields:
+            self.upsert(field)
+
+    def upsert(self, field):
+        """Add a library row, or refresh it in place if it is already indexed"""
+        if field.id in self.entries:
+            # Keep the row's original position in library order
+            self.remove(field.id, keep_position=True)
+            self.entries[field.id] = None
+
+        canonical_name = field.canonical_name or ''
+        self.entries[field.id] = (field.field_key, canonical_name, canonical_name.lower())
+        self.by_key.setdefault(field.field_key, field.id)
+        self.key_grams.add(field.id, field.field_key)
+        self.name_grams.add(field.id, canonical_name.lower())
+
+        aliases = list(dict.fromkeys(
+            FieldMatcher.normalize_field_key(alias) for alias in _parse_aliases(field.common_aliases)
+        ))
+        self._aliases[field.id] = aliases
+        for alias in aliases:
+            self.by_alias.setdefault(alias, []).append(field.id)
+
+    def remove(self, field_id, keep_position=False):
+        entry = self.entries.pop(field_id, None)
+        if entry is None:
+            return
+        if self.by_key.get(entry[0]) == field_id:
+            del self.by_key[entry[0]]
+        self.key_grams.remove(field_id, keep_order=keep_position)
+        self.name_grams.remove(field_id, keep_order=keep_position)
+        for alias in self._aliases.pop(field_id, []):
+            ids = self.by_alias.get(alias, [])
+            if field_id in ids:
+                ids.remove(field_id)
+            if not ids:
+                self.by_alias.pop(alias, None)
+
+    def copy(self):
+        """Independent copy to apply changes to before publishing it"""
+        clone = FieldMatchIndex()
+        clone.by_key = dict(self.by_key)
+        clone.by_alias = {alias: list(ids) for alias, ids in self.by_alias.items()}
+        clone.entries = dict(self.entries)
+        clone.key_grams = self.key_grams.copy()
+        clone.name_grams = self.name_grams.copy()
+        clone._aliases = dict(self._aliases)
+        clone.version = self.version
+        return clone
+
+    def fuzzy_candidates(self, field_key, name_lower, min_similarity, k=50):
+        """
+        Ids worth an exact SequenceMatcher comparison, in library order
+
+        Union of the trigram shortlists for the key and the lower-cased name;
+        entries whose lengths cannot reach min_similarity are pruned.
+        """
+        ids = set(self.key_grams.candidates(field_key, k, min_similarity))
+        ids.update(self.name_grams.candidates(name_lower, k, min_similarity))
+        return sorted(ids, key=self.key_grams.order)
+
+    @classmethod
+    def for_query(cls, field_library_query):
+        """
+        Index over the rows of a Field Library query
+
+        Filtered queries get a one-off index from a single load; the plain
+        library query (e.g. FieldLibrary.query) shares one index per model that
+        only re-reads rows changed since it was last checked.
+        """
+        if field_library_query.whereclause is not None:
+            return cls(field_library_query.all())
+
+        model = field_library_query.column_descriptions[0]['entity']
+        count, latest = field_library_query.with_entities(func.count(model.id), func.max(model.updated_at)).one()
+
+        with cls._lock:
+            index = cls._shared.get(model)
+            if index is not None and index.version == (count, latest):
+                return index
+
+            if index is None or latest is None or index.version is None or index.version[1] is None:
+                index = cls(field_library_query.all())
+            else:
+                # Rows inserted or updated since the last check, applied to a copy:
+                # other requests may be reading the published index
+                changed = field_library_query.filter(model.updated_at >= index.version[1]).all()
+                index = index.copy()
+                for field in changed:
+                    index.upsert(field)
+                if len(index.entries) != count:
+                    # Rows were deleted (or written without updated_at): rebuild
+                    index = cls(field_library_query.all())
+
+            index.version = (count, latest)
+            cls._shared[model] = index
+            return index
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._shared.clear()
+
+
 class FieldMatcher:
     """Smart field matching with fuzzy logic and alias support"""
     
@@ -41,77 +196,129 @@ class FieldMatcher:
         key = re.sub(r'_+', '_', key).strip('_')
         return key
     
+    # Minimum SequenceMatcher ratio for a fuzzy match
+    FUZZY_THRESHOLD = 0.8
+    
+    # Normalized key -> library keys to try, in FIELD_ALIASES order (built on first use)
+    ALIAS_LOOKUPS = {}
+    
     @classmethod
-    def find_match(cls, field_name, field_library_query):
+    def _alias_lookups(cls, field_key):
+        if not cls.ALIAS_LOOKUPS:
+            lookups = {}
+            for canonical_key, aliases in cls.FIELD_ALIASES.items():
+                for key in [canonical_key] + aliases:
+                    lookups.setdefault(key, []).extend([canonical_key] + aliases)
+            cls.ALIAS_LOOKUPS = lookups
+        return cls.ALIAS_LOOKUPS.get(field_key, [])
+    
+    @classmethod
+    def match_index(cls, field_name, index):
         """
-        Find best matching field in library
-        Returns: (field, confidence, match_type) or (None, 0.0, None)
+        Find best matching field id in a FieldMatchIndex
+        Returns: (field_id, confidence, match_type) or (None, 0.0, None)
         """
         field_key = cls.normalize_field_key(field_name)
         
         # 1. Exact key match
-        exact_match = field_library_query.filter_by(field_key=field_key).first()
-        if exact_match:
-            return (exact_match, 1.0, 'exact_key')
+        if field_key in index.by_key:
+            return (index.by_key[field_key], 1.0, 'exact_key')
         
-        # 2. Check aliases
-        for canonical_key, aliases in cls.FIELD_ALIASES.items():
-            if field_key in aliases or field_key == canonical_key:
-                alias_match = field_library_query.filter_by(field_key=canonical_key).first()
-                if alias_match:
-                    return (alias_match, 0.95, 'alias_match')
-                
-                # Check if any alias exists in library
-                for alias in aliases:
-                    alias_match = field_library_query.filter_by(field_key=alias).first()
-                    if alias_match:
-                        return (alias_match, 0.95, 'alias_match')
+        # 2. Check aliases (built-in groups first, then the library's common_aliases)
+        for key in cls._alias_lookups(field_key):
+            if key in index.by_key:
+                return (index.by_key[key], 0.95, 'alias_match')
         
-        # 3. Fuzzy string matching on canonical names
-        all_fields = field_library_query.all()
-        best_match = None
+        if field_key in index.by_alias:
+            return (index.by_alias[field_key][0], 0.95, 'alias_match')
+        
+        # 3. Fuzzy string matching on canonical names, scored exactly on the
+        #    trigram shortlist instead of the whole library
+        name_lower = field_name.lower()
+        best_id = None
         best_score = 0.0
         
-        for field in all_fields:
+        for field_id in index.fuzzy_candidates(field_key, name_lower, cls.FUZZY_THRESHOLD):
+            library_key, _, canonical_lower = index.entries[field_id]
             # Compare normalized keys
-            similarity = SequenceMatcher(None, field_key, field.field_key).ratio()
+            similarity = SequenceMatcher(None, field_key, library_key).ratio()
             
             if similarity > best_score:
                 best_score = similarity
-                best_match = field
+                best_id = field_id
             
             # Also compare canonical names
-            name_similarity = SequenceMatcher(
-                None, 
-                field_name.lower(), 
-                field.canonical_name.lower()
-            ).ratio()
+            name_similarity = SequenceMatcher(None, name_lower, canonical_lower).ratio()
             
             if name_similarity > best_score:
                 best_score = name_similarity
-                best_match = field
+                best_id = field_id
         
         # Only return fuzzy match if confidence is high enough
-        if best_score >= 0.8:
-            return (best_match, best_score, 'fuzzy_match')
+        if best_score >= cls.FUZZY_THRESHOLD:
+            return (best_id, best_score, 'fuzzy_match')
         
         # No match found
         return (None, 0.0, None)
     
+    @staticmethod
+    def _resolve(field_id, field_library_query):
+        """Library row for a matched id, from the caller's session"""
+        if field_id is None:
+            return None
+        model = field_library_query.column_descriptions[0]['entity']
+        return field_library_query.session.get(model, field_id)
+    
     @classmethod
-    def match_fields_batch(cls, field_names, field_library_query):
+    def _decide(cls, field_name, field_library_query, decisions, index=None):
+        """
+        match_index() for one name, answered from a MatchDecisionView when it has it
+        Returns: (field, confidence, match_type, index)
+        """
+        if decisions is not None:
+            # Every step of match_index depends only on the lowercased name
+            cached = decisions.get(field_name.lower())
+            if cached is not None:
+                field_id, confidence, match_type = cached
+                field = cls._resolve(field_id, field_library_query)
+                if field is not None or field_id is None:
+                    return (field, confidence, match_type, index)
+        
+        if index is None:
+            index = FieldMatchIndex.for_query(field_library_query)
+        field_id, confidence, match_type = cls.match_index(field_name, index)
+        if decisions is not None:
+            decisions.put(field_name.lower(), None, (field_id, confidence, match_type))
+        return (cls._resolve(field_id, field_library_query), confidence, match_type, index)
+    
+    @classmethod
+    def find_match(cls, field_name, field_library_query, decisions=None):
+        """
+        Find best matching field in library
+        Returns: (field, confidence, match_type) or (None, 0.0, None)
+        
+        decisions: optional MatchDecisionView ('field_matcher') to reuse and
+        record decisions
+        """
+        field, confidence, match_type, _ = cls._decide(field_name, field_library_query, decisions)
+        return (field, confidence, match_type)
+    
+    @classmethod
+    def match_fields_batch(cls, field_names, field_library_query, decisions=None):
         """
         Match multiple fields at once
         Returns: list of (field_name, matched_field, confidence, match_type)
         """
+        # One index lookup (and at most one library load) for the whole batch,
+        # skipped entirely when every name is already decided
+        index = None
         results = []
         for field_name in field_names:
-            matched_field, confidence, match_type = cls.find_match(field_name, field_library_query)
+            field, confidence, match_type, index = cls._decide(field_name, field_library_query, decisions, index)
             results.append({
                 'field_name': field_name,
-                'matched_field': matched_field,
+                'matched_field': field,
                 'confidence': confidence,
                 'match_type': match_type
             })
         return results
-
@@ -3,7 +3,7 @@ Smart Field Matching API
 Provides endpoints for intelligent field mapping during CSV imports
 """
 
-from field_matcher import FieldMatcher
+from field_matcher import FieldMatcher, FieldMatchIndex
 from difflib import SequenceMatcher
 import re
 
@@ -147,88 +147,77 @@ class SmartFieldMatcher:
         return matches
     
     @classmethod
-    def match_against_field_library(cls, csv_column_name, field_library_query):
-        """Match CSV column against Field Library"""
+    def match_against_field_library(cls, csv_column_name, field_library_query, index=None):
+        """
+        Match CSV column against Field Library
+        
+        Only the exact key, alias hits and the trigram shortlist of the shared
+        FieldMatchIndex are scored, instead of every library row.
+        """
         normalized_csv = cls.normalize_field_key(csv_column_name)
-        matches = []
+        if index is None:
+            index = FieldMatchIndex.for_query(field_library_query)
         
-        all_fields = field_library_query.all()
+        alias_ids = index.by_alias.get(normalized_csv, [])
+        candidate_ids = set(index.fuzzy_candidates(normalized_csv, csv_column_name.lower(), 0.7))
+        candidate_ids.update(alias_ids)
+        if normalized_csv in index.by_key:
+            candidate_ids.add(index.by_key[normalized_csv])
         
-        for field in all_fields:
+        scored = []
+        for field_id in sorted(candidate_ids, key=index.key_grams.order):
+            field_key, canonical_name, _ = index.entries[field_id]
+            
             # Check exact match on field_key
-            if normalized_csv == field.field_key:
-                matches.append({
-                    'field': {
-                        'field_key': field.field_key,
-                        'label': field.canonical_name,
-                        'type': field.field_type,
-                        'source': 'field_library',
-                        'id': field.id,
-                        'usage_count': field.usage_count
-                    },
-                    'confidence': 1.0,
-                    'match_type': 'exact'
-                })
+            if normalized_csv == field_key:
+                scored.append((field_id, 1.0, 'exact'))
                 continue
             
             # Check common_aliases
-            if field.common_aliases:
-                import json
-                aliases = json.loads(field.common_aliases) if isinstance(field.common_aliases, str) else field.common_aliases
-                if normalized_csv in [cls.normalize_field_key(alias) for alias in aliases]:
-                    matches.append({
-                        'field': {
-                            'field_key': field.field_key,
-                            'label': field.canonical_name,
-                            'type': field.field_type,
-                            'source': 'field_library',
-                            'id': field.id,
-                            'usage_count': field.usage_count
-                        },
-                        'confidence': 0.95,
-                        'match_type': 'alias'
-                    })
-                    continue
+            if field_id in alias_ids:
+                scored.append((field_id, 0.95, 'alias'))
+                continue
             
             # Fuzzy match on field_key
-            key_similarity = cls.calculate_similarity(normalized_csv, field.field_key)
+            key_similarity = cls.calculate_similarity(normalized_csv, field_key)
             if key_similarity >= 0.7:
-                matches.append({
-                    'field': {
-                        'field_key': field.field_key,
-                        'label': field.canonical_name,
-                        'type': field.field_type,
-                        'source': 'field_library',
-                        'id': field.id,
-                        'usage_count': field.usage_count
-                    },
-                    'confidence': key_similarity,
-                    'match_type': 'fuzzy'
-                })
+                scored.append((field_id, key_similarity, 'fuzzy'))
                 continue
             
             # Fuzzy match on canonical_name
-            name_similarity = cls.calculate_similarity(csv_column_name, field.canonical_name)
+            name_similarity = cls.calculate_similarity(csv_column_name, canonical_name)
             if name_similarity >= 0.7:
-                matches.append({
-                    'field': {
-                        'field_key': field.field_key,
-                        'label': field.canonical_name,
-                        'type': field.field_type,
-                        'source': 'field_library',
-                        'id': field.id,
-                        'usage_count': field.usage_count
-                    },
-                    'confidence': name_similarity,
-                    'match_type': 'fuzzy'
-                })
+                scored.append((field_id, name_similarity, 'fuzzy'))
+        
+        # Load the matched rows in one query
+        model = field_library_query.column_descriptions[0]['entity']
+        matched_ids = [field_id for field_id, _, _ in scored]
+        rows = {field.id: field for field in field_library_query.filter(model.id.in_(matched_ids)).all()} if matched_ids else {}
+        
+        matches = []
+        for field_id, confidence, match_type in scored:
+            field = rows.get(field_id)
+            if field is None:
+                continue
+            matches.append({
+                'field': {
+                    'field_key': field.field_key,
+                    'label': field.canonical_name,
+                    'type': field.field_type,
+                    'source': 'field_library',
+                    'id': field.id,
+                    'usage_count': field.usage_count
+                },
+                'confidence': confidence,
+                'match_type': match_type
+            })
         
         # Sort by confidence, then by usage_count
         matches.sort(key=lambda x: (x['confidence'], x['field'].get('usage_count', 0)), reverse=True)
         return matches
     
     @classmethod
-    def find_best_matches(cls, csv_column_name, field_library_query, max_suggestions=5):
+    def find_best_matches(cls, csv_column_name, field_library_query, max_suggestions=5, index=None):
         """
         Find best matching fields from both User table and Field Library
         Returns top suggestions ranked by confidence
@@ -240,7 +229,7 @@ class SmartFieldMatcher:
         all_matches.extend(user_matches)
         
         # Match against Field Library
-        library_matches = cls.match_against_field_library(csv_column_name, field_library_query)
+        library_matches = cls.match_against_field_library(csv_column_name, field_library_query, index)
         all_matches.extend(library_matches)
         
         # Remove duplicates (prefer Field Library over User table for same field)
@@ -261,8 +250,9 @@ class SmartFieldMatcher:
         Match multiple CSV columns at once
         Returns a dictionary mapping each column to its best matches
         """
+        index = FieldMatchIndex.for_query(field_library_query)
         results = {}
         for column in csv_columns:
-            results[column] = cls.find_best_matches(column, field_library_query)
+            results[column] = cls.find_best_matches(column, field_library_query, index=index)
         return results
 
@@ -0,0 +1,95 @@
+"""
+Field Resolver
+Batch loading of FieldLibrary rows referenced by application types
+
+ApplicationType.get_fields() used to fetch each referenced library field with
+its own query and re-parse its JSON columns on every call. The resolver loads
+every row referenced by a set of application types with one IN query, and
+keeps the parsed options / validation_rules / conditional_rules per row
+version so unchanged fields are parsed once per process.
+"""
+
+import json
+import threading
+from typing import Dict, List, Any, Iterable, Optional
+
+
+class FieldResolver:
+    """
+    Resolves form_fields_v2 references to FieldLibrary rows
+
+    Args:
+        model: The FieldLibrary model
+
+    Parsed attributes are shared between callers and must be treated as
+    read-only.
+    """
+
+    # SQLite limits bound parameters per statement; larger id sets are chunked
+    IN_BATCH_SIZE = 500
+
+    def __init__(self, model):
+        self.model = model
+        self._parsed: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def referenced_ids(app_types: Iterable[Any]) -> List[int]:
+        """field_library_id of every v2 field reference across the given types"""
+        ids = set()
+        for app_type in app_types:
+            form_fields_v2 = getattr(app_type, 'form_fields_v2', None)
+            if not form_fields_v2 or form_fields_v2.strip() in ['[]', '', 'null']:
+                continue
+            try:
+                refs = json.loads(form_fields_v2)
+            except (TypeError, ValueError):
+                continue
+            for ref in refs or []:
+                if isinstance(ref, dict) and ref.get('field_library_id'):
+                    ids.add(ref['field_library_id'])
+        return sorted(ids)
+
+    def load(self, field_ids: Iterable[int]) -> Dict[int, Any]:
+        """FieldLibrary rows by id, fetched with IN queries"""
+        field_ids = list(dict.fromkeys(field_ids))
+        rows = {}
+        for i in range(0, len(field_ids), self.IN_BATCH_SIZE):
+            chunk = field_ids[i:i + self.IN_BATCH_SIZE]
+            for row in self.model.query.filter(self.model.id.in_(chunk)).all():
+                rows[row.id] = row
+        return rows
+
+    def load_for_types(self, app_types: Iterable[Any]) -> Dict[int, Any]:
+        """Every FieldLibrary row referenced by the given application types, by id"""
+        return self.load(self.referenced_ids(app_types))
+
+    def parsed(self, field) -> Dict[str, Any]:
+        """
+        Parsed JSON attributes of a FieldLibrary row
+
+        Returns:
+            Dictionary with 'options', 'validation' and 'conditionalRules', cached
+            until the row's updated_at or JSON columns change
+        """
+        raw = (field.options, field.validation_rules, field.conditional_rules)
+        cached = self._parsed.get(field.id)
+        if cached is not None and cached[0] == field.updated_at and cached[1] == raw:
+            return cached[2]
+
+        parsed = {
+            'options': json.loads(field.options) if field.options else None,
+            'validation': json.loads(field.validation_rules) if field.validation_rules else {},
+            'conditionalRules': json.loads(field.conditional_rules) if field.conditional_rules else None
+        }
+        with self._lock:
+            self._parsed[field.id] = (field.updated_at, raw, parsed)
+        return parsed
+
+    def invalidate(self, field_id: Optional[int] = None):
+        """Drop parsed attributes for one row (or all rows)"""
+        with self._lock:
+            if field_id is None:
+                self._parsed.clear()
+            else:
+                self._parsed.pop(field_id, None)
@@ -7,6 +7,8 @@ import re
 from difflib import SequenceMatcher
 from typing import Dict, List, Any, Optional
 
+from field_deduplication import DuplicateScanner
+
 class ValidationError(Exception):
     """Custom exception for validation errors"""
     def __init__(self, errors: List[str]):
@@ -284,35 +286,27 @@ class FieldDeduplicator:
     """Detects and merges duplicate fields"""
     
     @staticmethod
-    def find_duplicates(field_library_query) -> List[tuple]:
+    def find_duplicates(field_library_query, workers: Optional[int] = None) -> List[tuple]:
         """
         Find potential duplicate fields based on:
         - Exact field_key match
         - Similar canonical_name (90%+ similarity)
         - Same field_type
+        
+        Candidates are blocked by field_type and scored in parallel by
+        DuplicateScanner; use DuplicateScanner.scan() directly to stream pairs.
         """
         all_fields = field_library_query.all()
-        duplicates = []
-        
-        for i, field1 in enumerate(all_fields):
-            for field2 in all_fields[i+1:]:
-                # Same field_key (shouldn't happen due to unique constraint)
-                if field1.field_key == field2.field_key:
-                    duplicates.append((field1, field2, 1.0, 'exact_key'))
-                    continue
-                
-                # Similar name and same type
-                if field1.field_type == field2.field_type:
-                    similarity = SequenceMatcher(
-                        None,
-                        field1.canonical_name.lower(),
-                        field2.canonical_name.lower()
-                    ).ratio()
-                    
-                    if similarity >= 0.9:
-                        duplicates.append((field1, field2, similarity, 'similar_name'))
-        
-        return duplicates
+        rows = [(field.id, field.field_key, field.canonical_name, field.field_type) for field in all_fields]
+        
+        pairs = sorted(
+            DuplicateScanner(workers=workers).scan(rows),
+            key=lambda pair: (pair['field1_index'], pair['field2_index'])
+        )
+        return [
+            (all_fields[pair['field1_index']], all_fields[pair['field2_index']], pair['similarity'], pair['match_type'])
+            for pair in pairs
+        ]
     
     @staticmethod
     def merge_fields(primary_field, duplicate_field, db_session):
@@ -0,0 +1,54 @@
+"""
+HTTP caching utilities for RegulatePro
+Strong ETags and conditional GET handling for read-heavy catalog endpoints
+
+The ETag is computed from cheap version information (row counts, max
+updated_at, rule versions) before the response body is built, so a client
+that already has the current catalog gets a 304 without the server rendering
+or serializing anything.
+"""
+
+import hashlib
+import json
+
+from flask import request, make_response
+
+# Cache-Control policy per catalog. Editable catalogs are always revalidated
+# (cheap thanks to the ETag); form templates only change when re-seeded.
+CACHE_POLICIES = {
+    'application_types': 'no-cache',
+    'field_library': 'no-cache',
+    'form_templates': 'public, max-age=300',
+    'rules': 'no-cache',
+}
+
+
+def make_etag(*parts):
+    """Strong ETag value (unquoted) from the version parts of a response"""
+    raw = json.dumps(parts, default=str, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def conditional_response(etag, build, policy):
+    """
+    Answer a GET with 304 when the client's If-None-Match has our ETag
+
+    Args:
+        etag: Value from make_etag()
+        build: Callable returning the full response (only called on a miss)
+        policy: Key into CACHE_POLICIES
+
+    Returns:
+        Flask response with ETag and Cache-Control headers set
+    """
+    if request.if_none_match.contains(etag):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            # Errors are not cacheable representations of the catalog
+            return response
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = CACHE_POLICIES.get(policy, 'no-cache')
+    return response
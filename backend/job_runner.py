@@ -0,0 +1,272 @@
+"""
+Background Jobs
+In-process runner for long imports, queued in a local SQLite jobs table
+
+Large licensee CSVs, user lists, document ZIPs and Field Library files take
+longer to import than proxies wait for a response. A route wrapped with
+JobRunner.background() still runs inline by default. Called with
+?background=true, it spools the request body to disk, queues a row in the jobs
+table and answers 202 with the job. A bounded thread pool later replays the
+request against the same view function and stores the view's JSON response as
+the job's result.
+
+The jobs table is the queue, so no broker is needed. Jobs still queued when the
+process stopped are picked up again on start. Jobs that were running are marked
+failed because their transaction was lost with the process.
+
+The table lives in its own SQLite database (the model's bind). An import holds
+the main database's single write lock until it commits, and queueing, progress
+and cancellation writes must not wait behind it.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+from typing import Dict, List, Any, Optional
+
+from flask import request, jsonify
+from sqlalchemy import select
+
+
+class JobCancelled(Exception):
+    """Raised by JobRunner.report() inside a job whose cancellation was requested"""
+
+
+class JobRunner:
+    """
+    Queues, runs and reports background jobs
+
+    Args:
+        app: Flask app (jobs replay requests against its views)
+        db: Flask-SQLAlchemy instance
+        model: The Job model (job_type, status, request_data, body_path, progress,
+            errors, result, result_status, error, cancel_requested, created_at,
+            started_at, finished_at)
+        spool_dir: Where request bodies of queued jobs are kept
+        max_workers: Jobs run at once
+    """
+
+    # Partial errors kept per job (the views' own results carry the full lists)
+    MAX_ERRORS = 500
+
+    # Seconds between progress writes (and cancellation checks) of a running job
+    PROGRESS_INTERVAL = 1.0
+
+    def __init__(self, app, db, model, spool_dir: str, max_workers: int = 1):
+        self.app = app
+        self.db = db
+        self.model = model
+        self.spool_dir = spool_dir
+        self.max_workers = max_workers
+        self._views = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @property
+    def engine(self):
+        return self.db.engines[getattr(self.model, '__bind_key__', None)]
+
+    def _start(self):
+        """Create the table and the pool and resume queued jobs (once, on first use)"""
+        # Not at import: the dev server's reloader process imports the app too but never serves
+        with self._lock:
+            if self._executor is not None:
+                return
+            self.model.__table__.create(self.engine, checkfirst=True)
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='job')
+
+        table = self.model.__table__
+        with self.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.status == 'running').values(
+                status='failed', error='Interrupted by a server restart', finished_at=datetime.utcnow()
+            ))
+            queued = connection.execute(
+                select(table.c.id).where(table.c.status == 'queued').order_by(table.c.id)
+            ).scalars().all()
+        for job_id in queued:
+            self._executor.submit(self._run, job_id)
+
+    def background(self, view):
+        """Let a route run as a background job when called with ?background=true"""
+        self._views[view.__name__] = view
+
+        @wraps(view)
+        def wrapper(**view_args):
+            if getattr(self._local, 'job', None) is None and request.args.get('background') in ('1', 'true'):
+                try:
+                    return self.submit(view.__name__, view_args)
+                except Exception as e:
+                    self.db.session.rollback()
+                    return jsonify({'error': str(e)}), 500
+            return view(**view_args)
+        return wrapper
+
+    def submit(self, job_type: str, view_args: Dict[str, Any]):
+        """Queue the current request as a job; returns the 202 response"""
+        self._start()
+        job = self.model(
+            job_type=job_type,
+            status='queued',
+            request_data=json.dumps({
+                'path': request.path,
+                'method': request.method,
+                'query_string': request.query_string.decode('utf-8'),
+                'content_type': request.content_type,
+                'view_args': view_args
+            }),
+            created_at=datetime.utcnow()
+        )
+        self.db.session.add(job)
+        self.db.session.flush()
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        job.body_path = os.path.join(self.spool_dir, f'job_{job.id}.body')
+        with open(job.body_path, 'wb') as body:
+            shutil.copyfileobj(request.stream, body)
+        self.db.session.commit()
+
+        self._executor.submit(self._run, job.id)
+        return jsonify({'success': True, 'job': job.to_dict()}), 202, {'Location': f'/api/jobs/{job.id}'}
+
+    def _run(self, job_id: int):
+        with self.app.app_context():
+            table = self.model.__table__
+            with self.engine.begin() as connection:
+                claimed = connection.execute(
+                    table.update().where(table.c.id == job_id, table.c.status == 'queued').values(
+                        status='running', started_at=datetime.utcnow()
+                    )
+                ).rowcount
+                row = connection.execute(
+                    select(table.c.job_type, table.c.request_data, table.c.body_path).where(table.c.id == job_id)
+                ).one_or_none()
+            if not claimed or row is None:
+                return
+
+            job = {'id': job_id, 'progress': {}, 'errors': [], 'saved_at': time.monotonic(), 'cancelled': False}
+            values = {}
+            self._local.job = job
+            try:
+                request_data = json.loads(row.request_data)
+                with open(row.body_path, 'rb') as body, self.app.test_request_context(
+                    request_data['path'],
+                    method=request_data['method'],
+                    query_string=request_data['query_string'],
+                    content_type=request_data['content_type'],
+                    input_stream=body,
+                    content_length=os.path.getsize(row.body_path)
+                ):
+                    response = self.app.make_response(self._views[row.job_type](**request_data['view_args']))
+                values['result'] = response.get_data(as_text=True)
+                values['result_status'] = response.status_code
+                values['status'] = 'succeeded' if response.status_code < 400 else 'failed'
+            except Exception as e:
+                values['status'] = 'failed'
+                values['error'] = str(e)
+            finally:
+                self._local.job = None
+                # Views commit or roll back their own work; drop anything a failure left behind
+                self.db.session.rollback()
+
+            # A view catches JobCancelled like any other error, so go by whether report() raised it
+            if job['cancelled']:
+                values['status'] = 'cancelled'
+                values['error'] = 'Cancelled while running'
+
+            values['finished_at'] = datetime.utcnow()
+            self._save_progress(job, **values)
+            self._discard_body(row.body_path)
+
+    def report(self, errors: Optional[List[Any]] = None, **counters):
+        """
+        Record progress of the running job (no-op outside a job)
+
+        Counters are written to the job's row at most every PROGRESS_INTERVAL
+        seconds, which is also when a cancellation request is noticed.
+
+        Args:
+            errors: The job's errors so far (the first MAX_ERRORS are kept)
+            counters: Progress counters to set, e.g. rows=5000, imported=4200
+
+        Raises:
+            JobCancelled: If the job's cancellation was requested
+        """
+        job = getattr(self._local, 'job', None)
+        if job is None:
+            return
+        job['progress'].update(counters)
+        if errors is not None:
+            job['errors'] = list(errors[:self.MAX_ERRORS])
+        if time.monotonic() - job['saved_at'] < self.PROGRESS_INTERVAL:
+            return
+
+        if self._save_progress(job):
+            job['cancelled'] = True
+            raise JobCancelled('Job cancelled')
+
+    def _save_progress(self, job: Dict[str, Any], **values) -> bool:
+        """Write the job's progress (and any other values); returns whether cancellation was requested"""
+        table = self.model.__table__
+        job['saved_at'] = time.monotonic()
+        with self.engine.begin() as connection:
+            connection.execute(table.update().where(table.c.id == job['id']).values(
+                progress=json.dumps(job['progress']),
+                errors=json.dumps(job['errors'], default=str),
+                **values
+            ))
+            return bool(connection.execute(
+                select(table.c.cancel_requested).where(table.c.id == job['id'])
+            ).scalar())
+
+    def cancel(self, job_id: int) -> Optional[str]:
+        """
+        Cancel a queued or running job
+
+        Returns:
+            'cancelled' (was queued), 'cancelling' (running; stops at its next
+            progress write, its writes rolled back) or None if it already ended
+        """
+        self._start()
+        table = self.model.__table__
+        with self.engine.begin() as connection:
+            if connection.execute(
+                table.update().where(table.c.id == job_id, table.c.status == 'queued').values(
+                    status='cancelled', error='Cancelled before it started', finished_at=datetime.utcnow()
+                )
+            ).rowcount:
+                self._discard_body(connection.execute(select(table.c.body_path).where(table.c.id == job_id)).scalar())
+                return 'cancelled'
+
+            if connection.execute(
+                table.update().where(table.c.id == job_id, table.c.status == 'running').values(cancel_requested=True)
+            ).rowcount:
+                return 'cancelling'
+        return None
+
+    def get(self, job_id: int):
+        self._start()
+        return self.db.session.get(self.model, job_id)
+
+    def recent(self, status: Optional[str] = None, job_type: Optional[str] = None, limit: int = 50):
+        self._start()
+        query = self.model.query
+        if status:
+            query = query.filter_by(status=status)
+        if job_type:
+            query = query.filter_by(job_type=job_type)
+        return query.order_by(self.model.id.desc()).limit(limit).all()
+
+    @staticmethod
+    def _discard_body(body_path: Optional[str]):
+        if body_path and os.path.exists(body_path):
+            os.remove(body_path)
+
+
+# Export
+__all__ = ['JobRunner', 'JobCancelled']
@@ -6,10 +6,30 @@ Parses CSV files containing existing licensee/registrant data for bulk import
 import csv
 import io
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
+
+from parallel_csv import map_row_chunks, DEFAULT_CHUNK_SIZE
+
+
+def parse_licensee_rows(rows: List[Tuple[int, Dict[str, str]]]) -> List[tuple]:
+    """Validate a chunk of CSV rows (runs in worker processes when parsing in parallel)"""
+    parser = LicenseeCSVParser()
+    results = []
+    for row_num, licensee, error in parser._parse_rows(rows):
+        results.append((row_num, licensee, error, parser.warnings))
+        parser.warnings = []
+    return results
+
 
 class LicenseeCSVParser:
-    """Parse CSV files containing licensee data"""
+    """
+    Parse CSV files containing licensee data
+    
+    Args:
+        workers: Processes validating rows (0/1 = in this process, None = CPU
+            count); see parallel_csv.py
+        chunk_size: Rows per worker task
+    """
     
     # Standard field mappings (CSV column name -> database field name)
     FIELD_MAPPINGS = {
@@ -77,7 +97,9 @@ class LicenseeCSVParser:
         'Retired'
     ]
     
-    def __init__(self):
+    def __init__(self, workers: Optional[int] = 0, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = chunk_size
         self.errors = []
         self.warnings = []
         self.stats = {
@@ -101,6 +123,21 @@ class LicenseeCSVParser:
             - warnings: List of warning messages
             - stats: Import statistics
         """
+        licensees = list(self.iter_licensees(io.StringIO(csv_content)))
+        return self._build_result(licensees)
+    
+    def iter_licensees(self, csv_file: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """
+        Parse CSV rows lazily, yielding each valid licensee record
+        
+        Args:
+            csv_file: Text file object (or any iterable of lines), e.g. an
+                uploaded file wrapped in io.TextIOWrapper
+        
+        errors, warnings and stats are filled in as rows are read; they are
+        complete once the generator is exhausted. Only the license numbers and
+        emails seen so far are kept, for duplicate detection.
+        """
         self.errors = []
         self.warnings = []
         self.stats = {
@@ -110,19 +147,17 @@ class LicenseeCSVParser:
             'duplicates': 0
         }
         
-        licensees = []
         seen_license_numbers = set()
         seen_emails = set()
         
         try:
             # Parse CSV
-            csv_file = io.StringIO(csv_content)
             reader = csv.DictReader(csv_file)
             
             # Validate headers
             if not reader.fieldnames:
                 self.errors.append("CSV file has no headers")
-                return self._build_result(licensees)
+                return
             
             # Normalize headers (lowercase, strip whitespace)
             normalized_headers = [h.lower().strip().replace(' ', '_') for h in reader.fieldnames]
@@ -145,22 +180,23 @@ class LicenseeCSVParser:
             
             if missing_fields:
                 self.errors.append(f"Missing required columns: {', '.join(missing_fields)}")
-                return self._build_result(licensees)
+                return
+            
+            # Parse rows, here or in worker processes; results come back in row order
+            if self.workers is not None and self.workers <= 1:
+                rows = enumerate(reader, start=2)  # Start at 2 (header is row 1)
+                results = ((row_num, licensee, error, ()) for row_num, licensee, error in self._parse_rows(rows))
+            else:
+                results = map_row_chunks(parse_licensee_rows, reader, self.workers, self.chunk_size)
             
             # Process each row
-            for row_num, row in enumerate(reader, start=2):  # Start at 2 (header is row 1)
+            for row_num, licensee, error, row_warnings in results:
                 self.stats['total_rows'] += 1
+                self.warnings.extend(row_warnings)
                 
                 try:
-                    # Normalize row keys
-                    normalized_row = {}
-                    for key, value in row.items():
-                        if key:
-                            norm_key = key.lower().strip().replace(' ', '_')
-                            normalized_row[norm_key] = value.strip() if value else ''
-                    
-                    # Parse licensee data
-                    licensee = self._parse_licensee_row(normalized_row, row_num)
+                    if error is not None:
+                        raise ValueError(error)
                     
                     if not licensee:
                         continue
@@ -184,8 +220,8 @@ class LicenseeCSVParser:
                     if email:
                         seen_emails.add(email)
                     
-                    licensees.append(licensee)
                     self.stats['successful'] += 1
+                    yield licensee
                     
                 except Exception as e:
                     self.errors.append(f"Row {row_num}: {str(e)}")
@@ -193,8 +229,22 @@ class LicenseeCSVParser:
                     
         except Exception as e:
             self.errors.append(f"Failed to parse CSV: {str(e)}")
-        
-        return self._build_result(licensees)
+    
+    def _parse_rows(self, rows: Iterable[Tuple[int, Dict[str, str]]]) -> Iterator[tuple]:
+        """(row_num, licensee, error message) per row; row warnings go to self.warnings"""
+        for row_num, row in rows:
+            try:
+                # Normalize row keys
+                normalized_row = {}
+                for key, value in row.items():
+                    if key:
+                        norm_key = key.lower().strip().replace(' ', '_')
+                        normalized_row[norm_key] = value.strip() if value else ''
+                
+                # Parse licensee data
+                yield row_num, self._parse_licensee_row(normalized_row, row_num), None
+            except Exception as e:
+                yield row_num, None, str(e)
     
     def _parse_licensee_row(self, row: Dict[str, str], row_num: int) -> Optional[Dict[str, Any]]:
         """Parse a single CSV row into a licensee record"""
@@ -0,0 +1,254 @@
+"""
+Licensee Bulk Import
+Set-based upsert of parsed licensee CSV rows into the User table
+
+The row-at-a-time import looked each row up by license number and by email,
+then probed usernames one query at a time until it found a free one. This
+importer preloads the users the CSV can touch with a few IN-chunked queries,
+decides every insert/update in memory (in row order, with the same lookup
+precedence as before), resolves username collisions in memory and writes the
+result with chunked bulk inserts and updates in the caller's transaction.
+"""
+
+from bisect import insort
+from collections import Counter
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+
+class _KeyIndex:
+    """
+    Users by the current value of one column
+
+    A lookup returns the earliest user (by id, new users after existing ones)
+    whose value is still the key, like filter_by(...).first() did after earlier
+    rows had changed it.
+    """
+
+    def __init__(self, column: str):
+        self.column = column
+        self.entries: Dict[Any, List[tuple]] = {}
+        self._indexed = set()
+
+    def add(self, record: Dict[str, Any]):
+        key = record[self.column]
+        if key and (key, record['_order']) not in self._indexed:
+            self._indexed.add((key, record['_order']))
+            insort(self.entries.setdefault(key, []), (record['_order'], record))
+
+    def first(self, key) -> Optional[Dict[str, Any]]:
+        for _, record in self.entries.get(key, ()):
+            if record[self.column] == key:
+                return record
+        return None
+
+
+class LicenseeBulkImporter:
+    """
+    Upserts licensees (LicenseeCSVParser output) into the User model
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        model: The User model
+
+    upsert() adds the writes to the session; the caller commits (or rolls back)
+    so the whole import is one transaction.
+    """
+
+    # SQLite limits bound parameters per statement; larger key sets are chunked
+    IN_BATCH_SIZE = 500
+    WRITE_BATCH_SIZE = 1000
+
+    # Rows per batch when importing a stream (upsert_stream)
+    STREAM_BATCH_SIZE = 5000
+
+    # Columns a CSV row can overwrite on an existing user
+    UPDATE_FIELDS = [
+        'first_name', 'last_name', 'email', 'phone', 'address', 'city', 'state', 'zipCode',
+        'licenseNumber', 'licenseType', 'licenseStatus', 'issueDate', 'expirationDate'
+    ]
+
+    def __init__(self, db, model):
+        self.db = db
+        self.model = model
+
+    def _chunks(self, values: Iterable[Any], size: int) -> Iterable[List[Any]]:
+        values = list(values)
+        for i in range(0, len(values), size):
+            yield values[i:i + size]
+
+    def _preload_users(self, licensees: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """id, licenseNumber and email of every user a row could match, ordered by id"""
+        model = self.model
+        license_numbers = {row.get('licenseNumber') for row in licensees if row.get('licenseNumber')}
+        emails = {row.get('email') for row in licensees if row.get('email')}
+
+        users = {}
+        for column, keys in ((model.licenseNumber, license_numbers), (model.email, emails)):
+            for chunk in self._chunks(keys, self.IN_BATCH_SIZE):
+                for user_id, license_number, email in self.db.session.query(
+                    model.id, model.licenseNumber, model.email
+                ).filter(column.in_(chunk)):
+                    users[user_id] = {'_order': (0, user_id), 'id': user_id, 'licenseNumber': license_number, 'email': email}
+        return [users[user_id] for user_id in sorted(users)]
+
+    def _taken_usernames(self, bases: Iterable[str]) -> set:
+        """Existing usernames that resolving these base usernames could collide with"""
+        model = self.model
+        counts = Counter(base for base in bases if base is not None)
+        taken = set()
+        for chunk in self._chunks(counts, self.IN_BATCH_SIZE):
+            taken.update(username for (username,) in self.db.session.query(model.username).filter(model.username.in_(chunk)))
+
+        # Bases already in use, or shared by several rows, get numbered; fetch
+        # their numbered variants too (LIKE over-fetches, which only makes the
+        # set larger than needed)
+        colliding = [base for base, count in counts.items() if count > 1 or base in taken]
+        for chunk in self._chunks(colliding, 50):
+            taken.update(username for (username,) in self.db.session.query(model.username).filter(
+                self.db.or_(*[model.username.like(f'{base}%') for base in chunk])
+            ))
+        return taken
+
+    def upsert(self, licensees: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Insert new licensees and update existing ones
+
+        A row updates the user with its license number, else the user with its
+        email, else creates a user with a unique username.
+
+        Returns:
+            Dictionary with imported, updated and skipped counts and row errors
+        """
+        imported = 0
+        updated = 0
+        skipped = 0
+        errors = []
+
+        by_license = _KeyIndex('licenseNumber')
+        by_email = _KeyIndex('email')
+        for record in self._preload_users(licensees):
+            by_license.add(record)
+            by_email.add(record)
+
+        updates: Dict[int, Dict[str, Any]] = {}
+        inserts: List[Dict[str, Any]] = []
+
+        for licensee_data in licensees:
+            try:
+                license_num = licensee_data.get('licenseNumber')
+                email = licensee_data.get('email')
+
+                existing_user = None
+                if license_num:
+                    existing_user = by_license.first(license_num)
+                if not existing_user and email:
+                    existing_user = by_email.first(email)
+
+                if existing_user:
+                    changes = {field: licensee_data[field] for field in self.UPDATE_FIELDS if field in licensee_data}
+                    if 'id' in existing_user:
+                        updates.setdefault(existing_user['id'], {'id': existing_user['id']}).update(changes)
+                    else:
+                        existing_user['values'].update(changes)
+                    existing_user.update((key, changes[key]) for key in ('licenseNumber', 'email') if key in changes)
+                    by_license.add(existing_user)
+                    by_email.add(existing_user)
+                    updated += 1
+                else:
+                    record = {
+                        '_order': (1, len(inserts)),
+                        'licenseNumber': licensee_data.get('licenseNumber'),
+                        'email': licensee_data.get('email'),
+                        'base_username': licensee_data.get('username', email.split('@')[0]),
+                        'values': {
+                            'email': licensee_data.get('email'),
+                            'password_hash': 'temp_hash',  # Temporary password hash
+                            'first_name': licensee_data.get('first_name', ''),
+                            'last_name': licensee_data.get('last_name', ''),
+                            'phone': licensee_data.get('phone'),
+                            'address': licensee_data.get('address'),
+                            'city': licensee_data.get('city'),
+                            'state': licensee_data.get('state'),
+                            'zipCode': licensee_data.get('zipCode'),
+                            'licenseNumber': licensee_data.get('licenseNumber'),
+                            'licenseType': licensee_data.get('licenseType'),
+                            'licenseStatus': licensee_data.get('licenseStatus', 'Active'),
+                            'issueDate': licensee_data.get('issueDate'),
+                            'expirationDate': licensee_data.get('expirationDate')
+                        }
+                    }
+                    inserts.append(record)
+                    by_license.add(record)
+                    by_email.add(record)
+                    imported += 1
+
+            except Exception as e:
+                errors.append({
+                    'licenseNumber': licensee_data.get('licenseNumber'),
+                    'error': str(e)
+                })
+                skipped += 1
+
+        # Make usernames unique in row order: base, base1, base2, ...
+        taken = self._taken_usernames(record['base_username'] for record in inserts)
+        for record in inserts:
+            base_username = username = record['base_username']
+            counter = 1
+            while username in taken:
+                username = f"{base_username}{counter}"
+                counter += 1
+            taken.add(username)
+            record['values']['username'] = username
+
+        # Updates first: a new user may take an email an update moved off an existing one
+        for chunk in self._chunks(list(updates.values()), self.WRITE_BATCH_SIZE):
+            self.db.session.bulk_update_mappings(self.model, chunk)
+        for chunk in self._chunks([record['values'] for record in inserts], self.WRITE_BATCH_SIZE):
+            self.db.session.bulk_insert_mappings(self.model, chunk)
+
+        return {
+            'imported': imported,
+            'updated': updated,
+            'skipped': skipped,
+            'errors': errors
+        }
+
+    def upsert_stream(self, licensees: Iterable[Dict[str, Any]], batch_size: Optional[int] = None,
+                      progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        upsert() over a stream of rows, one fixed-size batch at a time
+
+        Each batch is written (not committed) before the next is read, so later
+        batches see earlier ones through the database and memory stays bounded by
+        the batch size. The caller commits or rolls back the whole import.
+
+        Args:
+            licensees: Iterable of licensee records (e.g. LicenseeCSVParser.iter_licensees)
+            batch_size: Rows per batch (default STREAM_BATCH_SIZE)
+            progress: Called after every batch with the running totals
+                (rows, batches, imported, updated, skipped)
+
+        Returns:
+            Same as upsert(), plus 'rows' and 'batches'
+        """
+        batch_size = batch_size or self.STREAM_BATCH_SIZE
+        totals = {'rows': 0, 'batches': 0, 'imported': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+        batch = []
+        for licensee in licensees:
+            batch.append(licensee)
+            if len(batch) >= batch_size:
+                self._upsert_batch(batch, totals, progress)
+                batch = []
+        if batch:
+            self._upsert_batch(batch, totals, progress)
+        return totals
+
+    def _upsert_batch(self, batch: List[Dict[str, Any]], totals: Dict[str, Any], progress):
+        outcome = self.upsert(batch)
+        for key in ('imported', 'updated', 'skipped'):
+            totals[key] += outcome[key]
+        totals['errors'].extend(outcome['errors'])
+        totals['rows'] += len(batch)
+        totals['batches'] += 1
+        if progress:
+            progress({key: value for key, value in totals.items() if key != 'errors'})
@@ -0,0 +1,177 @@
+"""
+Match Decision Cache
+Persistent field-matching outcomes keyed by normalized field name
+
+Board imports and PDF extractions keep resolving the same names ("First Name",
+"reg_firstname", "Applicant Last Name") against the Field Library. Each
+decision (matched field id, confidence, match type - or "no match") is stored
+in the match_decisions table under (matcher, normalized name, field_type,
+library version), so repeated imports skip matching for names already seen.
+
+The library version is the row count, highest id and latest created_at of the
+library, so adding or removing a field starts a fresh set of decisions. The
+highest id alone is not enough: SQLite hands a deleted top rowid to the next
+insert. created_at rather than updated_at keeps usage_count bookkeeping from
+turning the version over on every import. Edits to the columns the
+matchers read, and merged or deleted fields, are handled by mapper events (see
+watch()).
+"""
+
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import event, inspect
+
+# (field_library_id, confidence, match_type); field_library_id None for "no match"
+Decision = Tuple[Optional[int], float, Optional[str]]
+
+
+class MatchDecisionCache:
+    """
+    Stores and serves match decisions
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        model: The MatchDecision model (matcher, normalized_name, field_type,
+            library_version, field_library_id, confidence, match_type, created_at)
+        field_model: The FieldLibrary model
+
+    Hit/miss counters are per process, like the rule engine's stats.
+    """
+
+    # FieldLibrary columns the matchers read; changing one can change any decision
+    MATCH_COLUMNS = ('field_key', 'canonical_name', 'field_type', 'category', 'common_aliases')
+
+    def __init__(self, db, model, field_model):
+        self.db = db
+        self.model = model
+        self.field_model = field_model
+        self._table_ready = False
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            self.model.__table__.create(self.db.engine, checkfirst=True)
+            self._table_ready = True
+
+    def _table_exists(self, connection) -> bool:
+        if not self._table_ready:
+            self._table_ready = inspect(connection).has_table(self.model.__tablename__)
+        return self._table_ready
+
+    def library_version(self) -> str:
+        """Changes whenever a library field is added or removed (including a delete plus an insert reusing its id)"""
+        count, max_id, latest = self.db.session.query(
+            self.db.func.count(self.field_model.id),
+            self.db.func.max(self.field_model.id),
+            self.db.func.max(self.field_model.created_at)
+        ).one()
+        return f'{count}-{max_id or 0}-{latest.isoformat() if latest else 0}'
+
+    def view(self, matcher: str) -> 'MatchDecisionView':
+        """Decisions of one matcher for the current library version"""
+        self._ensure_table()
+        return MatchDecisionView(self, matcher)
+
+    def _count(self, matcher: str, outcome: str, amount: int = 1):
+        counters = self._stats.setdefault(matcher, {'hits': 0, 'misses': 0, 'stored': 0})
+        counters[outcome] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per matcher and the number of stored decisions"""
+        self._ensure_table()
+        matchers = {}
+        for matcher, counters in self._stats.items():
+            lookups = counters['hits'] + counters['misses']
+            matchers[matcher] = dict(counters, hit_rate=round(counters['hits'] / lookups, 4) if lookups else 0.0)
+        return {
+            'library_version': self.library_version(),
+            'stored_decisions': self.model.query.count(),
+            'matchers': matchers
+        }
+
+    def reset_stats(self):
+        self._stats.clear()
+
+    def invalidate(self, field_library_id: Optional[int] = None):
+        """Drop decisions that point at one library field (or every decision)"""
+        self._ensure_table()
+        query = self.model.query
+        if field_library_id is not None:
+            query = query.filter_by(field_library_id=field_library_id)
+        query.delete(synchronize_session=False)
+        self.db.session.commit()
+
+    def prune(self, library_version: str):
+        """Drop decisions made against other library versions (no commit)"""
+        self.model.query.filter(self.model.library_version != library_version).delete(synchronize_session=False)
+
+    def watch(self):
+        """Invalidate decisions when library fields are edited, merged or deleted"""
+        event.listen(self.field_model, 'after_update', self._on_field_updated)
+        event.listen(self.field_model, 'after_delete', self._on_field_deleted)
+
+    def _on_field_updated(self, mapper, connection, target):
+        # usage_count and other bookkeeping edits don't affect matching
+        state = inspect(target)
+        if not any(state.attrs[column].history.has_changes() for column in self.MATCH_COLUMNS):
+            return
+        if self._table_exists(connection):
+            connection.execute(self.model.__table__.delete())
+
+    def _on_field_deleted(self, mapper, connection, target):
+        if self._table_exists(connection):
+            table = self.model.__table__
+            connection.execute(table.delete().where(table.c.field_library_id == target.id))
+
+
+class MatchDecisionView:
+    """
+    One matcher's stored decisions for the current library version
+
+    All decisions for the version are read with one query. New ones are added
+    to the session by put() and stored when the caller commits. Call refresh()
+    after adding library fields mid-batch.
+    """
+
+    def __init__(self, cache: MatchDecisionCache, matcher: str):
+        self.cache = cache
+        self.matcher = matcher
+        self.refresh()
+
+    def refresh(self):
+        """Re-read the library version and the decisions stored for it"""
+        model = self.cache.model
+        self.library_version = self.cache.library_version()
+        rows = model.query.filter_by(matcher=self.matcher, library_version=self.library_version).all()
+        if not rows:
+            # First use of this version: decisions for older versions can never hit again
+            self.cache.prune(self.library_version)
+        self.decisions: Dict[tuple, Decision] = {
+            (row.normalized_name, row.field_type): (row.field_library_id, row.confidence, row.match_type)
+            for row in rows
+        }
+
+    def get(self, normalized_name: str, field_type: Optional[str] = None) -> Optional[Decision]:
+        """Stored decision, or None on a miss"""
+        decision = self.decisions.get((normalized_name, field_type or ''))
+        self.cache._count(self.matcher, 'hits' if decision is not None else 'misses')
+        return decision
+
+    def put(self, normalized_name: str, field_type: Optional[str], decision: Decision):
+        key = (normalized_name, field_type or '')
+        if key in self.decisions:
+            return
+        self.decisions[key] = decision
+        field_library_id, confidence, match_type = decision
+        self.cache.db.session.add(self.cache.model(
+            matcher=self.matcher,
+            normalized_name=normalized_name,
+            field_type=field_type or '',
+            library_version=self.library_version,
+            field_library_id=field_library_id,
+            confidence=confidence,
+            match_type=match_type,
+            created_at=datetime.utcnow()
+        ))
+        self.cache._count(self.matcher, 'stored')
@@ -0,0 +1,129 @@
+"""
+Character N-gram Candidate Index
+Shortlists fuzzy-match candidates before exact SequenceMatcher scoring
+
+Comparing a name against every Field Library entry with difflib.SequenceMatcher
+is O(N) slow ratios per lookup. This inverted index maps padded character
+trigrams to the entries containing them, so a lookup only touches entries that
+share trigrams with the query, ranks them by trigram overlap (Dice), and drops
+any whose length alone rules out the required similarity. Callers then run the
+exact SequenceMatcher ratio on the shortlist only.
+"""
+
+import heapq
+from typing import Dict, List, Hashable, Optional, Set
+
+
+def ngrams(text: str, n: int = 3) -> Set[str]:
+    """Set of character n-grams of text, padded so short strings and word edges count"""
+    padded = f'{"$" * (n - 1)}{text}{"$" * (n - 1)}'
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def length_bound(len_a: int, len_b: int) -> float:
+    """Upper bound of SequenceMatcher(a, b).ratio() from the lengths alone"""
+    total = len_a + len_b
+    return 2.0 * min(len_a, len_b) / total if total else 1.0
+
+
+class TrigramIndex:
+    """
+    Inverted n-gram index over one text per key
+
+    Args:
+        n: Gram size (3 = trigrams)
+
+    Keys are kept in insertion order; equal-scoring candidates come back in
+    that order so callers keep their first-best tie-breaking.
+    """
+
+    def __init__(self, n: int = 3):
+        self.n = n
+        self.postings: Dict[str, Set[Hashable]] = {}
+        self._grams: Dict[Hashable, Set[str]] = {}
+        self._lengths: Dict[Hashable, int] = {}
+        self._order: Dict[Hashable, int] = {}
+        self._next = 0
+
+    def __len__(self):
+        return len(self._grams)
+
+    def copy(self) -> 'TrigramIndex':
+        """Independent copy (later add/remove calls don't affect this index)"""
+        clone = TrigramIndex(self.n)
+        clone.postings = {gram: set(keys) for gram, keys in self.postings.items()}
+        clone._grams = dict(self._grams)
+        clone._lengths = dict(self._lengths)
+        clone._order = dict(self._order)
+        clone._next = self._next
+        return clone
+
+    def add(self, key: Hashable, text: str):
+        """Index text under key (replacing any text previously indexed for it)"""
+        if key in self._grams:
+            self.remove(key, keep_order=True)
+        if key not in self._order:
+            self._order[key] = self._next
+            self._next += 1
+
+        grams = ngrams(text or '', self.n)
+        self._grams[key] = grams
+        self._lengths[key] = len(text or '')
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key: Hashable, keep_order: bool = False):
+        grams = self._grams.pop(key, None)
+        if grams is None:
+            return
+        del self._lengths[key]
+        if not keep_order:
+            del self._order[key]
+        for gram in grams:
+            keys = self.postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.postings[gram]
+
+    def order(self, key: Hashable) -> int:
+        """Insertion position of a key (for restoring library order)"""
+        return self._order[key]
+
+    def candidates(self, text: str, k: Optional[int] = 50, min_similarity: float = 0.0,
+                   min_overlap: float = 0.0) -> List[Hashable]:
+        """
+        Keys most likely to be similar to text
+
+        Args:
+            text: Query text (normalized the same way as the indexed texts)
+            k: Maximum number of candidates (None for all that pass the bounds)
+            min_similarity: Target SequenceMatcher ratio; keys whose length bound
+                is below it are pruned
+            min_overlap: Minimum Dice coefficient of the trigram sets
+
+        Returns:
+            Keys ordered by trigram overlap (best first), ties in insertion order
+        """
+        query_grams = ngrams(text or '', self.n)
+        query_length = len(text or '')
+
+        shared: Dict[Hashable, int] = {}
+        for gram in query_grams:
+            for key in self.postings.get(gram, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        scored = []
+        for key, count in shared.items():
+            if length_bound(query_length, self._lengths[key]) < min_similarity:
+                continue
+            dice = 2.0 * count / (len(query_grams) + len(self._grams[key]))
+            if dice < min_overlap:
+                continue
+            scored.append((dice, -self._order[key], key))
+
+        if k is not None and len(scored) > k:
+            scored = heapq.nlargest(k, scored, key=lambda item: (item[0], item[1]))
+        else:
+            scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+        return [key for _, _, key in scored]
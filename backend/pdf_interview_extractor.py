@@ -14,12 +14,14 @@ class EnhancedPDFInterviewExtractor:
     Drop-in replacement for PDFInterviewExtractor with additional features
     """
     
-    def __init__(self, db=None, FieldLibrary=None):
+    def __init__(self, db=None, FieldLibrary=None, match_cache=None):
         # OpenAI client is pre-configured via environment variables
         self.client = OpenAI()
         self.model = "gpt-4.1-mini"  # CORRECT MODEL - matches your allowed list
         self.db = db
         self.FieldLibrary = FieldLibrary
+        self.match_cache = match_cache
+        self.match_decisions = None
         
         # Import FieldMatcher for field matching
         if FieldLibrary:
@@ -456,6 +458,10 @@ IMPORTANT:
     
     def _match_fields_with_library(self, interview_data):
         """Match extracted fields against the FieldLibrary"""
+        if self.match_cache:
+            # Names resolved by earlier extractions skip fuzzy matching
+            self.match_decisions = self.match_cache.view('field_matcher')
+        
         for section in interview_data.get('sections', []):
             if 'elements' in section:
                 for element in section['elements']:
@@ -465,6 +471,9 @@ IMPORTANT:
                 for question in section['questions']:
                     self._match_question_fields(question)
         
+        if self.match_decisions is not None and self.db:
+            self.db.session.commit()
+        
         return interview_data
     
     def _match_question_fields(self, question):
@@ -505,7 +514,9 @@ IMPORTANT:
             
             if self.field_matcher:
                 from field_matcher import FieldMatcher
-                matched_field, confidence, match_type = FieldMatcher.find_match(field_name, self.FieldLibrary.query)
+                matched_field, confidence, match_type = FieldMatcher.find_match(
+                    field_name, self.FieldLibrary.query, self.match_decisions
+                )
                 if matched_field and confidence >= 0.7:
                     return matched_field.to_dict()
         
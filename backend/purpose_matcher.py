@@ -4,15 +4,76 @@ Matches fields based on FUNCTION, not wording
 """
 
 import re
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Iterable
 from difflib import SequenceMatcher
 
+# Words stripped by normalize_field_name (they don't change what a field is for)
+NAME_PREFIXES = ['legal', 'formal', 'official', 'full', 'complete', 'applicant', 'your']
+NAME_SUFFIXES = ['required', 'optional', 'if applicable']
+NON_ALPHANUMERIC = re.compile(r'[^a-z0-9\s]')
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list
+    
+    Reports every occurrence of every keyword (including overlapping ones and
+    keywords inside other keywords) in a single pass over the text.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[str]] = [[]]
+        
+        for keyword in dict.fromkeys(keywords):
+            if not keyword:
+                continue
+            state = 0
+            for char in keyword:
+                if char not in self.transitions[state]:
+                    self.transitions.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.transitions[state][char] = len(self.transitions) - 1
+                state = self.transitions[state][char]
+            self.outputs[state].append(keyword)
+        
+        # Breadth-first failure links; each state also reports its fallback's keywords
+        queue = list(self.transitions[0].values())
+        for state in queue:
+            for char, next_state in self.transitions[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.transitions[fallback].get(char, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+                queue.append(next_state)
+    
+    def find(self, text: str) -> List[Tuple[str, int, int]]:
+        """(keyword, start, end) of every keyword occurrence in text"""
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            for keyword in self.outputs[state]:
+                matches.append((keyword, position + 1 - len(keyword), position + 1))
+        return matches
+
+
 class PurposeMatcher:
     """
     Matches fields based on their functional purpose
     Ignores wording differences like "Legal Name" vs "Formal Legal Name"
     """
     
+    # Compiled FIELD_PURPOSES (see _compiled_taxonomy)
+    _taxonomy = None
+    
     # Field purpose taxonomy - what the field DOES
     FIELD_PURPOSES = {
         # Identification
@@ -203,29 +264,29 @@ class PurposeMatcher:
         """Normalize field name for comparison"""
         if not name:
             return ""
+        return _normalize_field_name(name)
+    
+    @classmethod
+    def _compiled_taxonomy(cls):
+        """
+        FIELD_PURPOSES compiled once for detect_purpose
         
-        # Convert to lowercase
-        normalized = name.lower()
-        
-        # Remove common prefixes/suffixes that don't change meaning
-        prefixes = ['legal', 'formal', 'official', 'full', 'complete', 'applicant', 'your']
-        suffixes = ['required', 'optional', 'if applicable']
-        
-        for prefix in prefixes:
-            if normalized.startswith(prefix + ' '):
-                normalized = normalized[len(prefix)+1:]
-        
-        for suffix in suffixes:
-            if normalized.endswith(' ' + suffix):
-                normalized = normalized[:-len(suffix)-1]
-        
-        # Remove special characters
-        normalized = re.sub(r'[^a-z0-9\s]', ' ', normalized)
-        
-        # Normalize whitespace
-        normalized = ' '.join(normalized.split())
-        
-        return normalized
+        Returns:
+            (purpose keys, keyword automaton, purpose indexes per keyword,
+            purpose indexes per field_type)
+        """
+        if cls._taxonomy is None:
+            purpose_keys = list(cls.FIELD_PURPOSES)
+            keyword_purposes: Dict[str, List[int]] = {}
+            type_purposes: Dict[str, List[int]] = {}
+            for index, purpose_key in enumerate(purpose_keys):
+                purpose_def = cls.FIELD_PURPOSES[purpose_key]
+                for keyword in purpose_def['keywords']:
+                    keyword_purposes.setdefault(keyword, []).append(index)
+                type_purposes.setdefault(purpose_def['field_type'], []).append(index)
+            automaton = KeywordAutomaton(keyword_purposes)
+            cls._taxonomy = (purpose_keys, automaton, keyword_purposes, type_purposes)
+        return cls._taxonomy
     
     @classmethod
     def detect_purpose(cls, field_name: str, field_type: Optional[str] = None) -> Optional[str]:
@@ -233,35 +294,40 @@ class PurposeMatcher:
         Detect the purpose of a field based on its name and type
         Returns purpose key (e.g., 'identification.first_name') or None
         """
-        normalized = cls.normalize_field_name(field_name)
-        
-        # Score each purpose
-        scores = {}
-        
-        for purpose_key, purpose_def in cls.FIELD_PURPOSES.items():
-            score = 0
-            
-            # Check if any keyword appears in field name
-            for keyword in purpose_def['keywords']:
-                if keyword in normalized:
-                    score += 10
-                    
-                    # Bonus if keyword is the whole word
-                    if normalized == keyword or normalized.startswith(keyword + ' ') or normalized.endswith(' ' + keyword):
-                        score += 5
-            
-            # Bonus if field type matches
-            if field_type and field_type == purpose_def['field_type']:
-                score += 20
-            
-            if score > 0:
-                scores[purpose_key] = score
-        
-        # Return purpose with highest score (if score > threshold)
+        return cls._detect_normalized_purpose(cls.normalize_field_name(field_name), field_type)
+    
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _detect_normalized_purpose(cls, normalized: str, field_type: Optional[str]) -> Optional[str]:
+        purpose_keys, automaton, keyword_purposes, type_purposes = cls._compiled_taxonomy()
+        
+        # Score each purpose: +10 per keyword found in the name, +5 more if it is
+        # the whole name or its first/last word (each keyword counts once)
+        scores: Dict[int, int] = {}
+        whole_words: Dict[str, bool] = {}
+        length = len(normalized)
+        for keyword, start, end in automaton.find(normalized):
+            whole = (
+                (start == 0 and (end == length or normalized[end] == ' '))
+                or (end == length and start > 0 and normalized[start - 1] == ' ')
+            )
+            whole_words[keyword] = whole_words.get(keyword, False) or whole
+        
+        for keyword, whole in whole_words.items():
+            for index in keyword_purposes[keyword]:
+                scores[index] = scores.get(index, 0) + (15 if whole else 10)
+        
+        # Bonus if field type matches
+        if field_type:
+            for index in type_purposes.get(field_type, []):
+                scores[index] = scores.get(index, 0) + 20
+        
+        # Return purpose with highest score (if score > threshold); ties go to
+        # the purpose listed first in FIELD_PURPOSES
         if scores:
-            best_purpose = max(scores.items(), key=lambda x: x[1])
-            if best_purpose[1] >= 10:  # Minimum confidence threshold
-                return best_purpose[0]
+            best_index = min(scores, key=lambda index: (-scores[index], index))
+            if scores[best_index] >= 10:  # Minimum confidence threshold
+                return purpose_keys[best_index]
         
         return None
     
@@ -270,6 +336,9 @@ class PurposeMatcher:
         """
         Find matching field in library based on purpose
         Returns: (field, confidence, match_type) or (None, 0.0, None)
+        
+        For many fields against the same library use batch(), which avoids a
+        candidate query per field.
         """
         # Detect purpose of incoming field
         purpose = cls.detect_purpose(field_name, field_type)
@@ -292,12 +361,21 @@ class PurposeMatcher:
             field_type=field_type
         ).all()
         
+        return cls.score_candidates(field_name, purpose_def, candidates)
+    
+    @classmethod
+    def score_candidates(cls, field_name: str, purpose_def: Dict, candidates: List) -> Tuple[Optional[any], float, Optional[str]]:
+        """
+        Pick the best candidate for a field with a detected purpose
+        Returns: (field, confidence, match_type) or (None, 0.0, None)
+        """
         if not candidates:
             return (None, 0.0, None)
         
         # Score each candidate
         best_match = None
         best_score = 0.0
+        normalized_input = cls.normalize_field_name(field_name)
         
         for candidate in candidates:
             score = 0.0
@@ -315,7 +393,6 @@ class PurposeMatcher:
             
             # Exact field_key match (after normalization)
             normalized_key = cls.normalize_field_name(candidate.field_key)
-            normalized_input = cls.normalize_field_name(field_name)
             
             if normalized_key == normalized_input:
                 score += 0.5
@@ -330,6 +407,11 @@ class PurposeMatcher:
         
         return (None, 0.0, None)
     
+    @classmethod
+    def batch(cls, field_library_query, decisions=None) -> 'PurposeMatchBatch':
+        """Matcher for many fields against one library query (see PurposeMatchBatch)"""
+        return PurposeMatchBatch(field_library_query, cls, decisions)
+    
     @classmethod
     def suggest_field_key(cls, field_name: str, field_type: str) -> str:
         """
@@ -374,6 +456,112 @@ class PurposeMatcher:
         return 'Other'
 
 
+@lru_cache(maxsize=8192)
+def _normalize_field_name(name: str) -> str:
+    # Convert to lowercase
+    normalized = name.lower()
+    
+    # Remove common prefixes/suffixes that don't change meaning
+    for prefix in NAME_PREFIXES:
+        if normalized.startswith(prefix + ' '):
+            normalized = normalized[len(prefix)+1:]
+    
+    for suffix in NAME_SUFFIXES:
+        if normalized.endswith(' ' + suffix):
+            normalized = normalized[:-len(suffix)-1]
+    
+    # Remove special characters
+    normalized = NON_ALPHANUMERIC.sub(' ', normalized)
+    
+    # Normalize whitespace
+    normalized = ' '.join(normalized.split())
+    
+    return normalized
+
+
+class PurposeMatchBatch:
+    """
+    PurposeMatcher.find_match for many fields against one library query
+    
+    The library is loaded with a single query the first time it is needed and
+    grouped by (category, field_type), so matching a 150-field form costs one
+    query instead of one per field. Results are the same as find_match.
+    
+    Fields created while the batch is in use (e.g. unmatched form fields added
+    to the library mid-loop) must be registered with add() so later fields can
+    match them, as a fresh find_match query would.
+    
+    With a MatchDecisionView as decisions, names already decided for the
+    current library version are answered from it without scoring.
+    """
+    
+    def __init__(self, field_library_query, matcher=PurposeMatcher, decisions=None):
+        self.query = field_library_query
+        self.matcher = matcher
+        self.decisions = decisions
+        self._groups = None
+        self._by_key = None
+        self._by_id = None
+    
+    def _load(self):
+        if self._groups is None:
+            self._groups = {}
+            self._by_key = {}
+            self._by_id = {}
+            for field in self.query.all():
+                self._index(field)
+    
+    def _index(self, field):
+        self._groups.setdefault((field.category, field.field_type), []).append(field)
+        self._by_key.setdefault(field.field_key, field)
+        self._by_id[field.id] = field
+    
+    def add(self, field):
+        """Make a newly created library field visible to later matches"""
+        if self._groups is not None:
+            self._index(field)
+        if self.decisions is not None:
+            # The library version changed; earlier decisions may no longer hold
+            self.decisions.refresh()
+    
+    def get_by_key(self, field_key: str):
+        """Library field with this field_key, or None"""
+        self._load()
+        return self._by_key.get(field_key)
+    
+    def find_match(self, field_name: str, field_type: str) -> Tuple[Optional[any], float, Optional[str]]:
+        """Same as PurposeMatcher.find_match against the batch's library query"""
+        if self.decisions is None:
+            return self._find_match(field_name, field_type)
+        
+        normalized = self.matcher.normalize_field_name(field_name)
+        cached = self.decisions.get(normalized, field_type)
+        if cached is not None:
+            field_id, confidence, match_type = cached
+            if field_id is None:
+                return (None, 0.0, None)
+            self._load()
+            if field_id in self._by_id:
+                return (self._by_id[field_id], confidence, match_type)
+        
+        field, confidence, match_type = self._find_match(field_name, field_type)
+        self.decisions.put(normalized, field_type, (field.id if field is not None else None, confidence, match_type))
+        return (field, confidence, match_type)
+    
+    def _find_match(self, field_name: str, field_type: str) -> Tuple[Optional[any], float, Optional[str]]:
+        purpose = self.matcher.detect_purpose(field_name, field_type)
+        if not purpose:
+            return (None, 0.0, None)
+        
+        purpose_def = self.matcher.FIELD_PURPOSES.get(purpose)
+        if not purpose_def:
+            return (None, 0.0, None)
+        
+        self._load()
+        candidates = self._groups.get((purpose_def['category'], field_type), [])
+        return self.matcher.score_candidates(field_name, purpose_def, candidates)
+
+
 # Export
-__all__ = ['PurposeMatcher']
+__all__ = ['PurposeMatcher', 'PurposeMatchBatch', 'KeywordAutomaton']
 
@@ -0,0 +1,138 @@
+"""
+Rendered Form Cache
+Materialized ApplicationType.to_dict() payloads for the catalog endpoints
+
+Rendering an application type merges form_fields_v2 (with its library fields),
+form_definition, sections, steps, fees and rules. The portal asks for the same
+published types constantly, so each type's rendered JSON is stored in the
+rendered_forms table and served as-is until the type or one of the library
+fields it references changes.
+
+Invalidation happens in the same transaction as the change, through mapper
+events (see watch()), so every edit path - update_application_type, the
+conditional/validation rule endpoints, the wizard steps endpoints and field
+library edits - drops the stale payload without having to call the cache.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Any, Iterable
+
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import IntegrityError
+
+
+class RenderedFormCache:
+    """
+    Serves serialized application types, re-rendering only stale ones
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        model: The RenderedForm model (application_type_id, source_updated_at,
+            field_ids, payload, rendered_at)
+        field_resolver: FieldResolver used to batch-load library fields when
+            re-rendering
+    """
+
+    # SQLite limits bound parameters per statement; larger id sets are chunked
+    IN_BATCH_SIZE = 500
+
+    def __init__(self, db, model, field_resolver):
+        self.db = db
+        self.model = model
+        self.field_resolver = field_resolver
+        self._table_ready = False
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            self.model.__table__.create(self.db.engine, checkfirst=True)
+            self._table_ready = True
+
+    def _table_exists(self, connection) -> bool:
+        if not self._table_ready:
+            self._table_ready = inspect(connection).has_table(self.model.__tablename__)
+        return self._table_ready
+
+    def get_payloads(self, app_types: Iterable[Any]) -> List[str]:
+        """
+        Serialized to_dict() of each application type, in input order
+
+        Stored payloads are used while they were rendered from the type's current
+        updated_at; missing or stale ones are rendered (loading their library
+        fields in one query) and stored for the next request.
+        """
+        self._ensure_table()
+        app_types = list(app_types)
+        ids = [app_type.id for app_type in app_types]
+
+        rows = {}
+        for i in range(0, len(ids), self.IN_BATCH_SIZE):
+            chunk = ids[i:i + self.IN_BATCH_SIZE]
+            for row in self.model.query.filter(self.model.application_type_id.in_(chunk)).all():
+                rows[row.application_type_id] = row
+
+        payloads = {}
+        stale = []
+        for app_type in app_types:
+            row = rows.get(app_type.id)
+            if row is not None and row.source_updated_at == app_type.updated_at:
+                payloads[app_type.id] = row.payload
+            else:
+                stale.append(app_type)
+
+        if stale:
+            field_rows = self.field_resolver.load_for_types(stale)
+            for app_type in stale:
+                payload = json.dumps(app_type.to_dict(field_rows))
+                payloads[app_type.id] = payload
+
+                row = rows.get(app_type.id)
+                if row is None:
+                    row = self.model(application_type_id=app_type.id)
+                    self.db.session.add(row)
+                row.source_updated_at = app_type.updated_at
+                row.field_ids = self._field_ids_text(self.field_resolver.referenced_ids([app_type]))
+                row.payload = payload
+                row.rendered_at = datetime.utcnow()
+
+            try:
+                self.db.session.commit()
+            except IntegrityError:
+                # Another worker stored the same types first; serve what we rendered
+                self.db.session.rollback()
+
+        return [payloads[app_type.id] for app_type in app_types]
+
+    def get_payload(self, app_type) -> str:
+        return self.get_payloads([app_type])[0]
+
+    @staticmethod
+    def _field_ids_text(field_ids: List[int]) -> str:
+        """Referenced library field ids as ',1,2,3,' so one id can be matched with LIKE"""
+        return ',' + ','.join(str(field_id) for field_id in field_ids) + ','
+
+    def invalidate(self, application_type_id=None):
+        """Drop the stored payload of one type (or of every type)"""
+        self._ensure_table()
+        query = self.model.query
+        if application_type_id is not None:
+            query = query.filter_by(application_type_id=application_type_id)
+        query.delete(synchronize_session=False)
+        self.db.session.commit()
+
+    def watch(self, app_type_model, field_model):
+        """Invalidate payloads whenever an application type or library field is written"""
+        event.listen(app_type_model, 'after_update', self._on_type_changed)
+        event.listen(app_type_model, 'after_delete', self._on_type_changed)
+        event.listen(field_model, 'after_update', self._on_field_changed)
+        event.listen(field_model, 'after_delete', self._on_field_changed)
+
+    def _on_type_changed(self, mapper, connection, target):
+        if self._table_exists(connection):
+            table = self.model.__table__
+            connection.execute(table.delete().where(table.c.application_type_id == target.id))
+
+    def _on_field_changed(self, mapper, connection, target):
+        if self._table_exists(connection):
+            table = self.model.__table__
+            connection.execute(table.delete().where(table.c.field_ids.like(f'%,{target.id},%')))
@@ -3,32 +3,457 @@ Rule Engine for Regulatory Platform
 Evaluates rules for fee calculation, application routing, and conditional requirements
 """
 
+import copy
+import hashlib
 import json
 import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Iterable, Iterator
+
+
+# Maps action types to the RuleEngine method that executes them
+ACTION_HANDLERS = {
+    'set_fee': '_action_set_fee',
+    'add_fee': '_action_add_fee',
+    'multiply_fee': '_action_multiply_fee',
+    'apply_penalty': '_action_apply_penalty',
+    'route_to': '_action_route_to',
+    'require_document': '_action_require_document',
+    'set_status': '_action_set_status',
+    'waive_fee': '_action_waive_fee',
+}
+
+
+def _op_equals(condition: 'CompiledCondition', field_value: Any) -> bool:
+    return str(field_value).lower() == condition.text
+
+
+def _op_not_equals(condition: 'CompiledCondition', field_value: Any) -> bool:
+    return str(field_value).lower() != condition.text
+
+
+def _op_contains(condition: 'CompiledCondition', field_value: Any) -> bool:
+    return condition.text in str(field_value).lower()
+
+
+def _op_in(condition: 'CompiledCondition', field_value: Any) -> bool:
+    return condition.choices is not None and str(field_value).lower() in condition.choices
+
+
+def _numeric_op(compare):
+    """Build a numeric operator that coerces only the field value at call time"""
+    def op(condition: 'CompiledCondition', field_value: Any) -> bool:
+        if condition.number is None:
+            return False
+        try:
+            return compare(float(field_value), condition.number)
+        except (ValueError, TypeError):
+            return False
+    return op
+
+
+# Operator string -> comparison function, resolved once per condition
+OPERATORS = {
+    '=': _op_equals,
+    '==': _op_equals,
+    '!=': _op_not_equals,
+    '>': _numeric_op(lambda a, b: a > b),
+    '<': _numeric_op(lambda a, b: a < b),
+    '>=': _numeric_op(lambda a, b: a >= b),
+    '<=': _numeric_op(lambda a, b: a <= b),
+    'contains': _op_contains,
+    'in': _op_in,
+}
+
+NUMERIC_OPERATORS = ('>', '<', '>=', '<=')
+
+
+class CompiledCondition:
+    """
+    A single rule condition, prepared once when the rule set is loaded
+    
+    The compare value is coerced up front for the operator that uses it
+    (lower-cased text, float, or a frozen set of lower-cased choices) and the
+    dotted field path is pre-split, so evaluation only converts the field value.
+    """
+    
+    def __init__(self, condition: Dict):
+        self.field = condition.get('field')
+        self.operator = condition.get('operator')
+        self.value = condition.get('value')
+        
+        self.path = tuple(self.field.split('.')) if isinstance(self.field, str) else None
+        self.test = OPERATORS.get(self.operator)
+        self.text = None
+        self.number = None
+        self.choices = None
+        
+        if self.operator in NUMERIC_OPERATORS:
+            try:
+                self.number = float(self.value)
+            except (ValueError, TypeError):
+                self.number = None
+        elif self.operator == 'in':
+            try:
+                self.choices = frozenset(str(v).lower() for v in self.value)
+            except (ValueError, TypeError):
+                self.choices = None
+        elif self.test is not None:
+            self.text = str(self.value).lower()
+    
+    def matches(self, field_value: Any) -> bool:
+        """True if the (already resolved) field value satisfies this condition"""
+        if field_value is None or self.test is None:
+            return False
+        return self.test(self, field_value)
+
+
+class CompiledAction:
+    """A single rule action with its handler resolved up front"""
+    
+    def __init__(self, action: Dict):
+        self.type = action.get('type')
+        self.params = action
+        self.handler = getattr(RuleEngine, ACTION_HANDLERS[self.type]) if self.type in ACTION_HANDLERS else None
+
+
+class CompiledRule:
+    """A rule whose conditions and actions have been turned into prebuilt objects"""
+    
+    def __init__(self, rule: Dict):
+        self.rule_id = rule.get('rule_id')
+        self.name = rule.get('name')
+        self.type = rule.get('type')
+        self.conditions = [CompiledCondition(c) for c in rule.get('conditions', []) or []]
+        self.actions = [CompiledAction(a) for a in rule.get('actions', []) or []]
+
+
+class CompiledRuleSet:
+    """
+    All rules for one board, parsed and compiled once
+    
+    `version` is the store's version token for the rules the set was built
+    from, so a cached set can be checked for staleness cheaply.
+    """
+    
+    def __init__(self, board_id: str, rules: List[Dict], version: Optional[Tuple] = None):
+        self.board_id = board_id
+        self.raw_rules = rules
+        self.version = version
+        self.rules = [CompiledRule(rule) for rule in rules if isinstance(rule, dict)]
+        
+        # Index from top-level field name to the positions of rules whose
+        # conditions read it, used to re-evaluate only rules touched by an edit
+        self.field_index: Dict[str, List[int]] = {}
+        self.always_check: List[int] = []
+        for position, rule in enumerate(self.rules):
+            for condition in rule.conditions:
+                if not isinstance(condition.field, str):
+                    self.always_check.append(position)
+                    continue
+                root = condition.field.split('.', 1)[0]
+                positions = self.field_index.setdefault(root, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+    
+    def __len__(self):
+        return len(self.rules)
+    
+    def rules_for_fields(self, field_names: Iterable[str]) -> List[int]:
+        """Positions (in evaluation order) of rules whose conditions reference any of the given fields"""
+        positions = set(self.always_check)
+        for name in field_names:
+            root = str(name).split('.', 1)[0]
+            positions.update(self.field_index.get(root, ()))
+        return sorted(positions)
+
+
+class FileRuleStore:
+    """
+    Stores each board's rules as {rules_dir}/{board_id}_rules.json
+    
+    Versions are (mtime, size) stamps, so a cached rule set can be checked
+    for staleness with a single stat call.
+    """
+    
+    def __init__(self, rules_dir: str = 'rules'):
+        self.rules_dir = rules_dir
+        os.makedirs(rules_dir, exist_ok=True)
+    
+    def _rules_file(self, board_id: str) -> str:
+        """Path of the JSON rules file for a board"""
+        return os.path.join(self.rules_dir, f'{board_id}_rules.json')
+    
+    def get_version(self, board_id: str) -> Optional[Tuple]:
+        """Version stamp of the board's rules file, or None if it does not exist"""
+        try:
+            stat = os.stat(self._rules_file(board_id))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def load(self, board_id: str) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Read and parse the board's rules file, returning (rules, version)"""
+        version = self.get_version(board_id)
+        try:
+            with open(self._rules_file(board_id), 'r') as f:
+                return json.load(f), version
+        except Exception as e:
+            print(f"Error loading rules: {e}")
+            return [], version
+    
+    def save(self, board_id: str, rules: List[Dict]) -> Optional[Tuple]:
+        """
+        Write the board's rules file
+        
+        The file is written to a temporary path and swapped into place, so
+        readers never see a half-written file.
+        """
+        rules_file = self._rules_file(board_id)
+        fd, tmp_path = tempfile.mkstemp(dir=self.rules_dir, prefix=f'.{board_id}_', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(rules, f, indent=2)
+            os.replace(tmp_path, rules_file)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return self.get_version(board_id)
+
+
+class RuleStats:
+    """Aggregated counters for one rule across evaluations"""
+    
+    def __init__(self, rule_id: str, name: Optional[str] = None):
+        self.rule_id = rule_id
+        self.name = name
+        self.evaluations = 0
+        self.hits = 0
+        self.total_time = 0.0
+        self.short_circuits: Dict[int, int] = {}  # condition index -> times it failed the rule
+    
+    def record(self, matched: bool, failed_at: Optional[int], elapsed: float):
+        self.evaluations += 1
+        self.total_time += elapsed
+        if matched:
+            self.hits += 1
+        elif failed_at is not None:
+            self.short_circuits[failed_at] = self.short_circuits.get(failed_at, 0) + 1
+    
+    def to_dict(self):
+        return {
+            'rule_id': self.rule_id,
+            'name': self.name,
+            'evaluations': self.evaluations,
+            'hits': self.hits,
+            'hit_rate': round(self.hits / self.evaluations, 4) if self.evaluations else 0,
+            'total_time_ms': round(self.total_time * 1000, 3),
+            'avg_time_ms': round(self.total_time * 1000 / self.evaluations, 4) if self.evaluations else 0,
+            'short_circuits': {str(k): v for k, v in sorted(self.short_circuits.items())}
+        }
+
 
 class RuleEngine:
     """
     Main rule engine class that evaluates rules against application data
     """
     
-    def __init__(self, rules_dir='rules'):
-        """Initialize rule engine with rules directory"""
+    # Records whose per-rule match outcomes are kept for evaluate_incremental
+    MATCH_STATE_SIZE = 4096
+    
+    def __init__(self, rules_dir='rules', collect_stats: bool = False, store=None):
+        """
+        Initialize rule engine with rules directory
+        
+        Args:
+            rules_dir: Directory holding {board_id}_rules.json files
+            collect_stats: Time every evaluation and keep per-rule counters
+                (traced evaluations are always counted)
+            store: Where rules are persisted; defaults to a FileRuleStore on
+                rules_dir (see rule_store.DatabaseRuleStore for the DB-backed one)
+        """
         self.rules_dir = rules_dir
-        os.makedirs(rules_dir, exist_ok=True)
+        self.store = store or FileRuleStore(rules_dir)
+        
+        # Compiled rule sets keyed by board_id, invalidated by file mtime/size
+        self._rule_sets: Dict[str, CompiledRuleSet] = {}
+        self._cache_lock = threading.Lock()
         
-    def evaluate_rules(self, application_data: Dict[str, Any], rule_type: str = 'all') -> Dict[str, Any]:
+        # Per-board, per-rule counters: {board_id: {rule_key: RuleStats}}
+        self.collect_stats = collect_stats
+        self._stats: Dict[str, Dict[str, RuleStats]] = {}
+        self._board_evaluations: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        
+        # Per-rule match outcomes of recently evaluated records (evaluate_incremental),
+        # keyed by board, rules version and a fingerprint of the record
+        self._match_states: 'OrderedDict[tuple, List[Optional[bool]]]' = OrderedDict()
+        self._match_states_lock = threading.Lock()
+        self._match_state_lookups = {'hits': 0, 'misses': 0}
+        
+    def evaluate_rules(self, application_data: Dict[str, Any], rule_type: str = 'all',
+                       trace: bool = False) -> Dict[str, Any]:
         """
         Evaluate all rules for an application
         
         Args:
             application_data: Dictionary containing application fields and values
             rule_type: Type of rules to evaluate ('fee', 'routing', 'requirements', 'all')
+            trace: If True, add a 'trace' list to the results with one entry per
+                rule: whether it matched, which condition failed, actions applied
+                and time spent
             
         Returns:
             Dictionary with evaluation results
         """
+        # Load compiled rules for the board (cached between calls)
+        board_id = application_data.get('board_id', 'default')
+        rule_set = self.get_rule_set(board_id)
+        
+        return self._evaluate_rule_set(rule_set, application_data, rule_type, trace=trace)
+    
+    def evaluate_many(self, records: Iterable[Dict[str, Any]], board_id: str = 'default',
+                      rule_type: str = 'all', capture_errors: bool = False,
+                      trace: bool = False) -> List[Dict[str, Any]]:
+        """
+        Evaluate rules for a whole cohort of applications against one board
+        
+        Args:
+            records: List (or any iterable/generator) of application data dictionaries
+            board_id: Board whose rules are applied to every record
+            rule_type: Type of rules to evaluate ('fee', 'routing', 'requirements', 'all')
+            capture_errors: If True, a record that fails to evaluate yields
+                {'error': ..., 'index': ...} instead of aborting the batch
+            trace: Include a per-rule 'trace' in every result (see evaluate_rules)
+            
+        Returns:
+            List of evaluation results, in the same order as the input records
+        """
+        return list(self.iter_evaluate_many(records, board_id, rule_type, capture_errors, trace))
+    
+    def iter_evaluate_many(self, records: Iterable[Dict[str, Any]], board_id: str = 'default',
+                           rule_type: str = 'all', capture_errors: bool = False,
+                           trace: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming variant of evaluate_many - yields one result per record as it is evaluated
+        
+        The board's rule set is resolved once, before the first record, and reused
+        for the whole stream.
+        """
+        rule_set = self.get_rule_set(board_id)
+        
+        for index, application_data in enumerate(records):
+            try:
+                if not isinstance(application_data, dict):
+                    raise TypeError(f'Record {index} is not an object')
+                yield self._evaluate_rule_set(rule_set, application_data, rule_type, trace=trace)
+            except Exception as e:
+                if not capture_errors:
+                    raise
+                yield {'index': index, 'error': str(e)}
+    
+    def evaluate_incremental(self, old_record: Dict[str, Any], changes: Dict[str, Any],
+                             rule_type: str = 'all') -> Dict[str, Any]:
+        """
+        Re-evaluate rules after an edit, re-checking only rules that read the changed fields
+        
+        Conditions of untouched rules are not re-evaluated; their match outcome is
+        carried over from the outcomes the engine itself stored when it evaluated
+        old_record. Actions of all matching rules are then replayed in rule
+        order, since fee actions depend on each other.
+        
+        Match outcomes are never taken from the client: they are looked up by
+        a fingerprint of old_record, so they always belong to exactly that
+        record. An unknown record (evicted, or never evaluated here) gets a full
+        evaluation.
+        
+        Args:
+            old_record: Application data before the edit
+            changes: Top-level keys that changed, mapped to their new values
+            rule_type: Type of rules to evaluate ('fee', 'routing', 'requirements', 'all')
+            
+        Returns:
+            Evaluation results for the updated record, plus 'rules_version'
+        """
+        record = dict(old_record)
+        record.update(changes)
+        
+        board_id = record.get('board_id', 'default')
+        rule_set = self.get_rule_set(board_id)
+        
+        matches = None
+        if 'board_id' not in changes:
+            matches = self._get_match_state(board_id, rule_set, old_record)
+            if matches is not None:
+                for position in rule_set.rules_for_fields(changes.keys()):
+                    matches[position] = None
+        
+        if matches is None:
+            matches = [None] * len(rule_set.rules)
+        
+        results = self._evaluate_rule_set(rule_set, record, rule_type, matches)
+        self._put_match_state(board_id, rule_set, record, matches)
+        results['rules_version'] = list(rule_set.version or [])
+        return results
+    
+    @staticmethod
+    def _match_state_key(board_id: str, rule_set: 'CompiledRuleSet', record: Dict[str, Any]) -> tuple:
+        fingerprint = hashlib.sha256(
+            json.dumps(record, sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        return (board_id, tuple(rule_set.version or ()), fingerprint)
+    
+    def _get_match_state(self, board_id: str, rule_set: 'CompiledRuleSet',
+                         record: Dict[str, Any]) -> Optional[List[Optional[bool]]]:
+        """Copy of the stored outcomes for this exact record, or None"""
+        key = self._match_state_key(board_id, rule_set, record)
+        with self._match_states_lock:
+            matches = self._match_states.get(key)
+            if matches is None or len(matches) != len(rule_set.rules):
+                self._match_state_lookups['misses'] += 1
+                return None
+            self._match_state_lookups['hits'] += 1
+            self._match_states.move_to_end(key)
+            return list(matches)
+    
+    def get_match_state_stats(self) -> Dict[str, Any]:
+        """Stored-outcome lookups of evaluate_incremental: hits, misses, hit_rate and stored records"""
+        with self._match_states_lock:
+            hits, misses = self._match_state_lookups['hits'], self._match_state_lookups['misses']
+            return {
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'stored': len(self._match_states)
+            }
+    
+    def _put_match_state(self, board_id: str, rule_set: 'CompiledRuleSet',
+                         record: Dict[str, Any], matches: List[Optional[bool]]):
+        key = self._match_state_key(board_id, rule_set, record)
+        with self._match_states_lock:
+            self._match_states[key] = list(matches)
+            self._match_states.move_to_end(key)
+            while len(self._match_states) > self.MATCH_STATE_SIZE:
+                self._match_states.popitem(last=False)
+    
+    def _evaluate_rule_set(self, rule_set: CompiledRuleSet, application_data: Dict[str, Any],
+                           rule_type: str = 'all', matches: Optional[List[Optional[bool]]] = None,
+                           trace: bool = False) -> Dict[str, Any]:
+        """
+        Evaluate a single application against an already-loaded rule set
+        
+        When `matches` is given (one entry per rule: True/False, or None if unknown),
+        only rules with an unknown outcome have their conditions evaluated, and the
+        list is filled in place with the outcomes.
+        """
+        if trace or self.collect_stats:
+            return self._evaluate_rule_set_traced(rule_set, application_data, rule_type, matches, trace)
+        
         results = {
             'fees': {},
             'routing': {},
@@ -38,32 +463,161 @@ class RuleEngine:
             'total_fee': 0
         }
         
-        # Load rules for the board
-        board_id = application_data.get('board_id', 'default')
-        rules = self.load_rules(board_id)
-        
-        if not rules:
+        if not rule_set.rules:
             return results
             
         # Evaluate each rule
-        for rule in rules:
-            if rule_type != 'all' and rule.get('type') != rule_type:
+        for position, rule in enumerate(rule_set.rules):
+            if rule_type != 'all' and rule.type != rule_type:
                 continue
+            
+            if matches is not None and matches[position] is not None:
+                matched = matches[position]
+            else:
+                matched = self._evaluate_conditions(rule.conditions, application_data)
+                if matches is not None:
+                    matches[position] = matched
                 
-            if self._evaluate_conditions(rule.get('conditions', []), application_data):
-                self._execute_actions(rule.get('actions', []), application_data, results)
+            if matched:
+                self._execute_actions(rule.actions, application_data, results)
         
         # Calculate total fee
         results['total_fee'] = self._calculate_total_fee(results)
         
         return results
     
-    def _evaluate_conditions(self, conditions: List[Dict], data: Dict) -> bool:
+    def _evaluate_rule_set_traced(self, rule_set: CompiledRuleSet, application_data: Dict[str, Any],
+                                  rule_type: str, matches: Optional[List[Optional[bool]]],
+                                  trace: bool) -> Dict[str, Any]:
+        """Instrumented variant of _evaluate_rule_set that times each rule and records why it failed"""
+        results = {
+            'fees': {},
+            'routing': {},
+            'requirements': [],
+            'status_changes': [],
+            'penalties': [],
+            'total_fee': 0
+        }
+        trace_entries = []
+        samples = []
+        
+        for position, rule in enumerate(rule_set.rules):
+            if rule_type != 'all' and rule.type != rule_type:
+                continue
+            
+            started = time.perf_counter()
+            failed_at = None
+            cached = matches is not None and matches[position] is not None
+            
+            if cached:
+                matched = matches[position]
+            else:
+                failed_at = self._first_failed_condition(rule.conditions, application_data)
+                matched = failed_at is None
+                if matches is not None:
+                    matches[position] = matched
+            
+            if matched:
+                self._execute_actions(rule.actions, application_data, results)
+            
+            elapsed = time.perf_counter() - started
+            samples.append((position, rule, matched, failed_at, elapsed))
+            
+            if trace:
+                entry = {
+                    'rule_id': rule.rule_id,
+                    'name': rule.name,
+                    'type': rule.type,
+                    'matched': matched,
+                    'actions_applied': [a.type for a in rule.actions] if matched else [],
+                    'time_ms': round(elapsed * 1000, 4)
+                }
+                if cached:
+                    entry['cached'] = True
+                if failed_at is not None:
+                    condition = rule.conditions[failed_at]
+                    entry['failed_condition'] = {
+                        'index': failed_at,
+                        'field': condition.field,
+                        'operator': condition.operator,
+                        'value': condition.value
+                    }
+                trace_entries.append(entry)
+        
+        results['total_fee'] = self._calculate_total_fee(results)
+        self._record_stats(rule_set.board_id, samples)
+        
+        if trace:
+            results['trace'] = trace_entries
+        return results
+    
+    def _record_stats(self, board_id: str, samples: List[Tuple]):
+        """Fold one evaluation's per-rule samples into the aggregated counters"""
+        with self._stats_lock:
+            self._board_evaluations[board_id] = self._board_evaluations.get(board_id, 0) + 1
+            board_stats = self._stats.setdefault(board_id, {})
+            for position, rule, matched, failed_at, elapsed in samples:
+                key = rule.rule_id or f'#{position}'
+                stats = board_stats.get(key)
+                if stats is None:
+                    stats = board_stats[key] = RuleStats(key, rule.name)
+                stats.record(matched, failed_at, elapsed)
+    
+    def get_stats(self, board_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Aggregated rule counters
+        
+        Args:
+            board_id: Limit to one board (all boards if None)
+            
+        Returns:
+            {board_id: {'evaluations', 'rule_evaluations', 'hits', 'hit_rate',
+                        'total_time_ms', 'rules': [...]}}
+        """
+        with self._stats_lock:
+            boards = [board_id] if board_id is not None else list(self._stats.keys())
+            summary = {}
+            for board in boards:
+                rules = [stats.to_dict() for stats in self._stats.get(board, {}).values()]
+                rule_evaluations = sum(r['evaluations'] for r in rules)
+                hits = sum(r['hits'] for r in rules)
+                summary[board] = {
+                    'evaluations': self._board_evaluations.get(board, 0),
+                    'rule_evaluations': rule_evaluations,
+                    'hits': hits,
+                    'hit_rate': round(hits / rule_evaluations, 4) if rule_evaluations else 0,
+                    'total_time_ms': round(sum(r['total_time_ms'] for r in rules), 3),
+                    'rules': rules
+                }
+            return summary
+    
+    def reset_stats(self, board_id: Optional[str] = None):
+        """Clear aggregated counters for one board, or all boards"""
+        with self._stats_lock:
+            if board_id is None:
+                self._stats.clear()
+                self._board_evaluations.clear()
+            else:
+                self._stats.pop(board_id, None)
+                self._board_evaluations.pop(board_id, None)
+    
+    def _first_failed_condition(self, conditions: List[CompiledCondition], data: Dict) -> Optional[int]:
+        """Index of the condition that short-circuits the rule, or None if all conditions are met"""
+        for index, condition in enumerate(conditions):
+            if condition.path is not None:
+                field_value = self._get_path_value(condition.path, data)
+            else:
+                field_value = self._get_field_value(condition.field, data)
+            if not condition.matches(field_value):
+                return index
+        return None
+    
+    def _evaluate_conditions(self, conditions: List[CompiledCondition], data: Dict) -> bool:
         """
         Evaluate if all conditions are met
         
         Args:
-            conditions: List of condition dictionaries
+            conditions: List of compiled conditions
             data: Application data to evaluate against
             
         Returns:
@@ -73,15 +627,14 @@ class RuleEngine:
             return True
             
         for condition in conditions:
-            field = condition.get('field')
-            operator = condition.get('operator')
-            value = condition.get('value')
-            
             # Get field value from data
-            field_value = self._get_field_value(field, data)
+            if condition.path is not None:
+                field_value = self._get_path_value(condition.path, data)
+            else:
+                field_value = self._get_field_value(condition.field, data)
             
             # Evaluate condition
-            if not self._compare_values(field_value, operator, value):
+            if not condition.matches(field_value):
                 return False
                 
         return True
@@ -108,6 +661,17 @@ class RuleEngine:
                 
         return value
     
+    @staticmethod
+    def _get_path_value(path: Tuple[str, ...], data: Dict) -> Any:
+        """Same as _get_field_value, for a path already split into its parts"""
+        value = data
+        for part in path:
+            if isinstance(value, dict):
+                value = value.get(part)
+            else:
+                return None
+        return value
+    
     def _compare_values(self, field_value: Any, operator: str, compare_value: Any) -> bool:
         """
         Compare two values using the specified operator
@@ -145,34 +709,18 @@ class RuleEngine:
         except (ValueError, TypeError):
             return False
     
-    def _execute_actions(self, actions: List[Dict], data: Dict, results: Dict):
+    def _execute_actions(self, actions: List[CompiledAction], data: Dict, results: Dict):
         """
         Execute rule actions and update results
         
         Args:
-            actions: List of action dictionaries
+            actions: List of compiled actions
             data: Application data
             results: Results dictionary to update
         """
         for action in actions:
-            action_type = action.get('type')
-            
-            if action_type == 'set_fee':
-                self._action_set_fee(action, data, results)
-            elif action_type == 'add_fee':
-                self._action_add_fee(action, data, results)
-            elif action_type == 'multiply_fee':
-                self._action_multiply_fee(action, data, results)
-            elif action_type == 'apply_penalty':
-                self._action_apply_penalty(action, data, results)
-            elif action_type == 'route_to':
-                self._action_route_to(action, data, results)
-            elif action_type == 'require_document':
-                self._action_require_document(action, data, results)
-            elif action_type == 'set_status':
-                self._action_set_status(action, data, results)
-            elif action_type == 'waive_fee':
-                self._action_waive_fee(action, data, results)
+            if action.handler is not None:
+                action.handler(self, action.params, data, results)
     
     def _action_set_fee(self, action: Dict, data: Dict, results: Dict):
         """Set a fee to a specific amount"""
@@ -265,6 +813,48 @@ class RuleEngine:
                 total += float(amount)
         return round(total, 2)
     
+    def get_rule_set(self, board_id: str) -> CompiledRuleSet:
+        """
+        Get the compiled rule set for a board
+        
+        Rules are only re-read and compiled when the store reports a new
+        version; otherwise this costs one cheap version check (a stat call
+        for the file store).
+        
+        Args:
+            board_id: Board identifier
+            
+        Returns:
+            CompiledRuleSet (empty if the board has no rules)
+        """
+        version = self.store.get_version(board_id)
+        
+        cached = self._rule_sets.get(board_id)
+        if cached is not None and cached.version == version:
+            return cached
+        
+        with self._cache_lock:
+            # Another thread may have refreshed the entry while we waited
+            cached = self._rule_sets.get(board_id)
+            if cached is not None and cached.version == version:
+                return cached
+            
+            if version is None:
+                rules = []
+            else:
+                rules, version = self.store.load(board_id)
+            rule_set = CompiledRuleSet(board_id, rules if isinstance(rules, list) else [], version)
+            self._rule_sets[board_id] = rule_set
+            return rule_set
+    
+    def invalidate_cache(self, board_id: Optional[str] = None):
+        """Drop cached rule sets for one board, or for all boards"""
+        with self._cache_lock:
+            if board_id is None:
+                self._rule_sets.clear()
+            else:
+                self._rule_sets.pop(board_id, None)
+    
     def load_rules(self, board_id: str) -> List[Dict]:
         """
         Load rules for a specific board
@@ -275,22 +865,20 @@ class RuleEngine:
         Returns:
             List of rule dictionaries
         """
-        rules_file = os.path.join(self.rules_dir, f'{board_id}_rules.json')
-        
-        if not os.path.exists(rules_file):
-            return []
-            
-        try:
-            with open(rules_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading rules: {e}")
-            return []
+        # Hand out a copy so callers can't mutate the cached rule set
+        return copy.deepcopy(self.get_rule_set(board_id).raw_rules)
+    
+    def get_rules_version(self, board_id: str) -> List:
+        """JSON-friendly version token of the board's current rules ([] if none)"""
+        return list(self.get_rule_set(board_id).version or [])
     
     def save_rules(self, board_id: str, rules: List[Dict]) -> bool:
         """
         Save rules for a specific board
         
+        The store publishes the new rules atomically and the compiled cache
+        entry is replaced in the same step.
+        
         Args:
             board_id: Board identifier
             rules: List of rule dictionaries
@@ -298,11 +886,11 @@ class RuleEngine:
         Returns:
             True if successful, False otherwise
         """
-        rules_file = os.path.join(self.rules_dir, f'{board_id}_rules.json')
-        
         try:
-            with open(rules_file, 'w') as f:
-                json.dump(rules, f, indent=2)
+            rule_set = CompiledRuleSet(board_id, copy.deepcopy(rules))
+            with self._cache_lock:
+                rule_set.version = self.store.save(board_id, rules)
+                self._rule_sets[board_id] = rule_set
             return True
         except Exception as e:
             print(f"Error saving rules: {e}")
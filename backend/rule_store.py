@@ -0,0 +1,172 @@
+"""
+Database-backed Rule Storage
+Versioned, atomically published rule sets for the RuleEngine
+
+Every save inserts a new (board_id, version) row; the highest version is the
+live one. Workers only ask the database for the current version number (at
+most once per check interval) and re-read the rules when it has moved, so
+evaluation never touches the filesystem and all workers converge on the same
+published rules.
+
+Reads, publishes and legacy seeding run on their own engine connections, not
+the request's session, so they never commit or roll back unrelated work of
+the request that triggers them.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+
+class DatabaseRuleStore:
+    """
+    Rule store backed by a versioned rules table
+
+    Args:
+        db: Flask-SQLAlchemy instance
+        model: The RuleSetVersion model (board_id, version, rules, created_at)
+        check_interval: Seconds a worker trusts its last version lookup before
+            asking the database again (saves from the same worker apply at once)
+        legacy_dir: Directory of old {board_id}_rules.json files; a board with no
+            rows yet is seeded from its file on first access. While the seed
+            cannot be written (database locked), the file is served as version 0.
+    """
+
+    PUBLISH_RETRIES = 5
+
+    def __init__(self, db, model, check_interval: float = 1.0, legacy_dir: Optional[str] = 'rules'):
+        self.db = db
+        self.model = model
+        self.check_interval = check_interval
+        self.legacy_dir = legacy_dir
+        self._versions: Dict[str, Tuple[Optional[Tuple], float]] = {}
+        # Legacy rules served from their file until the seed can be written
+        self._legacy_rules: Dict[str, List[Dict]] = {}
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def _ensure_table(self):
+        if not self._table_ready:
+            self.model.__table__.create(self.db.engine, checkfirst=True)
+            self._table_ready = True
+
+    def _latest_version(self, board_id: str) -> Optional[int]:
+        table = self.model.__table__
+        with self.db.engine.connect() as connection:
+            return connection.execute(
+                select(func.max(table.c.version)).where(table.c.board_id == board_id)
+            ).scalar()
+
+    def get_version(self, board_id: str) -> Optional[Tuple]:
+        """Current published version of a board's rules as a (version,) tuple, or None"""
+        now = time.monotonic()
+        cached = self._versions.get(board_id)
+        if cached is not None and now - cached[1] < self.check_interval:
+            return cached[0]
+
+        self._ensure_table()
+        latest = self._latest_version(board_id)
+        if latest is None and self._import_legacy_file(board_id):
+            latest = self._latest_version(board_id)
+
+        if latest is not None:
+            version = (latest,)
+        else:
+            version = (0,) if board_id in self._legacy_rules else None
+        with self._lock:
+            self._versions[board_id] = (version, now)
+        return version
+
+    def load(self, board_id: str) -> Tuple[List[Dict], Optional[Tuple]]:
+        """Rules and version of the board's latest published row"""
+        self._ensure_table()
+        table = self.model.__table__
+        with self.db.engine.connect() as connection:
+            row = connection.execute(
+                select(table.c.rules, table.c.version).where(table.c.board_id == board_id)
+                .order_by(table.c.version.desc()).limit(1)
+            ).one_or_none()
+        if row is None:
+            legacy = self._legacy_rules.get(board_id)
+            return (list(legacy), (0,)) if legacy is not None else ([], None)
+        return json.loads(row.rules) if row.rules else [], (row.version,)
+
+    def save(self, board_id: str, rules: List[Dict]) -> Tuple:
+        """
+        Publish a new version of the board's rules
+
+        The new row is committed in its own transaction (not the caller's
+        session); the unique (board_id, version) constraint makes concurrent
+        publishes from several workers retry with the next number instead of
+        overwriting each other.
+        """
+        self._ensure_table()
+        payload = json.dumps(rules)
+        table = self.model.__table__
+
+        for _ in range(self.PUBLISH_RETRIES):
+            try:
+                with self.db.engine.begin() as connection:
+                    next_version = (connection.execute(
+                        select(func.max(table.c.version)).where(table.c.board_id == board_id)
+                    ).scalar() or 0) + 1
+                    connection.execute(table.insert().values(board_id=board_id, version=next_version, rules=payload))
+            except IntegrityError:
+                continue
+
+            version = (next_version,)
+            with self._lock:
+                self._versions[board_id] = (version, time.monotonic())
+            return version
+
+        raise RuntimeError(f'Could not publish rules for board {board_id}: too many concurrent saves')
+
+    def list_versions(self, board_id: str) -> List[Dict[str, Any]]:
+        """Published versions of a board's rules, newest first (without rule bodies)"""
+        self._ensure_table()
+        rows = self.model.query.filter_by(board_id=board_id).order_by(self.model.version.desc()).all()
+        return [{
+            'version': row.version,
+            'rule_count': len(json.loads(row.rules)) if row.rules else 0,
+            'created_at': row.created_at.isoformat() if row.created_at else None
+        } for row in rows]
+
+    def _import_legacy_file(self, board_id: str) -> bool:
+        """
+        Seed version 1 of a board from its old JSON file, if there is one
+
+        Runs in its own transaction. If the database is locked (e.g. by an
+        import holding SQLite's write lock), the file's rules are kept in memory
+        and served as version 0; a later lookup retries the seed.
+        """
+        if not self.legacy_dir:
+            return False
+        rules_file = os.path.join(self.legacy_dir, f'{board_id}_rules.json')
+        if not os.path.exists(rules_file):
+            return False
+        try:
+            with open(rules_file, 'r') as f:
+                rules = json.load(f)
+        except Exception as e:
+            print(f"Error importing legacy rules for {board_id}: {e}")
+            return False
+
+        try:
+            with self.db.engine.begin() as connection:
+                connection.execute(self.model.__table__.insert().values(
+                    board_id=board_id, version=1, rules=json.dumps(rules)
+                ))
+        except IntegrityError:
+            # Another worker imported it first
+            pass
+        except OperationalError as e:
+            print(f"Legacy rules for {board_id} served from file, seed deferred: {e.orig}")
+            self._legacy_rules[board_id] = rules
+            return False
+        self._legacy_rules.pop(board_id, None)
+        return True
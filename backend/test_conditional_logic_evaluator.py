@@ -0,0 +1,118 @@
+"""
+Parity tests: ConditionalLogicEvaluator against src/utils/ConditionalLogicEngine.js
+Run with: python -m pytest test_conditional_logic_evaluator.py (needs node for the JS side)
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from conditional_logic_evaluator import ConditionalLogicEvaluator
+
+JS_ENGINE = Path(__file__).resolve().parent.parent / 'src' / 'utils' / 'ConditionalLogicEngine.js'
+
+NODE_SCRIPT = '''
+import Engine from %s;
+let input = '';
+process.stdin.on('data', chunk => { input += chunk; });
+process.stdin.on('end', () => {
+  const results = JSON.parse(input).map(([rules, formData]) => new Engine(rules, formData).evaluateAll());
+  process.stdout.write(JSON.stringify(results));
+});
+'''
+
+needs_node = pytest.mark.skipif(shutil.which('node') is None or not JS_ENGINE.exists(),
+                                 reason='node and the portal sources are needed for parity tests')
+
+
+def js_field_states(cases):
+    """evaluateAll() of the browser engine for each (rules, form_data) case"""
+    script = NODE_SCRIPT % json.dumps(JS_ENGINE.as_uri())
+    output = subprocess.run(
+        ['node', '--input-type=module', '-e', script],
+        input=json.dumps(cases), capture_output=True, text=True, check=True, cwd=os.path.dirname(JS_ENGINE)
+    ).stdout
+    return json.loads(output)
+
+
+def py_field_states(rules, form_data):
+    """evaluate() with the keys JavaScript leaves undefined dropped"""
+    states = ConditionalLogicEvaluator(rules).evaluate(form_data)
+    return {
+        field: {key: value for key, value in state.items() if value is not None}
+        for field, state in states.items()
+    }
+
+
+def rule(rule_id, field, condition, value, *actions):
+    return {
+        'id': rule_id,
+        'trigger': {'field': field, 'condition': condition, 'value': value},
+        'actions': [dict(action) for action in actions]
+    }
+
+
+@needs_node
+def test_highest_rule_index_wins_over_topological_order():
+    # B sets x (which triggers A), so A is evaluated after B; A's hide must still
+    # lose to B's show because B was saved later
+    rules = [
+        rule('A', 'x', 'equals', 'y', {'type': 'hide', 'target_field': 'z'}),
+        rule('B', 'w', 'equals', '1', {'type': 'set_value', 'target_field': 'x', 'value': 'y'},
+             {'type': 'show', 'target_field': 'z'}),
+    ]
+    form_data = {'w': '1', 'x': 'y'}
+
+    [expected] = js_field_states([[rules, form_data]])
+    assert expected['z']['visible'] is True
+    assert py_field_states(rules, form_data) == expected
+
+
+@needs_node
+def test_set_value_propagates_to_dependent_rules():
+    rules = [
+        rule('A', 'x', 'equals', 'y', {'type': 'set_required', 'target_field': 'z'}),
+        rule('B', 'w', 'equals', '1', {'type': 'set_value', 'target_field': 'x', 'value': 'y'}),
+    ]
+    # Before the portal writes the set value back, the browser has not fired A yet;
+    # the server evaluates the settled form, which the browser reaches on its next pass
+    states = py_field_states(rules, {'w': '1', 'x': 'n'})
+    [expected] = js_field_states([[rules, {'w': '1', 'x': 'y'}]])
+    assert states == expected
+    assert states['z']['required'] is True
+
+
+@needs_node
+def test_random_rule_sets_match_the_browser():
+    rng = random.Random(7)
+    fields = ['a', 'b', 'c', 'd', 'e']
+    conditions = ['equals', 'not_equals', 'contains', 'greater_than', 'less_than_or_equal', 'is_empty', 'is_not_empty']
+    action_types = ['show', 'hide', 'enable', 'disable', 'set_required', 'set_optional', 'show_message']
+    values = ['1', '2', 'yes', 'no', '', 3]
+
+    cases = []
+    for _ in range(300):
+        rules = [
+            rule(f'r{i}', rng.choice(fields), rng.choice(conditions), rng.choice(values), *[
+                {'type': rng.choice(action_types), 'target_field': rng.choice(fields), 'value': rng.choice(values)}
+                for _ in range(rng.randint(1, 3))
+            ])
+            for i in range(rng.randint(1, 8))
+        ]
+        form_data = {field: rng.choice(values) for field in fields if rng.random() < 0.8}
+        cases.append([rules, form_data])
+
+    expected = js_field_states(cases)
+    for (rules, form_data), js_states in zip(cases, expected):
+        assert py_field_states(rules, form_data) == js_states, (rules, form_data)
+
+
+def test_non_dict_actions_are_skipped():
+    rules = [{'id': 'A', 'trigger': {'field': 'x', 'condition': 'equals', 'value': 'y'},
+              'actions': ['hide', None, {'type': 'hide', 'target_field': 'z'}]}]
+    assert py_field_states(rules, {'x': 'y'}) == {'z': {'visible': False, 'enabled': True, 'required': False}}
@@ -0,0 +1,87 @@
+"""
+Tests for LicenseeBulkImporter username resolution
+Run with: python -m pytest test_licensee_import.py
+"""
+
+import pytest
+from flask import Flask
+from flask_sqlalchemy import SQLAlchemy
+
+from licensee_import import LicenseeBulkImporter
+
+db = SQLAlchemy()
+
+
+class ImportUser(db.Model):
+    """The User columns LicenseeBulkImporter reads and writes"""
+    __tablename__ = 'user'
+
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(255), unique=True, nullable=False)
+    email = db.Column(db.String(255), unique=True, nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    first_name = db.Column(db.String(255))
+    last_name = db.Column(db.String(255))
+    phone = db.Column(db.String(50))
+    address = db.Column(db.String(500))
+    city = db.Column(db.String(255))
+    state = db.Column(db.String(50))
+    zipCode = db.Column(db.String(20))
+    licenseNumber = db.Column(db.String(255))
+    licenseType = db.Column(db.String(255))
+    licenseStatus = db.Column(db.String(50))
+    issueDate = db.Column(db.String(50))
+    expirationDate = db.Column(db.String(50))
+
+
+@pytest.fixture
+def session():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield db.session
+        db.session.rollback()
+        db.drop_all()
+
+
+def add_user(session, username, email):
+    session.add(ImportUser(username=username, email=email, password_hash='x'))
+    session.commit()
+
+
+def import_rows(session, rows):
+    stats = LicenseeBulkImporter(db, ImportUser).upsert(rows)
+    session.commit()
+    return stats, {user.email: user.username for user in ImportUser.query}
+
+
+def test_numbered_variant_taken_without_base(session):
+    # 'john1' exists but 'john' does not: the second john must skip to john2
+    add_user(session, 'john1', 'existing@x.com')
+    stats, usernames = import_rows(session, [
+        {'licenseNumber': 'L1', 'email': 'john@a.com'},
+        {'licenseNumber': 'L2', 'email': 'john@b.com'},
+    ])
+    assert stats['imported'] == 2
+    assert usernames['john@a.com'] == 'john'
+    assert usernames['john@b.com'] == 'john2'
+
+
+def test_explicit_username_equal_to_another_rows_base(session):
+    add_user(session, 'john1', 'existing@x.com')
+    stats, usernames = import_rows(session, [
+        {'licenseNumber': 'L1', 'email': 'someone@a.com', 'username': 'john'},
+        {'licenseNumber': 'L2', 'email': 'john@b.com'},
+    ])
+    assert stats['imported'] == 2
+    assert usernames['someone@a.com'] == 'john'
+    assert usernames['john@b.com'] == 'john2'
+
+
+def test_taken_base_is_numbered(session):
+    add_user(session, 'mary', 'existing@x.com')
+    add_user(session, 'mary1', 'existing1@x.com')
+    _, usernames = import_rows(session, [{'licenseNumber': 'L1', 'email': 'mary@a.com'}])
+    assert usernames['mary@a.com'] == 'mary2'